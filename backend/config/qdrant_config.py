@@ -1,16 +1,23 @@
-"""Qdrant configuration (URL, collection name, vector size)."""
+"""Qdrant configuration (URL, transport, collection names, vector size)."""
 
 import os
 from dataclasses import dataclass
+from typing import Optional
 
 from dotenv import load_dotenv
 
+from backend.config.settings import VECTOR_REDUCED_DIM, VECTOR_REDUCTION
+
 load_dotenv()
 
 # nv-embedqa-e5-v5 produces 1024-dimensional vectors
 DEFAULT_VECTOR_SIZE = 1024
 
 
+def _env_flag(name: str, default: str = "false") -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+
 @dataclass(frozen=True)
 class QdrantConfig:
     """Qdrant connection and collection configuration."""
@@ -20,6 +27,42 @@ class QdrantConfig:
     collection_name: str
     vector_size: int
     use_https: bool = False
+    papers_collection_name: str = ""
+    # Collections are created as <name>_v<version> and served through an alias
+    # named <name>, so a re-embedded copy can replace them without downtime.
+    collection_version: int = 1
+    # Transport: gRPC (prefer_grpc) on grpc_port, or REST with optional HTTP/2.
+    prefer_grpc: bool = False
+    grpc_port: int = 6334
+    http2: bool = False
+    timeout: int = 30
+    pool_size: int = 10
+    keepalive_ms: int = 30000
+
+    @property
+    def transport(self) -> str:
+        """Short transport label for logs and benchmarks."""
+        if self.prefer_grpc:
+            return "grpc"
+        return "http2" if self.http2 else "http"
+
+    @property
+    def grpc_options(self) -> dict:
+        """Keep-alive channel options so idle gRPC connections are reused."""
+        return {
+            "grpc.keepalive_time_ms": self.keepalive_ms,
+            "grpc.keepalive_permit_without_calls": 1,
+            "grpc.http2.max_pings_without_data": 0,
+        }
+
+    @property
+    def paper_collection(self) -> str:
+        """Collection holding one title+abstract vector per paper."""
+        return self.papers_collection_name or f"{self.collection_name}_papers"
+
+    def versioned(self, alias: str, version: Optional[int] = None) -> str:
+        """Physical collection name behind an alias, e.g. research_papers_v2."""
+        return f"{alias}_v{version or self.collection_version}"
 
     @property
     def url(self) -> str:
@@ -34,7 +77,23 @@ def get_qdrant_config() -> QdrantConfig:
         host=os.getenv("QDRANT_HOST", "localhost"),
         port=int(os.getenv("QDRANT_PORT", "6333")),
         collection_name=os.getenv("QDRANT_COLLECTION_NAME", "research_papers"),
-        vector_size=int(os.getenv("QDRANT_VECTOR_SIZE", str(DEFAULT_VECTOR_SIZE))),
-        use_https=os.getenv("QDRANT_USE_HTTPS", "false").lower()
-        in ("1", "true", "yes"),
+        vector_size=int(
+            os.getenv(
+                "QDRANT_VECTOR_SIZE",
+                str(
+                    VECTOR_REDUCED_DIM
+                    if VECTOR_REDUCTION not in ("", "none")
+                    else DEFAULT_VECTOR_SIZE
+                ),
+            )
+        ),
+        use_https=_env_flag("QDRANT_USE_HTTPS"),
+        papers_collection_name=os.getenv("QDRANT_PAPERS_COLLECTION_NAME", ""),
+        collection_version=int(os.getenv("QDRANT_COLLECTION_VERSION", "1")),
+        prefer_grpc=_env_flag("QDRANT_PREFER_GRPC"),
+        grpc_port=int(os.getenv("QDRANT_GRPC_PORT", "6334")),
+        http2=_env_flag("QDRANT_HTTP2"),
+        timeout=int(os.getenv("QDRANT_TIMEOUT", "30")),
+        pool_size=int(os.getenv("QDRANT_POOL_SIZE", "10")),
+        keepalive_ms=int(os.getenv("QDRANT_KEEPALIVE_MS", "30000")),
     )
@@ -1,17 +1,94 @@
 """Configuration settings for the application."""
 
 import os
+from pathlib import Path
 
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Local caches and stores live under DATA_DIR (default backend/data). Relative
+# paths, here and in the *_PATH settings, are resolved against the backend
+# directory rather than the working directory, so the API and the scripts
+# share the same files wherever they are started from.
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+DATA_DIR = BACKEND_DIR / os.getenv("DATA_DIR", "data")
+
+
+def data_path(env_var: str, default: str) -> str:
+    """Path from env_var or DATA_DIR/default; an empty value stays "" (off)."""
+    value = os.getenv(env_var, str(DATA_DIR / default))
+    return str(BACKEND_DIR / value) if value else ""
+
+
 # Model configurations
-EMBEDDING_MODEL = "nvidia/nv-embedqa-e5-v5"
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "nvidia/nv-embedqa-e5-v5")
 LLM_MODEL = "meta/llama-3.3-70b-instruct"
+# Local cache of embeddings keyed by model, input type and text hash, so text
+# that was already embedded is never sent upstream again. Empty path = off.
+EMBEDDING_CACHE_PATH = data_path("EMBEDDING_CACHE_PATH", "embedding_cache.sqlite")
+EMBEDDING_CACHE_MAX_BYTES = int(
+    os.getenv("EMBEDDING_CACHE_MAX_BYTES", str(2 * 1024**3))
+)
+# Cross-request micro-batching of embedding calls (max wait 0 disables)
+EMBED_BATCH_MAX_SIZE = int(os.getenv("EMBED_BATCH_MAX_SIZE", "32"))
+EMBED_BATCH_MAX_WAIT_MS = float(os.getenv("EMBED_BATCH_MAX_WAIT_MS", "5"))
+# Document embedding requests: batches are cut by estimated tokens and text
+# count, sent EMBED_CONCURRENCY at a time, and retried on 429/5xx with
+# jittered exponential backoff (Retry-After wins when the API sends one).
+EMBED_BATCH_MAX_TOKENS = int(os.getenv("EMBED_BATCH_MAX_TOKENS", "16000"))
+EMBED_BATCH_MAX_TEXTS = int(os.getenv("EMBED_BATCH_MAX_TEXTS", "50"))
+EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", "4"))
+EMBED_MAX_RETRIES = int(os.getenv("EMBED_MAX_RETRIES", "5"))
+EMBED_RETRY_BASE_DELAY = float(os.getenv("EMBED_RETRY_BASE_DELAY", "1.0"))
+EMBED_RETRY_MAX_DELAY = float(os.getenv("EMBED_RETRY_MAX_DELAY", "60"))
+# Retrieval prefix embedded in front of each chunk: paper fields in priority
+# order (title, authors, abstract, domain, section), capped in estimated tokens
+# and never allowed to push chunk content past the embedding model's window.
+RETRIEVAL_PREFIX_FIELDS = tuple(
+    field.strip()
+    for field in os.getenv(
+        "RETRIEVAL_PREFIX_FIELDS", "title,authors,domain,section"
+    ).split(",")
+    if field.strip()
+)
+RETRIEVAL_PREFIX_MAX_TOKENS = int(os.getenv("RETRIEVAL_PREFIX_MAX_TOKENS", "64"))
+EMBED_MODEL_MAX_TOKENS = int(os.getenv("EMBED_MODEL_MAX_TOKENS", "512"))
+# Optional dimensionality reduction of stored vectors: "truncate" (Matryoshka
+# models only) or "pca" (projection fitted by scripts/reduce_vectors.py and
+# loaded from VECTOR_PCA_PATH). Changing it requires re-embedding.
+VECTOR_REDUCTION = os.getenv("VECTOR_REDUCTION", "").lower()
+VECTOR_REDUCED_DIM = int(os.getenv("VECTOR_REDUCED_DIM", "512"))
+VECTOR_PCA_PATH = data_path("VECTOR_PCA_PATH", "pca_projection.npz")
 
 # Extraction mode: "structure" (pymupdf4llm markdown) | "flat" (plain text)
 EXTRACTION_MODE = os.getenv("EXTRACTION_MODE", "structure")
+# Extracted PDF text, keyed by sha256 of the PDF, extractor and mode; LRU past
+# the byte cap. Empty path disables the cache.
+EXTRACTION_CACHE_PATH = data_path("EXTRACTION_CACHE_PATH", "extraction_cache.sqlite")
+EXTRACTION_CACHE_MAX_BYTES = int(os.getenv("EXTRACTION_CACHE_MAX_BYTES", str(1024**3)))
+# Fetched arXiv PDFs and metadata, kept by ID and version (empty path = off).
+# ARXIV_OFFLINE serves papers from the store only and never hits arXiv.
+ARXIV_STORE_PATH = data_path("ARXIV_STORE_PATH", "arxiv_store")
+ARXIV_STORE_MAX_BYTES = int(os.getenv("ARXIV_STORE_MAX_BYTES", str(5 * 1024**3)))
+ARXIV_OFFLINE = os.getenv("ARXIV_OFFLINE", "").lower() in ("1", "true", "yes")
+# arXiv API pacing: metadata is looked up ARXIV_ID_BATCH IDs per id_list query,
+# with requests ARXIV_REQUEST_INTERVAL seconds apart (bursts of ARXIV_REQUEST_BURST)
+# across the whole process, per arXiv's API terms.
+ARXIV_ID_BATCH = int(os.getenv("ARXIV_ID_BATCH", "100"))
+ARXIV_REQUEST_INTERVAL = float(os.getenv("ARXIV_REQUEST_INTERVAL", "3"))
+ARXIV_REQUEST_BURST = int(os.getenv("ARXIV_REQUEST_BURST", "1"))
+# PDF downloads share one keep-alive session, at most ARXIV_DOWNLOAD_CONCURRENCY
+# at a time; broken transfers resume with Range requests up to the retry count.
+ARXIV_DOWNLOAD_CONCURRENCY = int(os.getenv("ARXIV_DOWNLOAD_CONCURRENCY", "4"))
+ARXIV_DOWNLOAD_RETRIES = int(os.getenv("ARXIV_DOWNLOAD_RETRIES", "4"))
+ARXIV_DOWNLOAD_TIMEOUT = float(os.getenv("ARXIV_DOWNLOAD_TIMEOUT", "60"))
+# Also drop appendices (not just references) from arXiv papers before chunking.
+STRIP_APPENDICES = os.getenv("STRIP_APPENDICES", "").lower() in ("1", "true", "yes")
+# Pages converted per pymupdf4llm call when streaming a PDF page by page.
+PDF_PAGE_BATCH = int(os.getenv("PDF_PAGE_BATCH", "8"))
+# Chunks embedded and upserted together when a document is streamed.
+STREAM_EMBED_BATCH = int(os.getenv("STREAM_EMBED_BATCH", "128"))
 
 # Chunking parameters
 CHUNK_SIZE = 1000
@@ -19,6 +96,30 @@ CHUNK_OVERLAP = 100
 CHUNK_SEPARATORS = ["\n\n", "\n", ".", ";", ",", " "]
 MIN_CHUNK_LENGTH = 200
 
+# Retrieval parameters
+# Two-stage retrieval: how many papers the paper-level search keeps before the
+# chunk search is restricted to them.
+TWO_STAGE_PAPER_LIMIT = int(os.getenv("TWO_STAGE_PAPER_LIMIT", "20"))
+# Small-to-big retrieval: neighboring chunks merged around each hit (0 = off).
+NEIGHBOR_WINDOW = int(os.getenv("NEIGHBOR_WINDOW", "1"))
+# Adaptive top-k: over-fetch ADAPTIVE_MAX_K hits, drop those below the absolute
+# score threshold or ADAPTIVE_RELATIVE_CUTOFF * top score, and stop at the
+# first score cliff of at least ADAPTIVE_MIN_GAP. KBs can override the bounds.
+ADAPTIVE_MIN_K = int(os.getenv("ADAPTIVE_MIN_K", "2"))
+ADAPTIVE_MAX_K = int(os.getenv("ADAPTIVE_MAX_K", "8"))
+RETRIEVAL_SCORE_THRESHOLD = (
+    float(os.environ["RETRIEVAL_SCORE_THRESHOLD"])
+    if os.getenv("RETRIEVAL_SCORE_THRESHOLD")
+    else None
+)
+ADAPTIVE_RELATIVE_CUTOFF = float(os.getenv("ADAPTIVE_RELATIVE_CUTOFF", "0.75"))
+ADAPTIVE_MIN_GAP = float(os.getenv("ADAPTIVE_MIN_GAP", "0.05"))
+# Search result cache budget in bytes of cached text (0 = off).
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+# Seconds a cached search result stays valid. Writes from other processes
+# (bulk_ingest, reembed, snapshot import) only reach the API through this.
+RESULT_CACHE_TTL_SECONDS = float(os.getenv("RESULT_CACHE_TTL_SECONDS", "60"))
+
 # Arxiv paper IDs
 PAPER_IDS = [
     "1706.03762",  # Attention Is All You Need Paper
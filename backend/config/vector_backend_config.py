@@ -0,0 +1,51 @@
+"""Vector backend selection: Qdrant server or embedded FAISS/NumPy store."""
+
+import os
+from dataclasses import dataclass
+
+from dotenv import load_dotenv
+
+from backend.config.settings import DATA_DIR, data_path
+
+load_dotenv()
+
+VECTOR_BACKENDS = ("qdrant", "embedded")
+EMBEDDED_INDEX_TYPES = ("flat", "hnsw", "ivf", "ivfpq")
+
+
+@dataclass(frozen=True)
+class VectorBackendConfig:
+    """Which vector backend QdrantStore talks to, and embedded index tuning."""
+
+    backend: str = "qdrant"
+    embedded_path: str = str(DATA_DIR / "vectors")
+    # "flat" is exact NumPy search over the memmap; the others build a FAISS
+    # index once a collection outgrows exact_search_threshold candidates.
+    index_type: str = "hnsw"
+    exact_search_threshold: int = 20000
+    hnsw_m: int = 32
+    hnsw_ef_search: int = 128
+    ivf_nlist: int = 1024
+    ivf_nprobe: int = 16
+    pq_m: int = 64
+
+
+def get_vector_backend_config() -> VectorBackendConfig:
+    """Load vector backend configuration from environment."""
+    backend = os.getenv("VECTOR_BACKEND", "qdrant").lower()
+    if backend not in VECTOR_BACKENDS:
+        raise ValueError(f"VECTOR_BACKEND must be one of {VECTOR_BACKENDS}")
+    index_type = os.getenv("EMBEDDED_INDEX_TYPE", "hnsw").lower()
+    if index_type not in EMBEDDED_INDEX_TYPES:
+        raise ValueError(f"EMBEDDED_INDEX_TYPE must be one of {EMBEDDED_INDEX_TYPES}")
+    return VectorBackendConfig(
+        backend=backend,
+        embedded_path=data_path("EMBEDDED_VECTOR_PATH", "vectors"),
+        index_type=index_type,
+        exact_search_threshold=int(os.getenv("EMBEDDED_EXACT_THRESHOLD", "20000")),
+        hnsw_m=int(os.getenv("EMBEDDED_HNSW_M", "32")),
+        hnsw_ef_search=int(os.getenv("EMBEDDED_HNSW_EF_SEARCH", "128")),
+        ivf_nlist=int(os.getenv("EMBEDDED_IVF_NLIST", "1024")),
+        ivf_nprobe=int(os.getenv("EMBEDDED_IVF_NPROBE", "16")),
+        pq_m=int(os.getenv("EMBEDDED_PQ_M", "64")),
+    )
@@ -12,19 +12,21 @@ root_dir = str(Path(__file__).resolve().parent.parent)
 if root_dir not in sys.path:
     sys.path.insert(0, root_dir)
 
-from backend.config.settings import LLM_MODEL
+from backend.config.settings import LLM_MODEL, NEIGHBOR_WINDOW
 from backend.src.auth.deps import get_current_user
+from backend.src.data.chunking import iter_chunks
 from backend.src.data.document_loader import (
     create_document_chunks,
     create_text_splitter,
-    enrich_chunk_metadata,
     load_single_arxiv_document,
     normalize_paper_metadata,
     preprocess_documents,
 )
-from backend.src.db.models import KnowledgeBase, User
+from backend.src.data.extraction import iter_pdf_pages
+from backend.src.db.models import KnowledgeBase, RetrievalMode, User
 from backend.src.db.session import get_db, init_db
 from backend.src.prompts.chat_prompts import create_chat_prompt
+from backend.src.retrieval.adaptive_k import AdaptiveK
 from backend.src.retrieval.qdrant_setup import init_qdrant_collection
 from backend.src.retrieval.qdrant_store import QdrantStore
 from backend.src.auth.routes import router as auth_router
@@ -35,13 +37,13 @@ from backend.src.utils.conversation_store import (
 )
 from backend.src.utils.feedback_store_postgres import FeedbackStorePostgres
 
-import fitz  # PyMuPDF
 from dotenv import load_dotenv
 from fastapi import Depends, FastAPI, HTTPException, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
 from langchain_core.documents import Document
 from langchain_nvidia_ai_endpoints import ChatNVIDIA
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 # Configure logging
@@ -218,9 +220,15 @@ class PaperInfo(BaseModel):
     categories: Optional[str] = None
 
 
+class RetrievalMetrics(BaseModel):
+    k: int  # hits kept by adaptive top-k
+    passages: int  # prompt passages after neighbor merging
+
+
 class ChatResponse(BaseModel):
     response: str
     papers: List[PaperInfo]
+    metrics: Optional[RetrievalMetrics] = None
 
 
 # API endpoints
@@ -250,7 +258,13 @@ async def chat(
     try:
         if question.knowledge_base_ids:
             accessible = (
-                db.query(KnowledgeBase.id)
+                db.query(
+                    KnowledgeBase.id,
+                    KnowledgeBase.retrieval_mode,
+                    KnowledgeBase.min_k,
+                    KnowledgeBase.max_k,
+                    KnowledgeBase.score_threshold,
+                )
                 .filter(
                     KnowledgeBase.id.in_(question.knowledge_base_ids),
                     (KnowledgeBase.is_system.is_(True))
@@ -265,18 +279,56 @@ async def chat(
                     status_code=403,
                     detail="One or more selected knowledge bases are not accessible.",
                 )
-            context_docs = store.search(
-                query=question.text,
-                user_id=None,
-                limit=5,
-                kb_ids=question.knowledge_base_ids,
+            adaptive = AdaptiveK.combine(
+                [
+                    AdaptiveK.with_overrides(row.min_k, row.max_k, row.score_threshold)
+                    for row in accessible
+                ]
             )
+            # Paper-first search only when every selected KB opted into it;
+            # flat KBs may not have paper-level vectors to pre-select from.
+            two_stage = all(
+                row.retrieval_mode == RetrievalMode.two_stage for row in accessible
+            )
+            if len(requested_ids) > 1 and not two_stage:
+                # One batched request with a per-KB share of the results.
+                # Retrieval blocks on the embedder; run it off the event loop
+                # so concurrent chats overlap and their query embeddings can
+                # be micro-batched together.
+                context_docs = await run_in_threadpool(
+                    store.search_many,
+                    [question.text],
+                    kb_ids=question.knowledge_base_ids,
+                    per_kb_quota=True,
+                    neighbor_window=NEIGHBOR_WINDOW,
+                    adaptive=adaptive,
+                )
+            else:
+                context_docs = await run_in_threadpool(
+                    store.search,
+                    query=question.text,
+                    user_id=None,
+                    kb_ids=question.knowledge_base_ids,
+                    two_stage=two_stage,
+                    neighbor_window=NEIGHBOR_WINDOW,
+                    adaptive=adaptive,
+                )
         else:
-            context_docs = store.search(
+            context_docs = await run_in_threadpool(
+                store.search,
                 query=question.text,
                 user_id=current_user.id,
-                limit=5,
+                neighbor_window=NEIGHBOR_WINDOW,
+                adaptive=AdaptiveK(),
             )
+        retrieval_k = max(
+            (doc.metadata.get("retrieval_k", 0) for doc in context_docs), default=0
+        )
+        logger.debug(
+            "Adaptive top-k kept %d hits as %d passages",
+            retrieval_k,
+            len(context_docs),
+        )
         context_str = docs_to_string(context_docs)
 
         history = get_recent_conversation_history(db, current_user.id, limit=10)
@@ -298,6 +350,7 @@ async def chat(
         return ChatResponse(
             response=response.content,
             papers=[PaperInfo(**p) for p in papers],
+            metrics=RetrievalMetrics(k=retrieval_k, passages=len(context_docs)),
         )
     except Exception as e:
         logger.error(f"Error processing chat request: {str(e)}", exc_info=True)
@@ -389,29 +442,27 @@ async def upload_file(
                 "papers": papers,
             }
 
-        doc = load_pdf_from_bytes(contents, filename=filename)
-        doc.metadata["paper_metadata"] = normalize_paper_metadata(doc.metadata)
-        text_splitter = create_text_splitter()
-        chunks = enrich_chunk_metadata(text_splitter.split_documents([doc]))
-
-        if not chunks:
-            raise HTTPException(
-                status_code=500, detail="Failed to process document into chunks."
-            )
-
-        title = str(doc.metadata.get("Title", filename))
-
-        store.add_documents(
-            chunks=chunks,
+        # Extracted, chunked and embedded page by page, for PDFs of any length.
+        metadata = {"Title": filename, "source": filename}
+        metadata["paper_metadata"] = normalize_paper_metadata(metadata)
+        pages = iter_pdf_pages(
+            contents, filename, use_structure=False, metadata=metadata
+        )
+        chunk_count = store.add_document_stream(
+            iter_chunks(create_text_splitter(), pages),
             user_id=current_user.id,
             paper_id=paper_id,
-            paper_title=title,
+            paper_title=filename,
             source=filename,
         )
+        if not chunk_count:
+            raise HTTPException(
+                status_code=500, detail="Failed to process document into chunks."
+            )
 
         papers = store.get_user_papers(current_user.id)
         return {
-            "message": f"Successfully uploaded: {title}",
+            "message": f"Successfully uploaded: {filename}",
             "papers": papers,
         }
 
@@ -489,27 +540,6 @@ async def get_conversations(
     }
 
 
-def load_pdf_from_bytes(pdf_bytes, filename):
-    """Loads a PDF from bytes and extracts text, returns a single Document."""
-    doc_reader = None
-    try:
-        doc_reader = fitz.open(stream=pdf_bytes, filetype="pdf")
-        text = ""
-        for page in doc_reader:
-            text += page.get_text()
-        if not text.strip():
-            raise ValueError("No text content found in PDF")
-        return Document(
-            page_content=text, metadata={"Title": filename, "source": filename}
-        )
-    except Exception as e:
-        logger.error(f"Failed to read PDF {filename}: {str(e)}", exc_info=True)
-        raise
-    finally:
-        if doc_reader:
-            doc_reader.close()
-
-
 if __name__ == "__main__":
     logger.info("Starting FastAPI application")
     import uvicorn
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Populate and check the local arXiv PDF store. Usage:
+  python -m scripts.arxiv_store fetch [ID ...] [--ids-file ids.txt] [--predefined]
+  python -m scripts.arxiv_store verify
+
+fetch downloads papers that are not stored yet (all predefined KB papers
+with --predefined), so KBs can later be seeded with ARXIV_OFFLINE=true or
+seed_predefined_kbs --offline without touching arXiv. verify re-hashes every
+stored PDF and drops entries that are missing or corrupt.
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Add backend root to path
+_backend = Path(__file__).resolve().parent.parent
+_repo_root = _backend.parent
+if str(_repo_root) not in sys.path:
+    sys.path.insert(0, str(_repo_root))
+
+from dotenv import load_dotenv  # noqa: E402
+
+load_dotenv(_backend / ".env")
+
+from backend.config.kb_config import (  # noqa: E402
+    get_domain_paper_ids,
+    get_predefined_kb_specs,
+    load_custom_predefined_specs,
+)
+from backend.src.data.arxiv_download import get_arxiv_downloader  # noqa: E402
+from backend.src.data.arxiv_metadata import get_arxiv_resolver  # noqa: E402
+from backend.src.data.arxiv_store import get_arxiv_store  # noqa: E402
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+def _requested_ids(args) -> list[str]:
+    ids = list(args.ids)
+    if args.ids_file:
+        ids += [
+            line.strip()
+            for line in Path(args.ids_file).read_text().splitlines()
+            if line.strip()
+        ]
+    if args.predefined:
+        for spec in get_predefined_kb_specs() + load_custom_predefined_specs():
+            ids += get_domain_paper_ids(spec.domain)[: spec.max_papers]
+    return list(dict.fromkeys(ids))
+
+
+def run_fetch(args, store) -> None:
+    ids = _requested_ids(args)
+    missing = [paper_id for paper_id in ids if store.get(paper_id) is None]
+    records = get_arxiv_resolver().resolve(missing)
+    downloads = {paper_id: record.pdf_url for paper_id, record in records.items()}
+    fetched = 0
+    for paper_id, result in get_arxiv_downloader().fetch_many(downloads):
+        if isinstance(result, Exception):
+            logger.warning("Could not fetch %s: %s", paper_id, result)
+            continue
+        record = records[paper_id]
+        metadata = {**record.metadata, "source": f"arxiv:{paper_id}"}
+        store.put(paper_id, record.version, result, metadata)
+        fetched += 1
+    logger.info(
+        "%d fetched, %d already stored, %d failed; store is %d bytes",
+        fetched,
+        len(ids) - len(missing),
+        len(missing) - fetched,
+        store.size_bytes,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local arXiv PDF store")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    fetch_parser = sub.add_parser("fetch", help="Download papers into the store")
+    fetch_parser.add_argument("ids", nargs="*", help="arXiv IDs")
+    fetch_parser.add_argument("--ids-file", help="One arXiv ID per line")
+    fetch_parser.add_argument(
+        "--predefined",
+        action="store_true",
+        help="Also fetch the configured papers of every predefined KB",
+    )
+    sub.add_parser("verify", help="Check stored PDFs against their hashes")
+
+    args = parser.parse_args()
+    store = get_arxiv_store()
+    if store is None:
+        logger.error("ARXIV_STORE_PATH is empty; the store is disabled")
+        sys.exit(1)
+    if args.command == "fetch":
+        run_fetch(args, store)
+    else:
+        ok, dropped = store.verify()
+        logger.info("%d stored papers intact, %d dropped", ok, dropped)
+
+
+if __name__ == "__main__":
+    main()
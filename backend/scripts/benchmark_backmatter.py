@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Compare reference stripping before and after the back-matter detector. Usage:
+  python -m scripts.benchmark_backmatter [--pdf-dir papers/] [ID ...]
+      [--ids-file ids.txt] [--structure] [--strip-appendices] [--repeat 20]
+
+For each paper (local PDFs, or arXiv IDs via the local arXiv store / arXiv),
+times the old json.dumps + first-"References" cut against
+strip_back_matter, and reports the characters kept and the section chunks
+each variant produces.
+"""
+
+import argparse
+import json
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add backend root to path
+_backend = Path(__file__).resolve().parent.parent
+_repo_root = _backend.parent
+if str(_repo_root) not in sys.path:
+    sys.path.insert(0, str(_repo_root))
+
+from dotenv import load_dotenv  # noqa: E402
+
+load_dotenv(_backend / ".env")
+
+from langchain_core.documents import Document  # noqa: E402
+
+from backend.src.data.backmatter import strip_back_matter  # noqa: E402
+from backend.src.data.chunking import get_chunker  # noqa: E402
+from backend.src.data.document_loader import fetch_arxiv_paper  # noqa: E402
+from backend.src.data.extraction import iter_pdf_pages  # noqa: E402
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+def legacy_strip(text: str) -> str:
+    """What preprocess_documents used to do."""
+    content = json.dumps(text)
+    if "References" in content:
+        content = content[: content.index("References")]
+    return content
+
+
+def _corpus(args):
+    if args.pdf_dir:
+        for path in sorted(args.pdf_dir.glob("**/*.pdf")):
+            yield path.name, path.read_bytes()
+    ids = list(args.ids)
+    if args.ids_file:
+        ids += [line.strip() for line in args.ids_file.read_text().splitlines()]
+    for paper_id in dict.fromkeys(filter(None, ids)):
+        fetched = fetch_arxiv_paper(paper_id)
+        if fetched is None:
+            logger.warning("Skipping %s: not available", paper_id)
+            continue
+        yield paper_id, fetched[0]
+
+
+def _timed(strip, text: str, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        strip(text)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark back-matter stripping")
+    parser.add_argument("ids", nargs="*", help="arXiv IDs")
+    parser.add_argument("--ids-file", type=Path, help="One arXiv ID per line")
+    parser.add_argument("--pdf-dir", type=Path, help="Directory of PDFs")
+    parser.add_argument(
+        "--structure",
+        action="store_true",
+        help="Extract markdown with pymupdf4llm instead of flat text",
+    )
+    parser.add_argument("--strip-appendices", action="store_true")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per paper")
+    args = parser.parse_args()
+
+    chunker = get_chunker(strategy="section")
+    totals = {"legacy_ms": 0.0, "new_ms": 0.0, "legacy_chunks": 0, "new_chunks": 0}
+    papers = 0
+    for name, pdf_bytes in _corpus(args):
+        pages = iter_pdf_pages(pdf_bytes, name, use_structure=args.structure)
+        text = "\n".join(page.page_content for page in pages)
+        legacy = legacy_strip(text)
+        new = strip_back_matter(text, args.strip_appendices)
+        legacy_ms = _timed(legacy_strip, text, args.repeat)
+        new_ms = _timed(
+            lambda t: strip_back_matter(t, args.strip_appendices), text, args.repeat
+        )
+        legacy_chunks = len(
+            chunker.transform_documents([Document(page_content=legacy)])
+        )
+        new_chunks = len(chunker.transform_documents([Document(page_content=new)]))
+        logger.info(
+            "%s: %d chars | legacy %.2fms kept %d -> %d chunks | "
+            "new %.2fms kept %d -> %d chunks",
+            name,
+            len(text),
+            legacy_ms,
+            len(legacy),
+            legacy_chunks,
+            new_ms,
+            len(new),
+            new_chunks,
+        )
+        papers += 1
+        totals["legacy_ms"] += legacy_ms
+        totals["new_ms"] += new_ms
+        totals["legacy_chunks"] += legacy_chunks
+        totals["new_chunks"] += new_chunks
+
+    if not papers:
+        logger.error("No papers to benchmark; pass --pdf-dir or arXiv IDs")
+        sys.exit(1)
+    logger.info(
+        "%d papers: legacy %.2fms / %d chunks, new %.2fms / %d chunks",
+        papers,
+        totals["legacy_ms"],
+        totals["legacy_chunks"],
+        totals["new_ms"],
+        totals["new_chunks"],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""Compare Qdrant upsert and search latency per transport. Usage:
+  python -m scripts.benchmark_qdrant_transport [--points 5000] [--searches 200]
+      [--batch-size 256] [--transports http,http2,grpc]
+
+Creates a throwaway collection with random vectors of the configured size,
+times batched upserts and top-k searches (returning vectors and payloads) for
+each transport, then drops the collection.
+"""
+
+import argparse
+import dataclasses
+import logging
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Add backend root to path
+_backend = Path(__file__).resolve().parent.parent
+_repo_root = _backend.parent
+if str(_repo_root) not in sys.path:
+    sys.path.insert(0, str(_repo_root))
+
+from dotenv import load_dotenv  # noqa: E402
+
+load_dotenv(_backend / ".env")
+
+import numpy as np  # noqa: E402
+from qdrant_client.http.models import (  # noqa: E402
+    Distance,
+    PointStruct,
+    VectorParams,
+)
+
+from backend.config.qdrant_config import get_qdrant_config  # noqa: E402
+from backend.src.retrieval.qdrant_setup import create_qdrant_client  # noqa: E402
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+TRANSPORTS = {
+    "http": {"prefer_grpc": False, "http2": False},
+    "http2": {"prefer_grpc": False, "http2": True},
+    "grpc": {"prefer_grpc": True},
+}
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _summary(timings: list[float]) -> str:
+    return (
+        f"mean={statistics.mean(timings):.2f}ms "
+        f"p50={_percentile(timings, 50):.2f}ms "
+        f"p95={_percentile(timings, 95):.2f}ms"
+    )
+
+
+def run_transport(name, config, vectors, queries, batch_size, limit) -> None:
+    client = create_qdrant_client(dataclasses.replace(config, **TRANSPORTS[name]))
+    collection = f"transport_bench_{name}_{uuid.uuid4().hex[:8]}"
+    client.create_collection(
+        collection_name=collection,
+        vectors_config=VectorParams(size=vectors.shape[1], distance=Distance.COSINE),
+    )
+    try:
+        upsert_timings = []
+        for start in range(0, len(vectors), batch_size):
+            batch = vectors[start : start + batch_size]
+            points = [
+                PointStruct(
+                    id=start + i,
+                    vector=vector.tolist(),
+                    payload={"page_content": "x" * 1000, "chunk_seq": start + i},
+                )
+                for i, vector in enumerate(batch)
+            ]
+            t0 = time.perf_counter()
+            client.upsert(collection_name=collection, points=points, wait=True)
+            upsert_timings.append((time.perf_counter() - t0) * 1000)
+
+        search_timings = []
+        for query in queries:
+            t0 = time.perf_counter()
+            client.query_points(
+                collection_name=collection,
+                query=query.tolist(),
+                limit=limit,
+                with_payload=True,
+                with_vectors=True,
+            )
+            search_timings.append((time.perf_counter() - t0) * 1000)
+
+        logger.info("%-6s upsert[%d] %s", name, batch_size, _summary(upsert_timings))
+        logger.info("%-6s search[k=%d] %s", name, limit, _summary(search_timings))
+    finally:
+        client.delete_collection(collection)
+        client.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark Qdrant transports")
+    parser.add_argument("--points", type=int, default=5000)
+    parser.add_argument("--searches", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--limit", type=int, default=10, help="Search top-k")
+    parser.add_argument("--transports", default="http,http2,grpc")
+    args = parser.parse_args()
+
+    config = get_qdrant_config()
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((args.points, config.vector_size), dtype=np.float32)
+    queries = rng.standard_normal((args.searches, config.vector_size), dtype=np.float32)
+
+    for name in [t.strip() for t in args.transports.split(",") if t.strip()]:
+        if name not in TRANSPORTS:
+            logger.error(
+                "Unknown transport %r (choose from %s)", name, list(TRANSPORTS)
+            )
+            sys.exit(1)
+        run_transport(name, config, vectors, queries, args.batch_size, args.limit)
+
+
+if __name__ == "__main__":
+    main()
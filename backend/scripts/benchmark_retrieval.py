@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""Compare flat and two-stage (paper-then-chunk) retrieval. Usage:
+  python -m scripts.benchmark_retrieval --kb-id <id> --queries <txt_path>
+      [--limit 5] [--paper-limit 20] [--repeat 3]
+
+Input: text file with one query per line. Flat search results are treated as
+ground truth; two-stage recall@k is the fraction of flat top-k chunks that the
+two-stage search also returns.
+"""
+
+import argparse
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add backend root to path
+_backend = Path(__file__).resolve().parent.parent
+_repo_root = _backend.parent
+if str(_repo_root) not in sys.path:
+    sys.path.insert(0, str(_repo_root))
+
+from dotenv import load_dotenv  # noqa: E402
+
+load_dotenv(_backend / ".env")
+
+from backend.config.settings import TWO_STAGE_PAPER_LIMIT  # noqa: E402
+from backend.src.retrieval.qdrant_store import QdrantStore  # noqa: E402
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+def _chunk_key(doc) -> tuple[str, int]:
+    meta = getattr(doc, "metadata", {}) or {}
+    return meta.get("paper_id", ""), meta.get("chunk_index", 0)
+
+
+def _timed_search(store: QdrantStore, query: str, repeat: int, **kwargs):
+    timings = []
+    docs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        docs = store.search(query, **kwargs)
+        timings.append((time.perf_counter() - start) * 1000)
+    return docs, timings
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _report(name: str, timings: list[float]) -> None:
+    logger.info(
+        "%-10s mean=%.1fms p50=%.1fms p95=%.1fms (n=%d)",
+        name,
+        statistics.mean(timings),
+        _percentile(timings, 50),
+        _percentile(timings, 95),
+        len(timings),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark two-stage retrieval")
+    parser.add_argument("--kb-id", type=int, required=True, help="Knowledge base ID")
+    parser.add_argument(
+        "--queries", type=Path, required=True, help="Text file, one query per line"
+    )
+    parser.add_argument("--limit", type=int, default=5, help="Chunks per query")
+    parser.add_argument(
+        "--paper-limit",
+        type=int,
+        default=TWO_STAGE_PAPER_LIMIT,
+        help="Papers kept by the first stage",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per query")
+    args = parser.parse_args()
+
+    queries = [q.strip() for q in args.queries.read_text().splitlines() if q.strip()]
+    if not queries:
+        logger.error("No queries in %s", args.queries)
+        sys.exit(1)
+
+    store = QdrantStore()
+    flat_timings: list[float] = []
+    two_stage_timings: list[float] = []
+    recalls: list[float] = []
+    for query in queries:
+        flat_docs, timings = _timed_search(
+            store, query, args.repeat, limit=args.limit, kb_ids=[args.kb_id]
+        )
+        flat_timings.extend(timings)
+        staged_docs, timings = _timed_search(
+            store,
+            query,
+            args.repeat,
+            limit=args.limit,
+            kb_ids=[args.kb_id],
+            two_stage=True,
+            paper_limit=args.paper_limit,
+        )
+        two_stage_timings.extend(timings)
+        expected = {_chunk_key(d) for d in flat_docs}
+        if expected:
+            found = {_chunk_key(d) for d in staged_docs}
+            recalls.append(len(expected & found) / len(expected))
+
+    logger.info(
+        "KB %s: %d queries, limit=%d, paper_limit=%d",
+        args.kb_id,
+        len(queries),
+        args.limit,
+        args.paper_limit,
+    )
+    _report("flat", flat_timings)
+    _report("two-stage", two_stage_timings)
+    if recalls:
+        logger.info(
+            "two-stage recall@%d vs flat: %.3f", args.limit, statistics.mean(recalls)
+        )
+
+
+if __name__ == "__main__":
+    main()
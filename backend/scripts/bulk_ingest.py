@@ -5,12 +5,27 @@
 
 Input: Directory of PDFs (--input-dir) or manifest CSV with columns:
 path or arxiv_id, title (optional)
+
+Documents flow through a staged pipeline (see ingest_pipeline): a process
+pool extracts and chunks (--extract-workers), threads embed
+(--embed-workers), and one writer upserts --upsert-batch points at a time.
+Each upsert is followed by one transaction inserting the documents' rows;
+a batch is flushed every --flush-docs documents or --flush-seconds seconds,
+and if either write fails the batch's points are deleted again.
+Stages are joined by queues of --queue-size documents; a report every
+--report-every seconds shows per-stage docs/s and chunks/s and the
+bottleneck stage.
+
+Progress is checkpointed in a SQLite journal (see ingest_journal). A rerun
+after a crash skips finished documents without re-reading them, records
+documents that were upserted but not yet recorded, and clears the points of
+documents that died mid-write before ingesting them again.
 """
 
 import argparse
 import csv
-import hashlib
 import logging
+import os
 import sys
 from pathlib import Path
 
@@ -24,18 +39,23 @@ from dotenv import load_dotenv  # noqa: E402
 
 load_dotenv(_backend / ".env")
 
-from backend.config.settings import EXTRACTION_MODE  # noqa: E402
-from backend.src.data.chunking import get_chunker  # noqa: E402
-from backend.src.data.document_loader import (  # noqa: E402
-    enrich_chunk_metadata,
-    load_single_arxiv_document,
-    normalize_paper_metadata,
-    preprocess_documents,
-)
-from backend.src.data.extraction import extract_pdf_with_structure  # noqa: E402
-from backend.src.db.models import KnowledgeBase, KnowledgeBaseDocument  # noqa: E402
+from backend.config.settings import EMBED_CONCURRENCY, EXTRACTION_MODE  # noqa: E402
+from backend.src.db.models import KnowledgeBase  # noqa: E402
 from backend.src.db.session import SessionLocal, init_db  # noqa: E402
-from backend.src.embedding.embeddings import get_embedder  # noqa: E402
+from backend.src.knowledge.ingest_journal import (  # noqa: E402
+    IngestJournal,
+    existing_document_ids,
+    insert_documents,
+    plan_resume,
+    written_entry,
+)
+from backend.src.knowledge.ingest_pipeline import (  # noqa: E402
+    IngestItem,
+    IngestPipeline,
+    init_prepare_worker,
+    prefetch_arxiv_pdfs,
+    resolve_arxiv_items,
+)
 from backend.src.retrieval.qdrant_setup import init_qdrant_collection  # noqa: E402
 from backend.src.retrieval.qdrant_store import QdrantStore  # noqa: E402
 
@@ -48,93 +68,10 @@ logger = logging.getLogger(__name__)
 BATCH_SIZE = 64
 
 
-def chunk_document(chunker, doc):
-    if hasattr(chunker, "split_documents"):
-        chunks = chunker.split_documents([doc])
-    elif hasattr(chunker, "transform_documents"):
-        chunks = chunker.transform_documents([doc])
-    else:
-        raise ValueError("Chunker has no split/transform method")
-    return [c for c in chunks if getattr(c, "page_content", "").strip()]
-
-
 def load_kb(db, kb_id: int) -> KnowledgeBase | None:
     return db.get(KnowledgeBase, kb_id)
 
 
-def process_pdf(
-    path: Path,
-    store: QdrantStore,
-    kb: KnowledgeBase,
-    chunker,
-    use_structure: bool,
-) -> tuple[int, str, str]:
-    """Process a single PDF and return (chunk_count, paper_id, title)."""
-    with path.open("rb") as f:
-        contents = f.read()
-    content_hash = hashlib.md5(contents).hexdigest()
-    paper_id = f"upload-{content_hash[:12]}"
-    if store.document_exists_in_kb(kb.id, paper_id):
-        return 0, paper_id, path.stem
-    doc = extract_pdf_with_structure(contents, path.name, use_structure=use_structure)
-    if isinstance(doc, list):
-        doc = doc[0]
-    doc_meta = getattr(doc, "metadata", {}) or {}
-    title = doc_meta.get("Title", path.stem)
-    source = str(path)
-    doc.metadata["paper_metadata"] = normalize_paper_metadata(doc.metadata)
-    valid = enrich_chunk_metadata(chunk_document(chunker, doc))
-    if not valid:
-        return 0, paper_id, title
-    store.add_documents(
-        chunks=valid,
-        user_id=0,
-        paper_id=paper_id,
-        paper_title=title,
-        source=source,
-        kb_id=kb.id,
-        domain=kb.domain,
-    )
-    return len(valid), paper_id, title
-
-
-def process_arxiv(
-    arxiv_id: str,
-    store: QdrantStore,
-    kb: KnowledgeBase,
-    chunker,
-) -> tuple[int, str, str]:
-    """Process a single ArXiv paper and return (chunk_count, paper_id, title)."""
-    arxiv_id = arxiv_id.strip()
-    if arxiv_id.startswith(("arXiv:", "arxiv:")):
-        arxiv_id = arxiv_id.split(":")[-1].strip()
-    if store.document_exists_in_kb(kb.id, arxiv_id):
-        return 0, arxiv_id, ""
-    new_doc = load_single_arxiv_document(arxiv_id)
-    if not new_doc or len(new_doc) == 0:
-        return 0, arxiv_id, ""
-    processed = preprocess_documents([new_doc])
-    if not processed or not processed[0]:
-        return 0, arxiv_id, ""
-    doc = processed[0][0]
-    title = getattr(doc, "metadata", {}).get("Title", "Untitled")
-    source = f"arxiv:{arxiv_id}"
-    doc.metadata["paper_metadata"] = normalize_paper_metadata(doc.metadata)
-    valid = enrich_chunk_metadata(chunk_document(chunker, doc))
-    if not valid:
-        return 0, arxiv_id, title
-    store.add_documents(
-        chunks=valid,
-        user_id=0,
-        paper_id=arxiv_id,
-        paper_title=title,
-        source=source,
-        kb_id=kb.id,
-        domain=kb.domain,
-    )
-    return len(valid), arxiv_id, title
-
-
 def main() -> None:
     parser = argparse.ArgumentParser(description="Bulk ingest documents into a KB")
     parser.add_argument("--kb-id", type=int, required=True, help="Knowledge base ID")
@@ -144,6 +81,53 @@ def main() -> None:
     parser.add_argument(
         "--limit", type=int, default=10000, help="Max documents (default 10000)"
     )
+    parser.add_argument(
+        "--extract-workers",
+        type=int,
+        default=max(1, (os.cpu_count() or 2) - 1),
+        help="Processes extracting and chunking (default: cores - 1)",
+    )
+    parser.add_argument(
+        "--embed-workers",
+        type=int,
+        default=EMBED_CONCURRENCY,
+        help="Threads embedding documents (default EMBED_CONCURRENCY)",
+    )
+    parser.add_argument(
+        "--upsert-batch",
+        type=int,
+        default=512,
+        help="Chunk points per upsert request (default 512)",
+    )
+    parser.add_argument(
+        "--flush-docs",
+        type=int,
+        default=BATCH_SIZE,
+        help=f"Documents per upsert and DB transaction (default {BATCH_SIZE})",
+    )
+    parser.add_argument(
+        "--flush-seconds",
+        type=float,
+        default=2.0,
+        help="Max seconds a written batch waits before flushing (default 2)",
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=32,
+        help="Documents buffered between stages (default 32)",
+    )
+    parser.add_argument(
+        "--journal",
+        type=Path,
+        help="Checkpoint journal (default: next to the manifest / in the input dir)",
+    )
+    parser.add_argument(
+        "--report-every",
+        type=float,
+        default=10.0,
+        help="Seconds between throughput reports (default 10)",
+    )
     args = parser.parse_args()
 
     init_db()
@@ -156,20 +140,13 @@ def main() -> None:
         logger.error("Knowledge base %s not found", args.kb_id)
         sys.exit(1)
 
-    use_structure = EXTRACTION_MODE == "structure"
-    embeddings = get_embedder() if kb.chunking_strategy.value == "semantic" else None
-    chunker = get_chunker(
-        strategy=kb.chunking_strategy.value,
-        embeddings=embeddings,
-    )
-
-    docs_to_process: list[tuple[str, str]] = []  # (type, path_or_id)
+    docs_to_process: list[IngestItem] = []
     if args.input_dir:
         if not args.input_dir.is_dir():
             logger.error("Input dir %s is not a directory", args.input_dir)
             sys.exit(1)
         for p in sorted(args.input_dir.glob("**/*.pdf")):
-            docs_to_process.append(("pdf", str(p)))
+            docs_to_process.append(IngestItem("pdf", str(p)))
     else:
         if args.manifest is None:
             logger.error("Manifest path is required")
@@ -178,49 +155,84 @@ def main() -> None:
             reader = csv.DictReader(f)
             for row in reader:
                 if "path" in row and row["path"].strip():
-                    docs_to_process.append(("pdf", row["path"].strip()))
+                    docs_to_process.append(IngestItem("pdf", row["path"].strip()))
                 elif "arxiv_id" in row and row["arxiv_id"].strip():
-                    docs_to_process.append(("arxiv", row["arxiv_id"].strip()))
+                    docs_to_process.append(IngestItem("arxiv", row["arxiv_id"].strip()))
 
     if args.limit < len(docs_to_process):
         docs_to_process = docs_to_process[: args.limit]
 
+    # Plain values: kb expires on commit, and must not be refreshed off-thread.
+    kb_id, domain = kb.id, kb.domain
+    strategy = kb.chunking_strategy.value
+
+    journal = IngestJournal(
+        args.journal
+        or IngestJournal.default_path(args.input_dir or args.manifest, kb_id),
+        kb_id,
+    )
+    existing = existing_document_ids(db, kb_id)
+    plan = plan_resume(docs_to_process, journal.entries(), existing)
+    if plan.reconcile:
+        insert_documents(db, kb_id, plan.reconcile)
+        existing.update(entry.paper_id for entry in plan.reconcile)
+        journal.record_done(entry.key for entry in plan.reconcile)
+    for paper_id in plan.cleanup:
+        store.delete_kb_document(kb_id, paper_id)
     logger.info(
-        "Ingesting up to %d documents into KB %s (%s)",
+        "Ingesting %d of %d documents into KB %s (%s): %d already done, "
+        "%d recorded from the journal, %d partial documents cleared",
+        len(plan.todo),
         len(docs_to_process),
-        args.kb_id,
+        kb_id,
         kb.name,
+        plan.skipped,
+        len(plan.reconcile),
+        len(plan.cleanup),
+    )
+    # Batched metadata lookups up front, instead of one query per download,
+    # then concurrent PDF downloads into the arXiv store for the workers.
+    todo = resolve_arxiv_items(plan.todo)
+    prefetch_arxiv_pdfs(todo)
+
+    def record(batch) -> None:
+        # Runs on the pipeline's writer thread, the only user of db from here.
+        # Raising makes the pipeline delete the batch's points and fail it.
+        entries = [written_entry(prepared, count) for prepared, count in batch]
+        journal.record_written(entries)
+        insert_documents(db, kb_id, entries)
+        existing.update(entry.paper_id for entry in entries)
+        journal.record_done(entry.key for entry in entries)
+
+    pipeline = IngestPipeline(
+        store,
+        kb_id=kb_id,
+        domain=domain,
+        initializer=init_prepare_worker,
+        initargs=(strategy, EXTRACTION_MODE == "structure"),
+        extract_workers=args.extract_workers,
+        embed_workers=args.embed_workers,
+        upsert_batch=args.upsert_batch,
+        flush_docs=args.flush_docs,
+        flush_seconds=args.flush_seconds,
+        queue_size=args.queue_size,
+        report_every=args.report_every,
+        exists=lambda paper_id: paper_id in existing,
+        on_prepared=lambda prepared: journal.record_prepared(
+            prepared.item, prepared.paper_id, prepared.content_hash
+        ),
+        on_flushed=record,
+        on_failed=journal.record_failed,
     )
-    total_chunks = 0
-    success = 0
-    for i, (dtype, val) in enumerate(docs_to_process):
-        try:
-            if dtype == "pdf":
-                count, pid, title = process_pdf(
-                    Path(val), store, kb, chunker, use_structure
-                )
-            else:
-                count, pid, title = process_arxiv(val, store, kb, chunker)
-            if count > 0:
-                total_chunks += count
-                success += 1
-                kbdoc = KnowledgeBaseDocument(
-                    kb_id=kb.id,
-                    document_id=pid,
-                    title=title or pid,
-                    source=val,
-                    chunk_count=count,
-                )
-                db.add(kbdoc)
-                db.commit()
-        except Exception as e:
-            logger.warning("Failed %s: %s", val, e)
-            db.rollback()
-        if (i + 1) % 100 == 0:
-            logger.info("Processed %d/%d documents", i + 1, len(docs_to_process))
+    stats = pipeline.run(todo)
+    journal.close()
 
     db.close()
-    logger.info("Done. Ingested %d documents, %d chunks total", success, total_chunks)
+    logger.info(
+        "Done. Ingested %d documents, %d chunks total",
+        stats.written.docs,
+        stats.written.chunks,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Export or import a knowledge base snapshot bundle. Usage:
+  python -m scripts.kb_snapshot export --kb-id <id> --out <dir>
+  python -m scripts.kb_snapshot export --all-system --out <dir>
+  python -m scripts.kb_snapshot import --bundle <dir> [--kb-id <id>]
+      [--owner-id <user id>] [--batch-size 2048] [--allow-model-mismatch]
+
+A bundle holds the KB's vectors (float32 arrays), payloads (Parquet) and a
+manifest with the embedding model and KnowledgeBaseDocument rows. Importing
+upserts the stored vectors directly, so no papers are downloaded and no
+embedding calls are made. Without --kb-id the target KB is matched by name
+and domain (system KBs, or --owner-id's KBs) and created if missing.
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Add backend root to path
+_backend = Path(__file__).resolve().parent.parent
+_repo_root = _backend.parent
+if str(_repo_root) not in sys.path:
+    sys.path.insert(0, str(_repo_root))
+
+from dotenv import load_dotenv  # noqa: E402
+
+load_dotenv(_backend / ".env")
+
+from backend.src.db.models import KnowledgeBase  # noqa: E402
+from backend.src.db.session import SessionLocal, init_db  # noqa: E402
+from backend.src.knowledge.snapshot import (  # noqa: E402
+    IMPORT_BATCH_SIZE,
+    SnapshotError,
+    bundle_dirname,
+    export_kb,
+    import_kb,
+)
+from backend.src.retrieval.qdrant_setup import init_qdrant_collection  # noqa: E402
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="KB snapshot export/import")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = sub.add_parser("export", help="Write a KB to a bundle")
+    target = export_parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--kb-id", type=int)
+    target.add_argument(
+        "--all-system",
+        action="store_true",
+        help="Export every system KB into <out>/<domain>-<name>",
+    )
+    export_parser.add_argument("--out", type=Path, required=True)
+
+    import_parser = sub.add_parser("import", help="Load a bundle into a KB")
+    import_parser.add_argument("--bundle", type=Path, required=True)
+    import_parser.add_argument("--kb-id", type=int, default=None)
+    import_parser.add_argument("--owner-id", type=int, default=None)
+    import_parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    import_parser.add_argument("--allow-model-mismatch", action="store_true")
+    args = parser.parse_args()
+
+    init_db()
+    client = init_qdrant_collection()
+    db = SessionLocal()
+    try:
+        if args.command == "export":
+            if args.all_system:
+                kbs = db.query(KnowledgeBase).filter(KnowledgeBase.is_system.is_(True))
+                for kb in kbs.order_by(KnowledgeBase.id).all():
+                    export_kb(db, client, kb.id, args.out / bundle_dirname(kb))
+            else:
+                export_kb(db, client, args.kb_id, args.out)
+        else:
+            import_kb(
+                db,
+                client,
+                args.bundle,
+                kb_id=args.kb_id,
+                owner_id=args.owner_id,
+                batch_size=args.batch_size,
+                allow_model_mismatch=args.allow_model_mismatch,
+            )
+    except SnapshotError as e:
+        logger.error("%s", e)
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
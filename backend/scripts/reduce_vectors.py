@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""Fit and evaluate reduced-dimension vector storage. Usage:
+  python -m scripts.reduce_vectors eval [--dims 256 512 768] [--method pca]
+      [--sample 20000] [--queries 200] [--questions-file q.txt] [--k 10]
+  python -m scripts.reduce_vectors fit --dim 512 [--sample 50000] [--out path]
+
+eval samples full-dimension chunk vectors from the chunk collection and
+reports recall@k and brute-force search latency per reduced dimension
+against exact full-dimension search. Queries are held-out chunk vectors, or
+real questions (one per line) embedded with the query input type.
+
+fit saves a PCA projection to --out (default VECTOR_PCA_PATH). To roll it
+out, set VECTOR_REDUCTION=pca and VECTOR_REDUCED_DIM, then re-embed into a
+new collection version with scripts/reembed_collection.py --swap.
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Add backend root to path
+_backend = Path(__file__).resolve().parent.parent
+_repo_root = _backend.parent
+if str(_repo_root) not in sys.path:
+    sys.path.insert(0, str(_repo_root))
+
+from dotenv import load_dotenv  # noqa: E402
+
+load_dotenv(_backend / ".env")
+
+import numpy as np  # noqa: E402
+
+from backend.config.qdrant_config import get_qdrant_config  # noqa: E402
+from backend.config.settings import (  # noqa: E402
+    EMBEDDING_MODEL,
+    VECTOR_PCA_PATH,
+    VECTOR_REDUCED_DIM,
+)
+from backend.src.embedding.embeddings import embed_queries, get_embedder  # noqa: E402
+from backend.src.embedding.reduction import (  # noqa: E402
+    PCAReducer,
+    evaluate_reductions,
+)
+from backend.src.retrieval.qdrant_setup import get_vector_backend  # noqa: E402
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+def sample_vectors(client, collection: str, limit: int) -> np.ndarray:
+    """Up to limit stored vectors (random IDs make scroll order a fair sample)."""
+    rows, offset = [], None
+    while len(rows) < limit:
+        points, offset = client.scroll(
+            collection_name=collection,
+            limit=min(1024, limit - len(rows)),
+            offset=offset,
+            with_payload=False,
+            with_vectors=True,
+        )
+        rows.extend(point.vector for point in points if point.vector is not None)
+        if offset is None:
+            break
+    return np.asarray(rows, dtype=np.float32)
+
+
+def _load_sample(config, limit: int, min_dim: int) -> np.ndarray:
+    vectors = sample_vectors(get_vector_backend(), config.collection_name, limit)
+    if len(vectors) == 0:
+        logger.error("%s has no vectors to sample", config.collection_name)
+        sys.exit(1)
+    if vectors.shape[1] <= min_dim:
+        logger.error(
+            "Stored vectors are %d-d; reduction needs full-dimension vectors "
+            "(is the collection already reduced?)",
+            vectors.shape[1],
+        )
+        sys.exit(1)
+    return vectors
+
+
+def run_eval(args, config) -> None:
+    vectors = _load_sample(config, args.sample + args.queries, max(args.dims))
+    if args.questions_file:
+        questions = [
+            line.strip()
+            for line in Path(args.questions_file).read_text().splitlines()
+            if line.strip()
+        ]
+        corpus = vectors
+        queries = np.asarray(
+            embed_queries(get_embedder(reduced=False), questions), dtype=np.float32
+        )
+    else:
+        held_out = min(args.queries, len(vectors) // 5)
+        corpus, queries = vectors[held_out:], vectors[:held_out]
+    logger.info(
+        "Evaluating %s over %d vectors with %d queries (k=%d)",
+        args.method,
+        len(corpus),
+        len(queries),
+        args.k,
+    )
+    reports = evaluate_reductions(
+        corpus, queries, sorted(args.dims), method=args.method, k=args.k
+    )
+    baseline = reports[0]
+    print(f"{'dim':>6} {'recall@k':>9} {'ms/query':>9} {'bytes/vec':>10} {'ratio':>6}")
+    for report in reports:
+        print(
+            f"{report.dim:>6} {report.recall:>9.3f} {report.latency_ms:>9.3f} "
+            f"{report.bytes_per_vector:>10} "
+            f"{baseline.bytes_per_vector / report.bytes_per_vector:>6.1f}"
+        )
+
+
+def run_fit(args, config) -> None:
+    vectors = _load_sample(config, args.sample, args.dim)
+    reducer = PCAReducer.fit(vectors, args.dim, model=EMBEDDING_MODEL)
+    reducer.save(args.out)
+    logger.info("Saved %s projection to %s", reducer.fingerprint, args.out)
+    logger.info(
+        "Set VECTOR_REDUCTION=pca VECTOR_REDUCED_DIM=%d VECTOR_PCA_PATH=%s, "
+        "then re-embed into a new collection version",
+        args.dim,
+        args.out,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reduced-dimension vectors")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    eval_parser = sub.add_parser("eval", help="Report recall/latency per dimension")
+    eval_parser.add_argument("--dims", type=int, nargs="+", default=[256, 512, 768])
+    eval_parser.add_argument("--method", choices=["pca", "truncate"], default="pca")
+    eval_parser.add_argument("--sample", type=int, default=20000)
+    eval_parser.add_argument("--queries", type=int, default=200)
+    eval_parser.add_argument("--questions-file", help="One question per line")
+    eval_parser.add_argument("--k", type=int, default=10)
+
+    fit_parser = sub.add_parser("fit", help="Fit and save a PCA projection")
+    fit_parser.add_argument("--dim", type=int, default=VECTOR_REDUCED_DIM)
+    fit_parser.add_argument("--sample", type=int, default=50000)
+    fit_parser.add_argument("--out", default=VECTOR_PCA_PATH)
+
+    args = parser.parse_args()
+    config = get_qdrant_config()
+    if args.command == "eval":
+        run_eval(args, config)
+    else:
+        run_fit(args, config)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""Re-embed the vector collections into a new version and swap the aliases. Usage:
+  python -m scripts.reembed_collection --version 2 [--model <name>]
+      [--batch-size 512] [--swap] [--drop-legacy]
+  python -m scripts.reembed_collection --version 2 --swap-only [--drop-legacy]
+  python -m scripts.reembed_collection --rollback-to 1
+  python -m scripts.reembed_collection --status
+
+Reads every chunk and paper point from the collections the aliases point at
+now, re-embeds the stored text with --model (default EMBEDDING_MODEL), and
+writes <name>_v<version>. The app keeps serving the old version until --swap
+repoints both aliases in one atomic update; the old collections are kept so
+--rollback-to can point back at them. Pause ingestion while this runs.
+Vectors pass through the configured VECTOR_REDUCTION, so this is also how a
+reduced-dimension version is rolled out (see scripts/reduce_vectors.py).
+
+A pre-versioning deployment has plain collections under the alias names.
+They can't coexist with an alias of the same name, so --drop-legacy deletes
+them right before the swap, once the new version holds at least as many
+points (a brief gap, and no rollback).
+
+Afterwards set QDRANT_COLLECTION_VERSION, QDRANT_VECTOR_SIZE, EMBEDDING_MODEL
+and VECTOR_REDUCTION* to match, so new uploads use the same vector space.
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Add backend root to path
+_backend = Path(__file__).resolve().parent.parent
+_repo_root = _backend.parent
+if str(_repo_root) not in sys.path:
+    sys.path.insert(0, str(_repo_root))
+
+from dotenv import load_dotenv  # noqa: E402
+
+load_dotenv(_backend / ".env")
+
+from backend.config.qdrant_config import get_qdrant_config  # noqa: E402
+from backend.src.embedding.embeddings import get_embedder  # noqa: E402
+from backend.src.retrieval.qdrant_setup import (  # noqa: E402
+    get_vector_backend,
+    resolve_alias,
+    swap_aliases,
+)
+from backend.src.retrieval.reembed import (  # noqa: E402
+    DEFAULT_BATCH_SIZE,
+    reembed_collections,
+    replace_legacy_collections,
+)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+def _aliases(config) -> list[str]:
+    return [config.collection_name, config.paper_collection]
+
+
+def show_status(client, config) -> None:
+    for alias in _aliases(config):
+        target = resolve_alias(client, alias)
+        if target is None and client.collection_exists(alias):
+            target = f"{alias} (unversioned collection)"
+        logger.info("%s -> %s", alias, target)
+
+
+def _require_targets(client, targets: dict[str, str]) -> None:
+    for alias, target in targets.items():
+        if not client.collection_exists(target):
+            logger.error("Cannot point %s at %s: it does not exist", alias, target)
+            sys.exit(1)
+
+
+def rollback(client, config, version: int) -> None:
+    targets = {alias: config.versioned(alias, version) for alias in _aliases(config)}
+    _require_targets(client, targets)
+    swap_aliases(client, targets)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Re-embed and swap collections")
+    parser.add_argument("--version", type=int, help="Target collection version")
+    parser.add_argument("--model", help="Embedding model (default EMBEDDING_MODEL)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument(
+        "--swap", action="store_true", help="Point the aliases at the new version"
+    )
+    parser.add_argument(
+        "--swap-only",
+        action="store_true",
+        help="Swap to an already re-embedded --version without re-embedding",
+    )
+    parser.add_argument(
+        "--drop-legacy",
+        action="store_true",
+        help="Delete unversioned collections so the aliases can take their names",
+    )
+    parser.add_argument("--rollback-to", type=int, metavar="VERSION")
+    parser.add_argument("--status", action="store_true")
+    args = parser.parse_args()
+
+    config = get_qdrant_config()
+    client = get_vector_backend()
+
+    if args.status:
+        show_status(client, config)
+        return
+    if args.rollback_to is not None:
+        rollback(client, config, args.rollback_to)
+        return
+    if args.version is None:
+        parser.error("--version is required unless --status or --rollback-to")
+
+    if args.swap_only:
+        targets = {
+            alias: config.versioned(alias, args.version) for alias in _aliases(config)
+        }
+    else:
+        swaps = reembed_collections(
+            client,
+            config,
+            get_embedder(args.model),
+            args.version,
+            batch_size=args.batch_size,
+            on_progress=lambda progress: logger.info("%s", progress),
+        )
+        targets = {alias: target for alias, (_, target) in swaps.items()}
+        if not args.swap:
+            logger.info("Re-embedded; run with --swap-only to serve the new version")
+            return
+
+    _require_targets(client, targets)
+    legacy = [
+        alias
+        for alias in targets
+        if resolve_alias(client, alias) is None and client.collection_exists(alias)
+    ]
+    if legacy and not args.drop_legacy:
+        logger.error("%s are unversioned; pass --drop-legacy to replace them", legacy)
+        sys.exit(1)
+    if legacy:
+        try:
+            replace_legacy_collections(client, targets, legacy)
+        except ValueError as exc:
+            logger.error("%s", exc)
+            sys.exit(1)
+    else:
+        swap_aliases(client, targets)
+    logger.info("Swap complete; roll back with --rollback-to <previous version>")
+
+
+if __name__ == "__main__":
+    main()
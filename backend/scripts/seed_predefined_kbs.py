@@ -1,12 +1,17 @@
 #!/usr/bin/env python3
 """Seed predefined/system knowledge bases from config. Usage:
-python -m scripts.seed_predefined_kbs [--ingest]
+python -m scripts.seed_predefined_kbs [--ingest] [--from-snapshots <dir>]
 When --ingest is passed, also runs bulk ingest using configured static paper IDs
-and arXiv category/year searches.
+and arXiv category/year searches. --from-snapshots loads each KB from the bundle
+written by `kb_snapshot export --all-system` instead, with no downloads or
+embedding calls; KBs without a bundle fall back to --ingest if given.
+--offline ingests from the local arXiv store only (fill it beforehand with
+`arxiv_store fetch --predefined`); papers missing from it are skipped.
 """
 
 import argparse
 import logging
+import os
 import sys
 from pathlib import Path
 
@@ -28,6 +33,8 @@ from backend.config.kb_config import (  # noqa: E402
 from backend.src.data.arxiv_search import search_latest_arxiv_ids  # noqa: E402
 from backend.src.db.models import ChunkingStrategy, KnowledgeBase  # noqa: E402
 from backend.src.db.session import SessionLocal, init_db  # noqa: E402
+from backend.src.knowledge.snapshot import bundle_dirname, import_kb  # noqa: E402
+from backend.src.retrieval.qdrant_setup import init_qdrant_collection  # noqa: E402
 
 logging.basicConfig(
     level=logging.INFO,
@@ -72,7 +79,7 @@ def _create_or_get_system_kb(
 
 
 def _ingest_arxiv_ids(
-    kb: KnowledgeBase, paper_ids: list[str], limit: int | None
+    kb: KnowledgeBase, paper_ids: list[str], limit: int | None, offline: bool = False
 ) -> None:
     if not paper_ids:
         logger.info("No paper IDs for %s, skipping ingest", kb.name)
@@ -94,6 +101,7 @@ def _ingest_arxiv_ids(
             writer.writerow({"arxiv_id": pid})
         manifest_path = Path(f.name)
 
+    env = {**os.environ, "ARXIV_OFFLINE": "true"} if offline else None
     try:
         subprocess.run(
             [
@@ -106,6 +114,7 @@ def _ingest_arxiv_ids(
                 str(manifest_path),
             ],
             cwd=str(_repo_root),
+            env=env,
             check=True,
         )
     finally:
@@ -130,12 +139,25 @@ def main() -> None:
         default=None,
         help="Override max papers per KB for this run.",
     )
+    parser.add_argument(
+        "--from-snapshots",
+        type=Path,
+        default=None,
+        help="Directory of KB bundles from `kb_snapshot export --all-system`.",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Ingest from the local arXiv store only, without contacting arXiv.",
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true",
         help="Print KBs and arXiv queries without writing or ingesting.",
     )
     args = parser.parse_args()
+    if args.offline and args.latest_from_arxiv:
+        parser.error("--latest-from-arxiv needs arXiv; drop it or --offline")
 
     specs = get_predefined_kb_specs() + load_custom_predefined_specs()
 
@@ -152,6 +174,7 @@ def main() -> None:
         return
 
     init_db()
+    client = init_qdrant_collection() if args.from_snapshots else None
     db = SessionLocal()
 
     try:
@@ -162,6 +185,12 @@ def main() -> None:
                 description=spec.description,
                 domain=spec.domain,
             )
+            if args.from_snapshots:
+                bundle = args.from_snapshots / bundle_dirname(kb)
+                if (bundle / "manifest.json").exists():
+                    import_kb(db, client, bundle, kb_id=kb.id)
+                    continue
+                logger.info("No snapshot for %s at %s", kb.name, bundle)
             if not args.ingest:
                 continue
 
@@ -174,7 +203,7 @@ def main() -> None:
                     max_results=max_papers,
                 )
                 logger.info("Resolved %d papers for %s", len(paper_ids), spec.name)
-            _ingest_arxiv_ids(kb, paper_ids, limit=max_papers)
+            _ingest_arxiv_ids(kb, paper_ids, limit=max_papers, offline=args.offline)
     finally:
         db.close()
 
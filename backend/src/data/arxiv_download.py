@@ -0,0 +1,146 @@
+"""Pooled, concurrency-capped PDF downloads from arXiv with resumable retries."""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Iterator, Mapping, Optional, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from backend.config.settings import (
+    ARXIV_DOWNLOAD_CONCURRENCY,
+    ARXIV_DOWNLOAD_RETRIES,
+    ARXIV_DOWNLOAD_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+_USER_AGENT = "LLM-Powered-Research-Paper-QA-bot (bulk ingest)"
+_RETRY_STATUS = {429, 500, 502, 503, 504}
+# Bytes read per step; a broken transfer keeps every completed step.
+_READ_STEP = 64 * 1024
+
+
+class RetryableDownloadError(IOError):
+    """A transient failure (dropped connection, 5xx, 429) worth retrying."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ArxivDownloader:
+    """
+    Download PDFs through one keep-alive session, at most max_workers at a
+    time across every thread that uses it. A transfer that breaks off is
+    retried with a Range request for the missing tail (from scratch if the
+    server ignores it), backing off between attempts.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_workers: int = ARXIV_DOWNLOAD_CONCURRENCY,
+        retries: int = ARXIV_DOWNLOAD_RETRIES,
+        timeout: float = ARXIV_DOWNLOAD_TIMEOUT,
+        backoff: float = 2.0,
+        session: Optional[requests.Session] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.max_workers = max(1, max_workers)
+        self.retries = retries
+        self.timeout = timeout
+        self.backoff = backoff
+        self._sleep = sleep
+        self._slots = threading.BoundedSemaphore(self.max_workers)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers["User-Agent"] = _USER_AGENT
+        self.session = session
+
+    def _attempt(self, url: str, data: bytearray) -> None:
+        """Append the rest of url's body to data; raises on a broken transfer."""
+        headers = {"Range": f"bytes={len(data)}-"} if data else {}
+        try:
+            with self.session.get(
+                url, headers=headers, stream=True, timeout=self.timeout
+            ) as response:
+                if response.status_code in _RETRY_STATUS:
+                    retry_after = response.headers.get("Retry-After", "")
+                    raise RetryableDownloadError(
+                        f"HTTP {response.status_code} for {url}",
+                        float(retry_after) if retry_after.isdigit() else None,
+                    )
+                response.raise_for_status()
+                if data and response.status_code != 206:
+                    # Range not honoured: the body is the whole file again.
+                    del data[:]
+                expected = response.headers.get("Content-Length")
+                start = len(data)
+                for block in response.iter_content(_READ_STEP):
+                    data.extend(block)
+                if expected is not None and len(data) - start < int(expected):
+                    raise RetryableDownloadError(f"Truncated body from {url}")
+        except (
+            requests.ConnectionError,
+            requests.Timeout,
+            requests.exceptions.ChunkedEncodingError,
+        ) as e:
+            raise RetryableDownloadError(str(e)) from e
+
+    def fetch(self, url: str) -> bytes:
+        """The body of url, which must be a PDF."""
+        data = bytearray()
+        with self._slots:
+            for attempt in range(self.retries + 1):
+                try:
+                    self._attempt(url, data)
+                    break
+                except RetryableDownloadError as e:
+                    if attempt == self.retries:
+                        raise
+                    delay = e.retry_after or self.backoff * 2**attempt
+                    logger.warning(
+                        "Download of %s failed (%s) after %d bytes; retrying in %.1fs",
+                        url,
+                        e,
+                        len(data),
+                        delay,
+                    )
+                    self._sleep(delay)
+        if not data.startswith(b"%PDF"):
+            raise ValueError(f"{url} did not return a PDF")
+        return bytes(data)
+
+    def fetch_many(
+        self, urls: Mapping[str, str]
+    ) -> Iterator[tuple[str, Union[bytes, Exception]]]:
+        """(key, bytes or the error) for each key -> url, as downloads finish."""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self.fetch, url): key for key, url in urls.items()}
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result()
+                except Exception as e:
+                    yield futures[future], e
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_downloader = None
+_downloader_lock = threading.Lock()
+
+
+def get_arxiv_downloader() -> ArxivDownloader:
+    """Process-wide downloader, so all downloads share its connections and cap."""
+    global _downloader
+    with _downloader_lock:
+        if _downloader is None:
+            _downloader = ArxivDownloader()
+        return _downloader
@@ -0,0 +1,183 @@
+"""Batched, rate-limited arXiv metadata lookups through one shared client."""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+
+from backend.config.settings import (
+    ARXIV_ID_BATCH,
+    ARXIV_REQUEST_BURST,
+    ARXIV_REQUEST_INTERVAL,
+)
+from backend.src.data.arxiv_store import split_version, version_number
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: refills at rate tokens per second up to
+    capacity; acquire() blocks until a token is available.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float = 1.0,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            self._sleep(wait)
+
+
+@dataclass(frozen=True)
+class ArxivRecord:
+    """What ingestion needs from arXiv before downloading a paper's PDF."""
+
+    arxiv_id: str
+    version: str
+    pdf_url: str
+    metadata: dict
+
+
+def result_metadata(result, paper_id: str) -> dict:
+    """Document metadata for an arxiv.Result, as the loaders store it."""
+    return {
+        "Title": result.title or "Untitled",
+        "Authors": ", ".join(str(author) for author in result.authors),
+        "Summary": result.summary or "",
+        "Published": result.published.isoformat() if result.published else "",
+        "primary_category": result.primary_category or "",
+        "Categories": ", ".join(result.categories or []),
+        "entry_id": result.entry_id or "",
+        "doi": result.doi or "",
+        "source": f"arxiv:{paper_id}",
+    }
+
+
+def _versioned_id(result) -> str:
+    return (result.entry_id or "").rstrip("/").split("/")[-1]
+
+
+class ArxivMetadataResolver:
+    """
+    Resolve arXiv IDs to ArxivRecords with id_list queries of up to
+    batch_size IDs, each request paced by a shared token bucket (arXiv asks
+    for at most one request every few seconds). Records are kept for the
+    life of the process, so the per-paper loaders reuse a batch lookup.
+    """
+
+    def __init__(
+        self,
+        *,
+        batch_size: int = ARXIV_ID_BATCH,
+        bucket: Optional[TokenBucket] = None,
+    ):
+        self.batch_size = max(1, batch_size)
+        self.bucket = bucket or TokenBucket(
+            1.0 / ARXIV_REQUEST_INTERVAL, ARXIV_REQUEST_BURST
+        )
+        self.requests = 0
+        self._client = None
+        self._records: dict[str, ArxivRecord] = {}
+        self._lock = threading.Lock()
+
+    def _search(self, ids: list[str]) -> list:
+        """One arXiv API request for ids; pacing is left to the bucket."""
+        import arxiv
+
+        with self._lock:
+            if self._client is None:
+                self._client = arxiv.Client(
+                    page_size=self.batch_size, delay_seconds=0, num_retries=3
+                )
+        search = arxiv.Search(id_list=ids, max_results=len(ids))
+        return list(self._client.results(search))
+
+    def _fetch(self, ids: list[str]) -> list:
+        self.bucket.acquire()
+        self.requests += 1
+        try:
+            return self._search(ids)
+        except Exception as e:
+            # One malformed or withdrawn ID fails the whole request; bisect
+            # so the rest of the batch still resolves.
+            if len(ids) == 1:
+                logger.warning("arXiv lookup failed for %s: %s", ids[0], e)
+                return []
+            middle = len(ids) // 2
+            return self._fetch(ids[:middle]) + self._fetch(ids[middle:])
+
+    def _cached(self, paper_id: str) -> Optional[ArxivRecord]:
+        base, version = split_version(paper_id)
+        record = self._records.get(paper_id) or self._records.get(base)
+        if record is not None and version and record.version != version:
+            return None
+        return record
+
+    def resolve(self, paper_ids: Iterable[str]) -> dict[str, ArxivRecord]:
+        """Records for the given IDs; IDs arXiv does not know are left out."""
+        wanted = list(dict.fromkeys(paper_ids))
+        with self._lock:
+            missing = [pid for pid in wanted if self._cached(pid) is None]
+        for start in range(0, len(missing), self.batch_size):
+            batch = missing[start : start + self.batch_size]
+            for result in self._fetch(batch):
+                versioned = _versioned_id(result)
+                base, version = split_version(versioned)
+                requested = next(
+                    (pid for pid in batch if pid in (base, versioned)), base
+                )
+                record = ArxivRecord(
+                    base,
+                    version,
+                    result.pdf_url,
+                    result_metadata(result, requested),
+                )
+                with self._lock:
+                    self._records[versioned] = record
+                    latest = getattr(self._records.get(base), "version", "")
+                    if version_number(version) >= version_number(latest):
+                        self._records[base] = record
+        with self._lock:
+            found = {pid: self._cached(pid) for pid in wanted}
+        return {pid: record for pid, record in found.items() if record is not None}
+
+    def resolve_one(self, paper_id: str) -> Optional[ArxivRecord]:
+        return self.resolve([paper_id]).get(paper_id)
+
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+
+def get_arxiv_resolver() -> ArxivMetadataResolver:
+    """Process-wide resolver, so every lookup shares one client and bucket."""
+    global _resolver
+    with _resolver_lock:
+        if _resolver is None:
+            _resolver = ArxivMetadataResolver()
+        return _resolver
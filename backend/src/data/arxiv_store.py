@@ -0,0 +1,218 @@
+"""Persistent, content-addressed store of fetched arXiv PDFs and metadata."""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from backend.config.settings import ARXIV_STORE_MAX_BYTES, ARXIV_STORE_PATH
+
+logger = logging.getLogger(__name__)
+
+_VERSIONED_ID = re.compile(r"^(?P<id>.+?)(?P<version>v\d+)?$")
+
+
+def split_version(arxiv_id: str) -> tuple[str, str]:
+    """("2301.00001v2" -> ("2301.00001", "v2")); version is "" when absent."""
+    match = _VERSIONED_ID.match(arxiv_id.strip())
+    return match.group("id"), match.group("version") or ""
+
+
+def version_number(version: str) -> int:
+    """("v10" -> 10) so versions compare numerically; "" (unversioned) is 0."""
+    return int(version[1:] or 0)
+
+
+@dataclass
+class StoredPaper:
+    arxiv_id: str
+    version: str
+    sha256: str
+    size: int
+    metadata: dict
+
+
+class ArxivBlobStore:
+    """
+    PDFs under root/blobs named by their sha256, indexed in SQLite by
+    (arXiv ID, version) together with the paper's metadata. Reads verify the
+    hash; least-recently-used papers are evicted past max_bytes, and a blob
+    is deleted once no paper version points at it.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = Path(root)
+        self.blobs = self.root / "blobs"
+        self.blobs.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            str(self.root / "index.sqlite"), check_same_thread=False
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA busy_timeout=5000")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS papers ("
+            "arxiv_id TEXT NOT NULL, version TEXT NOT NULL, sha256 TEXT NOT NULL, "
+            "size INTEGER NOT NULL, metadata TEXT NOT NULL, "
+            "fetched_at REAL NOT NULL, last_used REAL NOT NULL, "
+            "PRIMARY KEY (arxiv_id, version))"
+        )
+        self._db.commit()
+
+    def blob_path(self, sha256: str) -> Path:
+        return self.blobs / sha256[:2] / f"{sha256}.pdf"
+
+    @property
+    def size_bytes(self) -> int:
+        with self._lock:
+            return self._blob_bytes()
+
+    def _blob_bytes(self) -> int:
+        return self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM "
+            "(SELECT DISTINCT sha256, size FROM papers)"
+        ).fetchone()[0]
+
+    def get(self, arxiv_id: str) -> Optional[StoredPaper]:
+        """The requested version, or the latest stored one for an unversioned ID."""
+        base, version = split_version(arxiv_id)
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT arxiv_id, version, sha256, size, metadata FROM papers "
+                "WHERE arxiv_id = ?",
+                (base,),
+            ).fetchall()
+            if version:
+                rows = [row for row in rows if row[1] == version]
+            if not rows:
+                return None
+            row = max(rows, key=lambda r: version_number(r[1]))
+            self._db.execute(
+                "UPDATE papers SET last_used = ? WHERE arxiv_id = ? AND version = ?",
+                (time.time(), row[0], row[1]),
+            )
+            self._db.commit()
+        return StoredPaper(row[0], row[1], row[2], row[3], json.loads(row[4]))
+
+    def read_pdf(self, paper: StoredPaper) -> Optional[bytes]:
+        """The PDF's bytes; None (and the entry dropped) if missing or corrupt."""
+        try:
+            data = self.blob_path(paper.sha256).read_bytes()
+        except OSError:
+            data = None
+        if data is not None and hashlib.sha256(data).hexdigest() == paper.sha256:
+            return data
+        logger.warning(
+            "Stored PDF for %s%s is missing or corrupt; dropping it",
+            paper.arxiv_id,
+            paper.version,
+        )
+        self.remove(paper.arxiv_id, paper.version)
+        return None
+
+    def put(
+        self, arxiv_id: str, version: str, pdf_bytes: bytes, metadata: dict
+    ) -> StoredPaper:
+        base, parsed = split_version(arxiv_id)
+        version = version or parsed
+        sha256 = hashlib.sha256(pdf_bytes).hexdigest()
+        path = self.blob_path(sha256)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(pdf_bytes)
+            os.replace(tmp, path)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO papers (arxiv_id, version, sha256, size, "
+                "metadata, fetched_at, last_used) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (base, version, sha256, len(pdf_bytes), json.dumps(metadata), now, now),
+            )
+            self._db.commit()
+            if self._blob_bytes() > self.max_bytes:
+                self._evict()
+        return StoredPaper(base, version, sha256, len(pdf_bytes), metadata)
+
+    def remove(self, arxiv_id: str, version: str) -> None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT sha256 FROM papers WHERE arxiv_id = ? AND version = ?",
+                (arxiv_id, version),
+            ).fetchone()
+            self._db.execute(
+                "DELETE FROM papers WHERE arxiv_id = ? AND version = ?",
+                (arxiv_id, version),
+            )
+            self._db.commit()
+            if row:
+                self._delete_unreferenced([row[0]])
+
+    def _delete_unreferenced(self, hashes: list[str]) -> None:
+        for sha256 in set(hashes):
+            still_used = self._db.execute(
+                "SELECT 1 FROM papers WHERE sha256 = ? LIMIT 1", (sha256,)
+            ).fetchone()
+            if not still_used:
+                self.blob_path(sha256).unlink(missing_ok=True)
+
+    def _evict(self) -> None:
+        # Drop oldest papers down to 90% of the cap, as the other caches do.
+        excess = self._blob_bytes() - int(self.max_bytes * 0.9)
+        doomed, freed, seen = [], 0, set()
+        for arxiv_id, version, sha256, size in self._db.execute(
+            "SELECT arxiv_id, version, sha256, size FROM papers ORDER BY last_used"
+        ).fetchall():
+            if freed >= excess:
+                break
+            doomed.append((arxiv_id, version, sha256))
+            if sha256 not in seen:
+                seen.add(sha256)
+                freed += size
+        self._db.executemany(
+            "DELETE FROM papers WHERE arxiv_id = ? AND version = ?",
+            [(arxiv_id, version) for arxiv_id, version, _ in doomed],
+        )
+        self._db.commit()
+        self._delete_unreferenced([sha256 for _, _, sha256 in doomed])
+        logger.info("Evicted %d stored arXiv papers", len(doomed))
+
+    def verify(self) -> tuple[int, int]:
+        """Re-hash every stored PDF, dropping bad entries; (ok, dropped)."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT arxiv_id, version, sha256, size, metadata FROM papers"
+            ).fetchall()
+        ok = 0
+        for row in rows:
+            paper = StoredPaper(row[0], row[1], row[2], row[3], json.loads(row[4]))
+            if self.read_pdf(paper) is not None:
+                ok += 1
+        return ok, len(rows) - ok
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_arxiv_store() -> Optional[ArxivBlobStore]:
+    """Process-wide arXiv blob store; None when ARXIV_STORE_PATH is empty."""
+    global _store
+    if not ARXIV_STORE_PATH:
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = ArxivBlobStore(ARXIV_STORE_PATH, ARXIV_STORE_MAX_BYTES)
+        return _store
@@ -0,0 +1,95 @@
+"""Find where a paper's back matter (references, appendices) starts."""
+
+import re
+from typing import Optional
+
+_REFERENCES = (
+    "references",
+    "bibliography",
+    "works cited",
+    "literature cited",
+    "reference list",
+)
+_APPENDICES = ("appendix", "appendices", "supplementary material")
+
+# A line that is only a references heading: plain ("References",
+# "7 REFERENCES", "Bibliography:") or markdown ("## References", "**References**").
+_REFERENCES_HEADING = re.compile(
+    r"[ \t]*(?:#{1,6}[ \t]+)?(?:\*\*)?(?:(?:\d+|[IVXLC]+)\.?[ \t]+)?"
+    r"(?:references|bibliography|works cited|literature cited|reference list)"
+    r"(?:\*\*)?[ \t]*:?[ \t]*",
+    re.IGNORECASE,
+)
+# "Appendix", "Appendix A: Proofs", "## Appendices", "Supplementary Material".
+_APPENDIX_HEADING = re.compile(
+    r"[ \t]*(?:#{1,6}[ \t]+)?(?:\*\*)?"
+    r"(?:appendix|appendices|supplementary materials?)\b[^\n]{0,80}",
+    re.IGNORECASE,
+)
+
+
+def _line(text: str, position: int) -> tuple[int, int]:
+    start = text.rfind("\n", 0, position) + 1
+    end = text.find("\n", position)
+    return start, len(text) if end < 0 else end
+
+
+def _last_heading(text: str, lowered: str, keywords, heading) -> Optional[int]:
+    """Start of the last line matching heading, checking keyword hits only."""
+    best = -1
+    for keyword in keywords:
+        end = len(lowered)
+        while (position := lowered.rfind(keyword, best + 1, end)) >= 0:
+            start, stop = _line(text, position)
+            if heading.fullmatch(text, start, stop):
+                best = start
+                break
+            end = start
+    return best if best >= 0 else None
+
+
+def _first_heading(
+    text: str, lowered: str, keywords, heading, floor: int
+) -> Optional[int]:
+    """Start of the first line at or after floor matching heading."""
+    best = len(text)
+    for keyword in keywords:
+        begin = floor
+        while 0 <= (position := lowered.find(keyword, begin, best)):
+            start, stop = _line(text, position)
+            if start >= floor and heading.fullmatch(text, start, stop):
+                best = start
+                break
+            begin = stop
+    return best if best < len(text) else None
+
+
+def back_matter_start(text: str, strip_appendices: bool = False) -> int:
+    """
+    Offset of the last references heading in text (len(text) if none).
+    Only lines holding a keyword are matched against the heading patterns,
+    so the cost is a lowercase copy plus a few substring scans, linear in
+    the text. With strip_appendices, an earlier appendix heading counts
+    too, unless it sits in the first third of the paper, where it is more
+    likely a table of contents entry.
+    """
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        # A few characters lowercase to two; keep offsets aligned.
+        lowered = "".join(c if len(c.lower()) != 1 else c.lower() for c in text)
+    start = _last_heading(text, lowered, _REFERENCES, _REFERENCES_HEADING)
+    if start is None:
+        start = len(text)
+    if strip_appendices:
+        appendix = _first_heading(
+            text, lowered, _APPENDICES, _APPENDIX_HEADING, len(text) // 3
+        )
+        if appendix is not None:
+            start = min(start, appendix)
+    return start
+
+
+def strip_back_matter(text: str, strip_appendices: bool = False) -> str:
+    """text without its references (and optionally appendices)."""
+    start = back_matter_start(text, strip_appendices)
+    return text[:start].rstrip() if start < len(text) else text
@@ -2,7 +2,8 @@
 
 import logging
 import re
-from typing import Any, List, Optional, Sequence
+from collections import deque
+from typing import Any, Iterable, Iterator, List, Optional, Sequence
 
 from langchain_core.documents import BaseDocumentTransformer, Document
 from langchain_text_splitters import (
@@ -140,6 +141,273 @@ class SectionChunker(BaseDocumentTransformer):
         return all_chunks
 
 
+# RESEARCH_SECTION_PATTERN without "^", for fullmatch() on a line inside a text.
+_RESEARCH_LINE = re.compile(RESEARCH_SECTION_PATTERN.pattern[1:], re.IGNORECASE)
+# Longest line worth testing against the research-section pattern.
+_MAX_HEADING_CHARS = 80
+
+
+class SinglePassSectionChunker(SectionChunker):
+    """
+    SectionChunker that scans each document once: headings (markdown and
+    RESEARCH_SECTION_PATTERN lines) are found line by line, and oversized
+    sections are cut into spans of the original text at the coarsest
+    CHUNK_SEPARATORS that fit, with no rewritten copy of the document and no
+    per-chunk metadata merging. Chunks are text[start:end] of the original
+    (paragraph breaks intact), start_index is the offset in the document,
+    and chunk metadata is built from one dict per section, so values such as
+    paper_metadata are shared rather than copied per chunk.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        # Lines are the coarsest pieces; paragraph breaks are preferred cuts.
+        self._separators = [sep for sep in CHUNK_SEPARATORS if sep != "\n\n"]
+        self._markers = sorted(
+            self.headers_to_split_on, key=lambda header: len(header[0]), reverse=True
+        )
+        self._research_header = dict(self.headers_to_split_on).get("##")
+
+    def _heading(self, text: str, start: int, end: int) -> Optional[tuple]:
+        """(level, metadata key, title) if text[start:end] is a heading line."""
+        if end - start > _MAX_HEADING_CHARS and not text.startswith("#", start):
+            return None
+        line = text[start:end].strip()
+        if line.startswith("#"):
+            for marker, name in self._markers:
+                if line.startswith(marker) and (
+                    len(line) == len(marker) or line[len(marker)] == " "
+                ):
+                    return len(marker), name, line[len(marker) :].strip()
+            return None
+        if self._research_header and line and _RESEARCH_LINE.fullmatch(line):
+            return 2, self._research_header, line.title()
+        return None
+
+    def _pieces(
+        self, text: str, start: int, end: int, level: int = 0
+    ) -> Iterator[tuple[int, int]]:
+        """Cut text[start:end] into spans of at most chunk_size characters."""
+        if end - start <= self.chunk_size:
+            yield start, end
+            return
+        if level == len(self._separators):
+            for cut in range(start, end, self.chunk_size):
+                yield cut, min(cut + self.chunk_size, end)
+            return
+        separator = self._separators[level]
+        found = text.find(separator, start + 1, end)
+        if found < 0:
+            yield from self._pieces(text, start, end, level + 1)
+            return
+        piece = start
+        while found >= 0:
+            # The separator starts the next piece, as keep_separator does.
+            yield from self._pieces(text, piece, found, level + 1)
+            piece = found
+            found = text.find(separator, found + len(separator), end)
+        yield from self._pieces(text, piece, end, level + 1)
+
+    def _paragraph_cut(self, text: str, window: deque) -> int:
+        """Index of the last piece in window's last quarter starting a paragraph."""
+        for index in range(len(window) - 1, 0, -1):
+            piece_start = window[index][0]
+            if piece_start - window[0][0] < self.chunk_size * 3 // 4:
+                break
+            if text.startswith("\n\n", piece_start - 1) or text.startswith(
+                "\n\n", piece_start
+            ):
+                return index
+        return len(window)
+
+    def _spans(self, text: str, start: int, end: int) -> Iterator[tuple[int, int]]:
+        """
+        Pack line-sized pieces into chunks of up to chunk_size. A full chunk
+        ends at a paragraph break in its last quarter when there is one (so
+        chunks stay nearly full), or else carries chunk_overlap characters
+        into the next.
+        """
+        window: deque = deque()
+        for piece_start, piece_end in self._pieces(text, start, end):
+            while window and piece_end - window[0][0] > self.chunk_size:
+                cut = self._paragraph_cut(text, window)
+                yield window[0][0], window[cut - 1][1]
+                if cut < len(window):
+                    for _ in range(cut):
+                        window.popleft()
+                    continue
+                while window and (
+                    window[-1][1] - window[0][0] > self.chunk_overlap
+                    or piece_end - window[0][0] > self.chunk_size
+                ):
+                    window.popleft()
+            window.append((piece_start, piece_end))
+        if window:
+            yield window[0][0], window[-1][1]
+
+    def _section_chunks(
+        self, text: str, start: int, end: int, meta: dict
+    ) -> List[Document]:
+        spans = []
+        for span_start, span_end in self._spans(text, start, end):
+            while span_start < span_end and text[span_start].isspace():
+                span_start += 1
+            while span_end > span_start and text[span_end - 1].isspace():
+                span_end -= 1
+            if span_end > span_start:
+                spans.append((span_start, span_end))
+        chunks = []
+        for index, (span_start, span_end) in enumerate(spans):
+            if span_end - span_start < self.min_chunk_length:
+                continue
+            chunks.append(
+                Document(
+                    page_content=text[span_start:span_end],
+                    metadata={
+                        **meta,
+                        "chunk_index": index,
+                        "chunk_total": len(spans),
+                        "start_index": span_start,
+                    },
+                )
+            )
+        return chunks
+
+    def _section(
+        self, text: str, start: int, end: int, doc: Document, headers: dict
+    ) -> List[Document]:
+        if start >= end:
+            return []
+        section_title, section_level = self._merge_section_metadata(headers)
+        meta = {
+            **doc.metadata,
+            **headers,
+            "section_title": section_title,
+            "section_level": section_level,
+        }
+        return self._section_chunks(text, start, end, meta)
+
+    def transform_documents(
+        self,
+        documents: Sequence[Document],
+        **kwargs: Any,
+    ) -> List[Document]:
+        """Split documents by headings, then cut long sections, in one scan."""
+        all_chunks: List[Document] = []
+        for doc in documents:
+            text = doc.page_content
+            if not text or text.isspace():
+                continue
+            headers: dict = {}
+            levels: dict = {}
+            section_start, position, in_code = 0, 0, False
+            while position <= len(text):
+                line_end = text.find("\n", position)
+                if line_end < 0:
+                    line_end = len(text)
+                if text.startswith(("```", "~~~"), position):
+                    in_code = not in_code
+                heading = None if in_code else self._heading(text, position, line_end)
+                if heading is not None:
+                    all_chunks.extend(
+                        self._section(text, section_start, position, doc, headers)
+                    )
+                    level, name, title = heading
+                    for deeper in [k for k, v in levels.items() if v >= level]:
+                        del headers[deeper], levels[deeper]
+                    headers[name], levels[name] = title, level
+                    section_start = line_end + 1
+                position = line_end + 1
+            all_chunks.extend(
+                self._section(text, section_start, len(text), doc, headers)
+            )
+        return all_chunks
+
+
+def _split(chunker: BaseDocumentTransformer, doc: Document) -> List[Document]:
+    if hasattr(chunker, "split_documents"):
+        chunks = chunker.split_documents([doc])
+    else:
+        chunks = chunker.transform_documents([doc])
+    return [c for c in chunks if getattr(c, "page_content", "").strip()]
+
+
+def _is_heading(line: str) -> bool:
+    stripped = line.strip()
+    return stripped.startswith("#") or bool(RESEARCH_SECTION_PATTERN.match(stripped))
+
+
+def _carry_cut(text: str, carry_chars: int) -> int:
+    """Where to cut text so the tail carried into the next page is small."""
+    floor = max(0, len(text) - carry_chars)
+    for separator in ("\n\n", "\n"):
+        cut = text.rfind(separator, floor)
+        # A heading goes with the text under it, not at the end of the head.
+        while cut > 0:
+            head = text[:cut].rstrip()
+            line_start = head.rfind("\n") + 1
+            if not _is_heading(head[line_start:]):
+                break
+            cut = line_start - 1
+        if cut > 0:
+            return cut
+    return len(text)
+
+
+def iter_chunks(
+    chunker: BaseDocumentTransformer,
+    pages: Iterable[Document],
+    carry_chars: int = CHUNK_SIZE,
+) -> Iterator[Document]:
+    """
+    Chunk a stream of page Documents without joining them into one text.
+
+    Each page is chunked together with the tail carried over from the page
+    before (the text after its last line break within carry_chars), so a
+    paragraph running across a page break still ends up in one chunk, and
+    only one page plus that tail is held at a time. Chunks keep the
+    page_number they start on and get a document-wide chunk_index unless the
+    chunker set one; chunk_total is left unset since it is not known yet.
+    Chunks before the first heading of a page inherit the previous section.
+    """
+    carry, carry_page = "", None
+    meta: dict = {}
+    section: Optional[tuple[str, int]] = None
+    index = 0
+
+    def emit(text: str, first_page) -> Iterator[Document]:
+        nonlocal section, index
+        chunks = _split(chunker, Document(page_content=text, metadata=dict(meta)))
+        for position, chunk in enumerate(chunks):
+            if position == 0 and first_page is not None:
+                chunk.metadata["page_number"] = first_page
+            if chunk.metadata.get("section_title") == "Unknown" and section:
+                chunk.metadata["section_title"], chunk.metadata["section_level"] = (
+                    section
+                )
+            if "section_title" in chunk.metadata:
+                section = (
+                    chunk.metadata["section_title"],
+                    chunk.metadata.get("section_level", 0),
+                )
+            chunk.metadata.setdefault("chunk_index", index)
+            index += 1
+            yield chunk
+
+    for page in pages:
+        meta = page.metadata
+        if not carry.strip():
+            carry, carry_page = "", meta.get("page_number")
+        text = f"{carry}\n{page.page_content}" if carry else page.page_content
+        cut = _carry_cut(text, carry_chars)
+        head, carry = text[:cut], text[cut:]
+        if head.strip():
+            yield from emit(head, carry_page)
+            carry_page = meta.get("page_number")
+    if carry.strip():
+        yield from emit(carry, carry_page)
+
+
 def get_chunker(
     strategy: str = "recursive",
     chunk_size: int = CHUNK_SIZE,
@@ -170,7 +438,7 @@ def get_chunker(
             add_start_index=True,
         )
     if strategy == "section":
-        return SectionChunker(
+        return SinglePassSectionChunker(
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
             min_chunk_length=min_chunk_length,
@@ -1,20 +1,23 @@
 """Document loading and preprocessing utilities."""
 
-import json
-import tempfile
-import urllib.request
-from typing import Any
+from typing import Any, Optional
 
 from backend.config.settings import (
+    ARXIV_OFFLINE,
     CHUNK_OVERLAP,
     CHUNK_SEPARATORS,
     CHUNK_SIZE,
     MIN_CHUNK_LENGTH,
     PAPER_IDS,
+    STRIP_APPENDICES,
 )
+from backend.src.data.arxiv_download import get_arxiv_downloader
+from backend.src.data.arxiv_metadata import ArxivRecord, get_arxiv_resolver
+from backend.src.data.arxiv_store import get_arxiv_store
+from backend.src.data.backmatter import strip_back_matter
 from backend.src.data.chunking import get_chunker
+from backend.src.data.extraction import iter_pdf_pages
 
-import fitz
 from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
@@ -97,7 +100,37 @@ def load_arxiv_documents():
     return docs
 
 
-def load_single_arxiv_document(paper_id):
+def fetch_arxiv_paper(
+    paper_id: str, record: Optional[ArxivRecord] = None
+) -> Optional[tuple[bytes, dict]]:
+    """
+    PDF bytes and metadata for an arXiv ID, from the local arXiv store when it
+    has the paper and from arXiv otherwise (then kept in the store). With
+    ARXIV_OFFLINE set, only the store is consulted. A record resolved ahead
+    of time (see arxiv_metadata) saves the per-paper metadata query.
+    """
+    store = get_arxiv_store()
+    stored = store.get(paper_id) if store is not None else None
+    if stored is not None:
+        pdf_bytes = store.read_pdf(stored)
+        if pdf_bytes is not None:
+            return pdf_bytes, {**stored.metadata, "source": f"arxiv:{paper_id}"}
+    if ARXIV_OFFLINE:
+        print(f"Paper {paper_id} is not in the local arXiv store (offline mode)")
+        return None
+
+    record = record or get_arxiv_resolver().resolve_one(paper_id)
+    if record is None:
+        print(f"No arXiv result returned for paper ID: {paper_id}")
+        return None
+    pdf_bytes = get_arxiv_downloader().fetch(record.pdf_url)
+    metadata = {**record.metadata, "source": f"arxiv:{paper_id}"}
+    if store is not None:
+        store.put(paper_id, record.version, pdf_bytes, metadata)
+    return pdf_bytes, metadata
+
+
+def load_single_arxiv_document(paper_id, record: Optional[ArxivRecord] = None):
     """Load a single document from Arxiv based on paper ID."""
     if not paper_id or paper_id.strip() == "":
         print("Error: Empty paper ID provided")
@@ -109,32 +142,13 @@ def load_single_arxiv_document(paper_id):
         if paper_id.startswith(("arXiv:", "arxiv:")):
             paper_id = paper_id.split(":")[-1].strip()
 
-        import arxiv
-
-        client = arxiv.Client(page_size=1, delay_seconds=3, num_retries=3)
-        search = arxiv.Search(id_list=[paper_id], max_results=1)
-        result = next(client.results(search), None)
-        if result is None:
-            print(f"No arXiv result returned for paper ID: {paper_id}")
+        fetched = fetch_arxiv_paper(paper_id, record)
+        if fetched is None:
             return None
-
-        with tempfile.TemporaryDirectory() as tmpdir:
-            pdf_path = f"{tmpdir}/{paper_id}.pdf"
-            urllib.request.urlretrieve(result.pdf_url, pdf_path)
-            with fitz.open(pdf_path) as pdf:
-                text = "\n".join(page.get_text() for page in pdf)
-
-        metadata = {
-            "Title": result.title or "Untitled",
-            "Authors": ", ".join(str(author) for author in result.authors),
-            "Summary": result.summary or "",
-            "Published": result.published.isoformat() if result.published else "",
-            "primary_category": result.primary_category or "",
-            "Categories": ", ".join(result.categories or []),
-            "entry_id": result.entry_id or "",
-            "doi": result.doi or "",
-            "source": f"arxiv:{paper_id}",
-        }
+        pdf_bytes, metadata = fetched
+        # Flat pages, from the extraction cache when this PDF was seen before.
+        pages = iter_pdf_pages(pdf_bytes, f"{paper_id}.pdf", use_structure=False)
+        text = "\n".join(page.page_content for page in pages)
         doc = [Document(page_content=text, metadata=metadata)]
 
         # Validate document content
@@ -152,17 +166,15 @@ def load_single_arxiv_document(paper_id):
         return None
 
 
-def preprocess_documents(docs):
-    """Preprocess documents by truncating at References section."""
+def preprocess_documents(docs, strip_appendices: bool = STRIP_APPENDICES):
+    """Preprocess documents by truncating at the References section."""
     processed_docs = []
 
     for doc in docs:
         if not doc or len(doc) == 0 or not hasattr(doc[0], "page_content"):
             continue
 
-        content = json.dumps(doc[0].page_content)
-        if "References" in content:
-            doc[0].page_content = content[: content.index("References")]
+        doc[0].page_content = strip_back_matter(doc[0].page_content, strip_appendices)
         processed_docs.append(doc)
 
     return processed_docs
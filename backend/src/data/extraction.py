@@ -1,10 +1,20 @@
 """Structured PDF extraction using pymupdf4llm with fallback to flat extraction."""
 
 import logging
-from typing import List, Union
+import zlib
+from typing import Iterable, Iterator, List, Optional, Union
 
 from langchain_core.documents import Document
 
+from backend.config.settings import PDF_PAGE_BATCH
+from backend.src.data.extraction_cache import (
+    CachedExtraction,
+    PageRecorder,
+    extractor_name,
+    get_extraction_cache,
+    pdf_hash,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -31,18 +41,24 @@ def extract_pdf_with_structure(
     """
     import fitz
 
+    metadata = {"Title": filename, "source": filename}
+    mode, cache = _mode(use_structure), get_extraction_cache()
+    if cache is not None:
+        key, extractor = pdf_hash(pdf_bytes), extractor_name(use_structure)
+        cached = cache.get(key, extractor, mode)
+        if cached is not None:
+            return Document(page_content=cached.text(), metadata=metadata)
+
     doc_reader = None
     try:
         doc_reader = fitz.open(stream=pdf_bytes, filetype="pdf")
-        metadata = {"Title": filename, "source": filename}
 
         if use_structure:
+            markdown = None
             try:
                 import pymupdf4llm
 
                 markdown = pymupdf4llm.to_markdown(doc_reader)
-                if markdown and markdown.strip():
-                    return Document(page_content=markdown, metadata=metadata)
             except ImportError:
                 logger.debug(
                     "pymupdf4llm not installed, falling back to flat extraction"
@@ -52,13 +68,22 @@ def extract_pdf_with_structure(
                     "pymupdf4llm extraction failed (%s), falling back to flat extraction",
                     str(e),
                 )
+            if markdown and markdown.strip():
+                if cache is not None:
+                    compressed = zlib.compress(markdown.encode("utf-8"))
+                    cache.put(key, extractor, mode, CachedExtraction(compressed))
+                return Document(page_content=markdown, metadata=metadata)
 
         # Flat extraction fallback
-        text = ""
-        for page in doc_reader:
-            text += page.get_text()
+        pages = [page.get_text() for page in doc_reader]
+        text = "".join(pages)
         if not text.strip():
             raise ValueError("No text content found in PDF")
+        if cache is not None:
+            recorder = PageRecorder()
+            for page in pages:
+                recorder.add(page)
+            cache.put(key, extractor, mode, recorder.finish())
         return Document(page_content=text, metadata=metadata)
 
     except Exception as e:
@@ -67,3 +92,101 @@ def extract_pdf_with_structure(
     finally:
         if doc_reader:
             doc_reader.close()
+
+
+def _markdown_pages(to_markdown, doc_reader, pages: list[int]) -> Optional[list]:
+    """Markdown per page via pymupdf4llm, or None to fall back to flat text."""
+    try:
+        results = to_markdown(doc_reader, pages=pages, page_chunks=True)
+    except Exception as e:
+        logger.warning(
+            "pymupdf4llm failed on pages %d-%d (%s), using flat text",
+            pages[0] + 1,
+            pages[-1] + 1,
+            str(e),
+        )
+        return None
+    if len(results) != len(pages):
+        return None
+    return [result.get("text", "") for result in results]
+
+
+def _mode(use_structure: bool) -> str:
+    return "structure" if use_structure else "flat"
+
+
+def _extract_page_texts(
+    pdf_bytes: bytes, use_structure: bool, pages_per_batch: int
+) -> Iterator[str]:
+    """Every page's text in order (empty pages included), a batch at a time."""
+    import fitz
+
+    to_markdown = None
+    if use_structure:
+        try:
+            import pymupdf4llm
+
+            to_markdown = pymupdf4llm.to_markdown
+        except ImportError:
+            logger.debug("pymupdf4llm not installed, falling back to flat extraction")
+
+    doc_reader = fitz.open(stream=pdf_bytes, filetype="pdf")
+    try:
+        page_count, step = doc_reader.page_count, max(1, pages_per_batch)
+        for start in range(0, page_count, step):
+            pages = list(range(start, min(start + step, page_count)))
+            texts = None
+            if to_markdown is not None:
+                texts = _markdown_pages(to_markdown, doc_reader, pages)
+            if texts is None:
+                texts = [doc_reader[number].get_text() for number in pages]
+            yield from texts
+    finally:
+        doc_reader.close()
+
+
+def iter_pdf_pages(
+    pdf_bytes: bytes,
+    filename: str,
+    use_structure: bool = True,
+    *,
+    metadata: Optional[dict] = None,
+    pages_per_batch: int = PDF_PAGE_BATCH,
+) -> Iterator[Document]:
+    """
+    Yield a PDF one page at a time, for documents too long to hold as one text.
+
+    Each Document carries the page's text (markdown when structured) and
+    metadata with Title, source and page_number (1-based), plus any extra
+    metadata given. Structured extraction runs pymupdf4llm on pages_per_batch
+    pages per call, so only one batch of text exists at any time; a batch it
+    fails on falls back to flat text. Pages come from the extraction cache
+    when this PDF was extracted page by page before, and are stored there
+    once all are read. Raises ValueError if no page has text.
+    """
+    base = {"Title": filename, "source": filename, **(metadata or {})}
+    cache = get_extraction_cache()
+    texts: Optional[Iterable[str]] = None
+    recorder: Optional[PageRecorder] = None
+    if cache is not None:
+        key, extractor = pdf_hash(pdf_bytes), extractor_name(use_structure)
+        cached = cache.get(key, extractor, _mode(use_structure))
+        if cached is not None and cached.offsets is not None:
+            texts = cached.pages()
+        else:
+            recorder = PageRecorder()
+    if texts is None:
+        texts = _extract_page_texts(pdf_bytes, use_structure, pages_per_batch)
+
+    found_text = False
+    for number, text in enumerate(texts, start=1):
+        if recorder is not None:
+            recorder.add(text)
+        if not text.strip():
+            continue
+        found_text = True
+        yield Document(page_content=text, metadata={**base, "page_number": number})
+    if not found_text:
+        raise ValueError("No text content found in PDF")
+    if recorder is not None:
+        cache.put(key, extractor, _mode(use_structure), recorder.finish())
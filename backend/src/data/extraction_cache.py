@@ -0,0 +1,210 @@
+"""On-disk cache of extracted PDF text, keyed by the PDF's content hash."""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+from backend.config.settings import EXTRACTION_CACHE_MAX_BYTES, EXTRACTION_CACHE_PATH
+
+logger = logging.getLogger(__name__)
+
+# Compressed bytes fed to the decompressor per step when streaming pages.
+_READ_STEP = 64 * 1024
+
+
+def pdf_hash(pdf_bytes: bytes) -> bytes:
+    return hashlib.sha256(pdf_bytes).digest()
+
+
+def extractor_name(structured: bool) -> str:
+    """Extractor and version, so upgrading either invalidates its entries."""
+    if structured:
+        try:
+            import pymupdf4llm
+
+            return f"pymupdf4llm {getattr(pymupdf4llm, '__version__', '?')}"
+        except ImportError:
+            pass
+    import fitz
+
+    version = getattr(fitz, "__version__", None) or getattr(fitz, "VersionBind", "?")
+    return f"pymupdf {version}"
+
+
+@dataclass
+class CachedExtraction:
+    """
+    zlib-compressed UTF-8 text, plus page boundaries (byte offsets, one more
+    than the page count) when it was extracted page by page.
+    """
+
+    blob: bytes
+    offsets: Optional[list[int]] = None
+
+    def text(self) -> str:
+        return zlib.decompress(self.blob).decode("utf-8")
+
+    def pages(self) -> Iterator[str]:
+        """Page texts, decompressed a step at a time rather than all at once."""
+        if self.offsets is None:
+            raise ValueError("Extraction was not stored page by page")
+        decompressor = zlib.decompressobj()
+        buffer, base, position = b"", 0, 0
+        for start, end in zip(self.offsets, self.offsets[1:]):
+            while base + len(buffer) < end and position < len(self.blob):
+                buffer += decompressor.decompress(
+                    self.blob[position : position + _READ_STEP]
+                )
+                position += _READ_STEP
+            if base + len(buffer) < end:
+                buffer += decompressor.flush()
+            yield buffer[start - base : end - base].decode("utf-8")
+            buffer, base = buffer[end - base :], end
+
+
+class PageRecorder:
+    """Compress pages as they are extracted, for storing once all are seen."""
+
+    def __init__(self):
+        self._compressor = zlib.compressobj()
+        self._parts: list[bytes] = []
+        self.offsets = [0]
+
+    def add(self, text: str) -> None:
+        data = text.encode("utf-8")
+        self._parts.append(self._compressor.compress(data))
+        self.offsets.append(self.offsets[-1] + len(data))
+
+    def finish(self) -> CachedExtraction:
+        self._parts.append(self._compressor.flush())
+        return CachedExtraction(b"".join(self._parts), list(self.offsets))
+
+
+class ExtractionCacheStore:
+    """
+    SQLite table of compressed extractions keyed by (sha256 of the PDF,
+    extractor and version, extraction mode), with least-recently-used
+    eviction past max_bytes.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA busy_timeout=5000")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS extractions ("
+            "pdf_hash BLOB NOT NULL, extractor TEXT NOT NULL, mode TEXT NOT NULL, "
+            "text BLOB NOT NULL, page_offsets BLOB, size INTEGER NOT NULL, "
+            "last_used REAL NOT NULL, "
+            "PRIMARY KEY (pdf_hash, extractor, mode))"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS ix_extractions_last_used "
+            "ON extractions(last_used)"
+        )
+        self._db.commit()
+        self._bytes = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM extractions"
+        ).fetchone()[0]
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: bytes, extractor: str, mode: str) -> Optional[CachedExtraction]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT text, page_offsets FROM extractions "
+                "WHERE pdf_hash = ? AND extractor = ? AND mode = ?",
+                (key, extractor, mode),
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute(
+                "UPDATE extractions SET last_used = ? "
+                "WHERE pdf_hash = ? AND extractor = ? AND mode = ?",
+                (time.time(), key, extractor, mode),
+            )
+            self._db.commit()
+        blob, offsets = row
+        return CachedExtraction(
+            blob, array("Q", offsets).tolist() if offsets is not None else None
+        )
+
+    def put(
+        self, key: bytes, extractor: str, mode: str, extraction: CachedExtraction
+    ) -> None:
+        offsets = (
+            array("Q", extraction.offsets).tobytes()
+            if extraction.offsets is not None
+            else None
+        )
+        size = len(extraction.blob) + len(offsets or b"")
+        with self._lock:
+            previous = self._db.execute(
+                "SELECT size FROM extractions "
+                "WHERE pdf_hash = ? AND extractor = ? AND mode = ?",
+                (key, extractor, mode),
+            ).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO extractions "
+                "(pdf_hash, extractor, mode, text, page_offsets, size, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, extractor, mode, extraction.blob, offsets, size, time.time()),
+            )
+            self._db.commit()
+            self._bytes += size - (previous[0] if previous else 0)
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        # Drop oldest entries down to 90% of the cap, as the embedding cache does.
+        excess = self._bytes - int(self.max_bytes * 0.9)
+        doomed, freed = [], 0
+        for rowid, size in self._db.execute(
+            "SELECT rowid, size FROM extractions ORDER BY last_used"
+        ):
+            if freed >= excess:
+                break
+            doomed.append((rowid,))
+            freed += size
+        self._db.executemany("DELETE FROM extractions WHERE rowid = ?", doomed)
+        self._db.commit()
+        self._bytes -= freed
+        logger.info(
+            "Evicted %d cached extractions; cache is %d bytes",
+            len(doomed),
+            self._bytes,
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+_cache_store = None
+_cache_store_lock = threading.Lock()
+
+
+def get_extraction_cache() -> Optional[ExtractionCacheStore]:
+    """Process-wide extraction cache; None when EXTRACTION_CACHE_PATH is empty."""
+    global _cache_store
+    if not EXTRACTION_CACHE_PATH:
+        return None
+    with _cache_store_lock:
+        if _cache_store is None:
+            _cache_store = ExtractionCacheStore(
+                EXTRACTION_CACHE_PATH, EXTRACTION_CACHE_MAX_BYTES
+            )
+        return _cache_store
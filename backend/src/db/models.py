@@ -4,7 +4,16 @@ import enum
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import DateTime, Enum, ForeignKey, Integer, String, Text, func
+from sqlalchemy import (
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    func,
+)
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -16,6 +25,13 @@ class ChunkingStrategy(str, enum.Enum):
     semantic = "semantic"
 
 
+class RetrievalMode(str, enum.Enum):
+    """Search strategy used when chatting against a knowledge base."""
+
+    flat = "flat"
+    two_stage = "two_stage"
+
+
 class Base(DeclarativeBase):
     """Declarative base for all models."""
 
@@ -117,6 +133,16 @@ class KnowledgeBase(TimestampMixin, Base):
     chunking_strategy: Mapped[ChunkingStrategy] = mapped_column(
         Enum(ChunkingStrategy), default=ChunkingStrategy.recursive, nullable=False
     )
+    retrieval_mode: Mapped[RetrievalMode] = mapped_column(
+        Enum(RetrievalMode),
+        default=RetrievalMode.flat,
+        server_default=RetrievalMode.flat.value,
+        nullable=False,
+    )
+    # Adaptive top-k overrides; NULL falls back to the ADAPTIVE_* settings.
+    min_k: Mapped[Optional[int]] = mapped_column(nullable=True)
+    max_k: Mapped[Optional[int]] = mapped_column(nullable=True)
+    score_threshold: Mapped[Optional[float]] = mapped_column(nullable=True)
 
     owner: Mapped[Optional["User"]] = relationship(
         "User", back_populates="knowledge_bases"
@@ -132,6 +158,8 @@ class KnowledgeBaseDocument(Base):
     """Tracks documents ingested into a knowledge base."""
 
     __tablename__ = "knowledge_base_documents"
+    # Keyset pagination and per-KB counts both walk (kb_id, id).
+    __table_args__ = (Index("ix_knowledge_base_documents_kb_id_id", "kb_id", "id"),)
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     kb_id: Mapped[int] = mapped_column(
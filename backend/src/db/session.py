@@ -1,13 +1,28 @@
 """Database session and engine for PostgreSQL."""
 
+import logging
 from typing import Generator
 
 from backend.config.postgres import get_postgres_config
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.schema import CreateColumn, CreateIndex
+from sqlalchemy.types import SchemaType
 
 from backend.src.db.models import Base
 
+logger = logging.getLogger(__name__)
+
+# Columns and indexes added to tables after they first shipped. create_all
+# only creates missing tables, so migrate_schema adds these to databases
+# created earlier.
+ADDED_COLUMNS = {
+    "knowledge_bases": ["retrieval_mode", "min_k", "max_k", "score_threshold"],
+}
+ADDED_INDEXES = {
+    "knowledge_base_documents": ["ix_knowledge_base_documents_kb_id_id"],
+}
+
 
 def get_engine():
     """Create SQLAlchemy engine from PostgreSQL config."""
@@ -25,14 +40,50 @@ engine = get_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+def migrate_schema(bind) -> None:
+    """
+    Add ADDED_COLUMNS and ADDED_INDEXES missing from existing tables; safe
+    to run repeatedly.
+    """
+    inspector = inspect(bind)
+    with bind.begin() as conn:
+        for table_name, column_names in ADDED_COLUMNS.items():
+            if not inspector.has_table(table_name):
+                continue
+            present = {column["name"] for column in inspector.get_columns(table_name)}
+            table = Base.metadata.tables[table_name]
+            for name in column_names:
+                if name in present:
+                    continue
+                column = table.c[name]
+                if isinstance(column.type, SchemaType):
+                    # Postgres enums are types of their own.
+                    column.type.create(conn, checkfirst=True)
+                ddl = CreateColumn(column).compile(dialect=conn.dialect)
+                # IF NOT EXISTS keeps concurrent startups from colliding.
+                guard = "IF NOT EXISTS " if conn.dialect.name == "postgresql" else ""
+                conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {guard}{ddl}"))
+                logger.info("Added column %s.%s", table_name, name)
+        for table_name, index_names in ADDED_INDEXES.items():
+            if not inspector.has_table(table_name):
+                continue
+            present = {index["name"] for index in inspector.get_indexes(table_name)}
+            indexes = {
+                index.name: index for index in Base.metadata.tables[table_name].indexes
+            }
+            for name in index_names:
+                if name in present:
+                    continue
+                conn.execute(CreateIndex(indexes[name], if_not_exists=True))
+                logger.info("Added index %s", name)
+
+
 def init_db() -> None:
-    """Create all tables in the database."""
+    """Create all tables in the database and add columns they are missing."""
     try:
         Base.metadata.create_all(bind=engine)
+        migrate_schema(engine)
     except Exception as e:
-        import logging
-
-        logger = logging.getLogger(__name__)
         logger.error(
             f"Failed to initialize database: {e}\n"
             f"Please ensure PostgreSQL is running and credentials in .env are correct.\n"
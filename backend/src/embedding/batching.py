@@ -0,0 +1,166 @@
+"""Cross-request micro-batching of embedding calls."""
+
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Optional
+
+from backend.config.settings import EMBED_BATCH_MAX_SIZE, EMBED_BATCH_MAX_WAIT_MS
+
+logger = logging.getLogger(__name__)
+
+QUERY = "query"
+PASSAGE = "passage"
+
+
+@dataclass
+class _Pending:
+    texts: list[str]
+    input_type: str
+    future: Future = field(default_factory=Future)
+
+
+class EmbeddingDispatcher:
+    """
+    Coalesces embedding requests from concurrent callers into batched calls.
+
+    A background thread takes the first pending request, keeps collecting
+    for up to max_wait_ms or until max_batch_size texts are queued, then
+    sends one upstream call per input type and resolves every caller's
+    future with its slice of the result. Callers larger than a batch on
+    their own (e.g. a whole paper's chunks) skip the queue.
+    """
+
+    def __init__(
+        self,
+        embedder,
+        *,
+        max_batch_size: int = EMBED_BATCH_MAX_SIZE,
+        max_wait_ms: float = EMBED_BATCH_MAX_WAIT_MS,
+    ):
+        self.embedder = embedder
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: "queue.Queue[_Pending]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_pid: Optional[int] = None
+        self.requests = 0
+        self.upstream_calls = 0
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "upstream_calls": self.upstream_calls,
+            "requests_per_call": (
+                round(self.requests / self.upstream_calls, 2)
+                if self.upstream_calls
+                else 0.0
+            ),
+        }
+
+    def _ensure_worker(self) -> None:
+        # Threads don't survive fork; a forked worker process starts its own.
+        pid = os.getpid()
+        if self._worker is not None and self._worker_pid == pid:
+            return
+        with self._lock:
+            if self._worker is None or self._worker_pid != pid:
+                self._queue = queue.Queue()
+                self._worker = threading.Thread(
+                    target=self._run, name="embedding-dispatcher", daemon=True
+                )
+                self._worker_pid = pid
+                self._worker.start()
+
+    def _embed(self, texts: list[str], input_type: str) -> list[list[float]]:
+        from backend.src.embedding.embeddings import embed_queries
+
+        with self._lock:
+            self.upstream_calls += 1
+        if input_type == QUERY:
+            return embed_queries(self.embedder, texts)
+        return self.embedder.embed_documents(texts)
+
+    def embed(self, texts: list[str], input_type: str) -> list[list[float]]:
+        """Embed texts, batched with whatever other callers send meanwhile."""
+        if not texts:
+            return []
+        with self._lock:
+            self.requests += 1
+        if len(texts) >= self.max_batch_size or self.max_wait <= 0:
+            return self._embed(list(texts), input_type)
+        self._ensure_worker()
+        pending = _Pending(list(texts), input_type)
+        self._queue.put(pending)
+        return pending.future.result()
+
+    def _collect(self, first: _Pending) -> list[_Pending]:
+        batch = [first]
+        size = len(first.texts)
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                pending = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(pending)
+            size += len(pending.texts)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect(self._queue.get())
+            for input_type in (QUERY, PASSAGE):
+                group = [p for p in batch if p.input_type == input_type]
+                if group:
+                    self._dispatch(group, input_type)
+
+    def _dispatch(self, group: list[_Pending], input_type: str) -> None:
+        texts = [text for pending in group for text in pending.texts]
+        try:
+            vectors = self._embed(texts, input_type)
+        except Exception as exc:
+            for pending in group:
+                pending.future.set_exception(exc)
+            return
+        logger.debug(
+            "Embedded %d %s texts for %d callers in one call",
+            len(texts),
+            input_type,
+            len(group),
+        )
+        start = 0
+        for pending in group:
+            end = start + len(pending.texts)
+            pending.future.set_result(vectors[start:end])
+            start = end
+
+
+class BatchingEmbeddings:
+    """Embeddings interface whose calls go through an EmbeddingDispatcher."""
+
+    def __init__(self, inner, dispatcher: Optional[EmbeddingDispatcher] = None):
+        self.inner = inner
+        self.dispatcher = dispatcher or EmbeddingDispatcher(inner)
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.dispatcher.embed([text], QUERY)[0]
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        return self.dispatcher.embed(texts, QUERY)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.dispatcher.embed(texts, PASSAGE)
+
+    def __getattr__(self, name: str):
+        if name == "inner":
+            raise AttributeError(name)
+        return getattr(self.inner, name)
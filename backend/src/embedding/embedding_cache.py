@@ -0,0 +1,234 @@
+"""Persistent, content-addressed cache in front of an embeddings model."""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+QUERY = "query"
+PASSAGE = "passage"
+# SQLite caps bound parameters per statement; stay well under the old 999.
+_LOOKUP_CHUNK = 500
+
+
+def text_hash(text: str) -> bytes:
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+class EmbeddingCacheStore:
+    """
+    SQLite table of float32 vectors keyed by (model, truncate, input type,
+    sha256(text)), with least-recently-used eviction past max_bytes.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA busy_timeout=5000")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "model TEXT NOT NULL, truncate TEXT NOT NULL, input_type TEXT NOT NULL, "
+            "text_hash BLOB NOT NULL, vector BLOB NOT NULL, "
+            "last_used REAL NOT NULL, "
+            "PRIMARY KEY (model, truncate, input_type, text_hash))"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS ix_embeddings_last_used "
+            "ON embeddings(last_used)"
+        )
+        self._db.commit()
+        self._bytes = self._db.execute(
+            "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+        ).fetchone()[0]
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def get_many(
+        self, model: str, truncate: str, input_type: str, hashes: Sequence[bytes]
+    ) -> dict[bytes, list[float]]:
+        found: dict[bytes, list[float]] = {}
+        unique = list(dict.fromkeys(hashes))
+        with self._lock:
+            for start in range(0, len(unique), _LOOKUP_CHUNK):
+                chunk = unique[start : start + _LOOKUP_CHUNK]
+                rows = self._db.execute(
+                    "SELECT text_hash, vector FROM embeddings "
+                    "WHERE model = ? AND truncate = ? AND input_type = ? "
+                    f"AND text_hash IN ({','.join('?' * len(chunk))})",
+                    [model, truncate, input_type, *chunk],
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+            if found:
+                now = time.time()
+                self._db.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? "
+                    "AND truncate = ? AND input_type = ? AND text_hash = ?",
+                    [(now, model, truncate, input_type, key) for key in found],
+                )
+                self._db.commit()
+        return found
+
+    def put_many(
+        self,
+        model: str,
+        truncate: str,
+        input_type: str,
+        items: Sequence[tuple[bytes, Sequence[float]]],
+    ) -> None:
+        if not items:
+            return
+        now = time.time()
+        rows = [
+            (
+                model,
+                truncate,
+                input_type,
+                key,
+                np.asarray(vector, dtype=np.float32).tobytes(),
+                now,
+            )
+            for key, vector in items
+        ]
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO embeddings "
+                "(model, truncate, input_type, text_hash, vector, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._db.commit()
+            self._bytes += sum(len(row[4]) for row in rows)
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        # Drop oldest entries down to 90% of the cap, so eviction is not
+        # repeated on every insert once the cache is full.
+        self._bytes = self._db.execute(
+            "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+        ).fetchone()[0]
+        excess = self._bytes - int(self.max_bytes * 0.9)
+        doomed, freed = [], 0
+        for rowid, size in self._db.execute(
+            "SELECT rowid, LENGTH(vector) FROM embeddings ORDER BY last_used"
+        ):
+            if freed >= excess:
+                break
+            doomed.append((rowid,))
+            freed += size
+        self._db.executemany("DELETE FROM embeddings WHERE rowid = ?", doomed)
+        self._db.commit()
+        self._bytes -= freed
+        logger.info(
+            "Evicted %d cached embeddings; cache is %d bytes", len(doomed), self._bytes
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class CachedEmbeddings:
+    """
+    Embeddings wrapper that only sends cache misses upstream.
+
+    Exposes embed_documents / embed_query / embed_queries like the wrapped
+    model. Queries and passages are cached separately, since asymmetric
+    models embed them differently.
+    """
+
+    def __init__(
+        self,
+        inner,
+        store: EmbeddingCacheStore,
+        *,
+        model: Optional[str] = None,
+        truncate: Optional[str] = None,
+    ):
+        self.inner = inner
+        self.store = store
+        self.model = model or str(getattr(inner, "model", type(inner).__name__))
+        self.truncate = truncate or str(getattr(inner, "truncate", ""))
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 4),
+            "size_bytes": self.store.size_bytes,
+        }
+
+    def _cached(
+        self,
+        texts: Sequence[str],
+        input_type: str,
+        embed_misses: Callable[[list[str]], list[list[float]]],
+    ) -> list[list[float]]:
+        if not texts:
+            return []
+        hashes = [text_hash(text) for text in texts]
+        found = self.store.get_many(self.model, self.truncate, input_type, hashes)
+
+        # Duplicate texts in one batch are embedded once.
+        missing: dict[bytes, str] = {}
+        for key, text in zip(hashes, texts):
+            if key not in found:
+                missing.setdefault(key, text)
+        misses = sum(1 for key in hashes if key not in found)
+        self.hits += len(texts) - misses
+        self.misses += misses
+        if missing:
+            vectors = embed_misses(list(missing.values()))
+            fresh = list(zip(missing.keys(), vectors))
+            self.store.put_many(self.model, self.truncate, input_type, fresh)
+            found.update(fresh)
+        logger.debug(
+            "Embedding cache: %d/%d %s hits (%.0f%% overall)",
+            len(texts) - misses,
+            len(texts),
+            input_type,
+            self.hit_rate * 100,
+        )
+        return [list(found[key]) for key in hashes]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self._cached(texts, PASSAGE, self.inner.embed_documents)
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        from backend.src.embedding.embeddings import embed_queries
+
+        return self._cached(
+            texts, QUERY, lambda misses: embed_queries(self.inner, misses)
+        )
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._cached(
+            [text], QUERY, lambda misses: [self.inner.embed_query(misses[0])]
+        )[0]
+
+    def __getattr__(self, name: str):
+        # Anything else (client settings, async variants) comes from the model.
+        if name == "inner":
+            raise AttributeError(name)
+        return getattr(self.inner, name)
@@ -1,12 +1,91 @@
 """Embedding utilities for the QA system."""
 
-from backend.config.settings import EMBEDDING_MODEL
+import threading
+from functools import lru_cache
+from typing import Optional
 
+from backend.config.settings import (
+    EMBED_BATCH_MAX_WAIT_MS,
+    EMBEDDING_CACHE_MAX_BYTES,
+    EMBEDDING_CACHE_PATH,
+    EMBEDDING_MODEL,
+)
+
+from backend.src.embedding.batching import BatchingEmbeddings
+from backend.src.embedding.embedding_cache import (
+    CachedEmbeddings,
+    EmbeddingCacheStore,
+)
+from backend.src.embedding.executor import EmbeddingExecutor
+from backend.src.embedding.reduction import ReducedEmbeddings, get_reducer
 from langchain_nvidia_ai_endpoints import NVIDIAEmbeddings
 
+_cache_store = None
+_cache_store_lock = threading.Lock()
+
+
+def get_embedding_cache_store():
+    """Process-wide embedding cache store; None when EMBEDDING_CACHE_PATH is empty."""
+    global _cache_store
+    if not EMBEDDING_CACHE_PATH:
+        return None
+    with _cache_store_lock:
+        if _cache_store is None:
+            _cache_store = EmbeddingCacheStore(
+                EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_MAX_BYTES
+            )
+        return _cache_store
 
-def get_embedder():
-    """Initialize and return the NVIDIA embeddings model."""
+
+@lru_cache(maxsize=None)
+def _full_embedder(model: Optional[str] = None):
     # You can uncomment this to list available models
     # NVIDIAEmbeddings.get_available_models()
-    return NVIDIAEmbeddings(model=EMBEDDING_MODEL, truncate="END")
+    embedder = EmbeddingExecutor(
+        NVIDIAEmbeddings(model=model or EMBEDDING_MODEL, truncate="END")
+    )
+    if EMBED_BATCH_MAX_WAIT_MS > 0:
+        embedder = BatchingEmbeddings(embedder)
+    store = get_embedding_cache_store()
+    if store is None:
+        return embedder
+    return CachedEmbeddings(embedder, store)
+
+
+@lru_cache(maxsize=None)
+def get_embedder(model: Optional[str] = None, reduced: bool = True):
+    """
+    Return the NVIDIA embeddings model (default EMBEDDING_MODEL), wrapped in
+    the persistent embedding cache. Built once per model and process, so
+    retrieval and the semantic chunker share one micro-batching dispatcher:
+    cache misses from concurrent requests go upstream as a single call.
+    Upstream calls are sized, parallelised and retried by EmbeddingExecutor.
+
+    With VECTOR_REDUCTION set, vectors for the store are projected on top of
+    the cache (which keeps full vectors); reduced=False skips the projection.
+    """
+    embedder = _full_embedder(model)
+    reducer = get_reducer() if reduced else None
+    if reducer is None:
+        return embedder
+    return ReducedEmbeddings(embedder, reducer)
+
+
+def embed_queries(embedder, texts: list[str]) -> list[list[float]]:
+    """
+    Embed several queries in one upstream request.
+
+    Uses the query input type (asymmetric models such as nv-embedqa encode
+    queries and passages differently, so embed_documents is not a substitute).
+    Falls back to one embed_query call per text for embedders without a batched
+    query path.
+    """
+    if not texts:
+        return []
+    batched = getattr(embedder, "embed_queries", None)
+    if callable(batched):
+        return batched(list(texts))
+    embed = getattr(embedder, "_embed", None)
+    if callable(embed):
+        return embed(list(texts), model_type="query")
+    return [embedder.embed_query(text) for text in texts]
@@ -0,0 +1,274 @@
+"""Batched, concurrent and retrying document embedding for ingestion."""
+
+import logging
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional, Sequence, TypeVar
+
+import requests
+
+from backend.config.settings import (
+    EMBED_BATCH_MAX_TEXTS,
+    EMBED_BATCH_MAX_TOKENS,
+    EMBED_CONCURRENCY,
+    EMBED_MAX_RETRIES,
+    EMBED_RETRY_BASE_DELAY,
+    EMBED_RETRY_MAX_DELAY,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+PAYLOAD_TOO_LARGE = 413
+# langchain-nvidia raises plain Exceptions whose message starts "[429] ...".
+_STATUS_PREFIX = re.compile(r"^\s*\[(\d{3})\]")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English text)."""
+    return max(1, (len(text) + 3) // 4)
+
+
+def plan_batches(
+    token_counts: Sequence[int], max_tokens: int, max_texts: int
+) -> list[tuple[int, int]]:
+    """
+    Contiguous [start, end) ranges holding at most max_texts texts and
+    max_tokens estimated tokens; a single oversized text gets its own batch.
+    """
+    batches = []
+    start, tokens = 0, 0
+    for i, count in enumerate(token_counts):
+        if i > start and (i - start >= max_texts or tokens + count > max_tokens):
+            batches.append((start, i))
+            start, tokens = i, 0
+        tokens += count
+    if start < len(token_counts):
+        batches.append((start, len(token_counts)))
+    return batches
+
+
+def status_of(exc: BaseException) -> Optional[int]:
+    """HTTP status behind an embedding error, if one can be recovered."""
+    for candidate in (exc, getattr(exc, "response", None)):
+        status = getattr(candidate, "status_code", None)
+        if isinstance(status, int):
+            return status
+    match = _STATUS_PREFIX.match(str(exc))
+    return int(match.group(1)) if match else None
+
+
+def response_of(exc: BaseException):
+    """
+    HTTP response behind an embedding error, if one is attached. Also looks
+    down the exception chain: langchain-nvidia re-raises a plain Exception
+    "from None" while handling the HTTPError, which stays on __context__.
+    """
+    seen: set[int] = set()
+    current: Optional[BaseException] = exc
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        response = getattr(current, "response", None)
+        if response is not None:
+            return response
+        current = current.__cause__ or current.__context__
+    return None
+
+
+def retry_after_seconds(headers) -> Optional[float]:
+    """Parse a Retry-After header given as seconds or as an HTTP date."""
+    value = (headers or {}).get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+@dataclass
+class EmbedRunStats:
+    """Totals for one embed_documents call."""
+
+    texts: int
+    tokens: int
+    batches: int
+    retries: int
+    seconds: float
+
+    @property
+    def tokens_per_second(self) -> float:
+        return self.tokens / self.seconds if self.seconds > 0 else 0.0
+
+
+class EmbeddingExecutor:
+    """
+    Embeddings wrapper that makes large embed_documents calls safe to send.
+
+    Texts are cut into batches by estimated tokens and count, and batches run
+    on up to `concurrency` threads (the limit is shared by every call on this
+    executor). 429 and 5xx responses are retried with jittered exponential
+    backoff, or after Retry-After when the response carries it. A 413 halves
+    the batch that hit it and lowers the token ceiling for later batches.
+    Results come back in input order.
+    """
+
+    def __init__(
+        self,
+        inner,
+        *,
+        max_batch_tokens: int = EMBED_BATCH_MAX_TOKENS,
+        max_batch_texts: int = EMBED_BATCH_MAX_TEXTS,
+        concurrency: int = EMBED_CONCURRENCY,
+        max_retries: int = EMBED_MAX_RETRIES,
+        base_delay: float = EMBED_RETRY_BASE_DELAY,
+        max_delay: float = EMBED_RETRY_MAX_DELAY,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.inner = inner
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_texts = max_batch_texts
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.sleep = sleep
+        self._slots = threading.BoundedSemaphore(self.concurrency)
+        self._lock = threading.Lock()
+        self._retries = 0
+        self.last_run: Optional[EmbedRunStats] = None
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        started = time.perf_counter()
+        retries_before = self._retries
+        counts = [estimate_tokens(text) for text in texts]
+        batches = plan_batches(counts, self.max_batch_tokens, self.max_batch_texts)
+        if len(batches) == 1:
+            parts = [self._embed_batch(list(texts), counts)]
+        else:
+            with ThreadPoolExecutor(
+                max_workers=min(self.concurrency, len(batches)),
+                thread_name_prefix="embed",
+            ) as pool:
+                parts = list(
+                    pool.map(
+                        lambda r: self._embed_batch(
+                            list(texts[r[0] : r[1]]), counts[r[0] : r[1]]
+                        ),
+                        batches,
+                    )
+                )
+        vectors = [vector for part in parts for vector in part]
+
+        stats = EmbedRunStats(
+            texts=len(texts),
+            tokens=sum(counts),
+            batches=len(batches),
+            retries=self._retries - retries_before,
+            seconds=time.perf_counter() - started,
+        )
+        self.last_run = stats
+        logger.info(
+            "Embedded %d texts (~%d tokens) in %d batches in %.2fs: "
+            "%.0f tokens/s, %d retries",
+            stats.texts,
+            stats.tokens,
+            stats.batches,
+            stats.seconds,
+            stats.tokens_per_second,
+            stats.retries,
+        )
+        return vectors
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        from backend.src.embedding.embeddings import embed_queries
+
+        return self._call(lambda: embed_queries(self.inner, texts))
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._call(lambda: self.inner.embed_query(text))
+
+    def _embed_batch(self, texts: list[str], counts: list[int]) -> list[list[float]]:
+        # A 413 elsewhere may have lowered the ceiling since batches were planned.
+        if len(texts) > 1 and sum(counts) > self.max_batch_tokens:
+            return self._split(texts, counts)
+        try:
+            return self._call(lambda: self.inner.embed_documents(texts))
+        except Exception as exc:
+            if status_of(exc) != PAYLOAD_TOO_LARGE or len(texts) == 1:
+                raise
+            with self._lock:
+                self.max_batch_tokens = min(
+                    self.max_batch_tokens, max(1, sum(counts) // 2)
+                )
+            logger.warning(
+                "Embedding batch of %d texts (~%d tokens) too large; "
+                "token ceiling now %d",
+                len(texts),
+                sum(counts),
+                self.max_batch_tokens,
+            )
+            return self._split(texts, counts)
+
+    def _split(self, texts: list[str], counts: list[int]) -> list[list[float]]:
+        mid = len(texts) // 2
+        return self._embed_batch(texts[:mid], counts[:mid]) + self._embed_batch(
+            texts[mid:], counts[mid:]
+        )
+
+    def _call(self, request: Callable[[], T]) -> T:
+        attempt = 0
+        while True:
+            try:
+                with self._slots:
+                    return request()
+            except Exception as exc:
+                status = status_of(exc)
+                retryable = status in RETRYABLE_STATUSES or isinstance(
+                    exc, (requests.ConnectionError, requests.Timeout)
+                )
+                if not retryable or attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt, exc)
+                attempt += 1
+                with self._lock:
+                    self._retries += 1
+                logger.warning(
+                    "Embedding request failed (%s); retry %d/%d in %.1fs",
+                    status or type(exc).__name__,
+                    attempt,
+                    self.max_retries,
+                    delay,
+                )
+                self.sleep(delay)
+
+    def _backoff(self, attempt: int, exc: BaseException) -> float:
+        # Only the failing call's own response: the client's last_response is
+        # shared by every thread and may belong to another request.
+        response = response_of(exc)
+        wait = retry_after_seconds(getattr(response, "headers", None))
+        if wait is not None:
+            return min(wait, self.max_delay) + random.uniform(0, self.base_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    def __getattr__(self, name: str):
+        if name == "inner":
+            raise AttributeError(name)
+        return getattr(self.inner, name)
@@ -0,0 +1,247 @@
+"""
+Optional dimensionality reduction between the embedder and the vector store.
+
+Two reducers are available:
+  - truncate: keep the first N dimensions and re-normalise. Only sound for
+    Matryoshka-trained models, whose leading dimensions carry most signal.
+  - pca: project onto the top N principal components of a corpus sample.
+    The projection is fitted offline (scripts/reduce_vectors.py fit) and saved
+    as .npz; every process must load the same file so that documents and
+    queries land in the same space.
+
+Switching reduction changes the vector size, so it is deployed like a model
+change: re-embed into a new collection version and swap the alias.
+"""
+
+import hashlib
+import logging
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+
+from backend.config.settings import (
+    EMBEDDING_MODEL,
+    VECTOR_PCA_PATH,
+    VECTOR_REDUCED_DIM,
+    VECTOR_REDUCTION,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+class TruncateReducer:
+    """Matryoshka truncation: first dim components, re-normalised."""
+
+    def __init__(self, dim: int):
+        self.dim = dim
+
+    @property
+    def fingerprint(self) -> str:
+        return f"truncate:{self.dim}"
+
+    def project(self, vectors) -> np.ndarray:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.shape[1] < self.dim:
+            raise ValueError(
+                f"Cannot truncate {matrix.shape[1]}-d vectors to {self.dim}"
+            )
+        return _normalize(matrix[:, : self.dim])
+
+
+class PCAReducer:
+    """Centred projection onto principal components, re-normalised."""
+
+    def __init__(self, mean: np.ndarray, components: np.ndarray, model: str = ""):
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.components = np.asarray(components, dtype=np.float32)
+        self.model = model
+
+    @property
+    def dim(self) -> int:
+        return self.components.shape[0]
+
+    @property
+    def fingerprint(self) -> str:
+        digest = hashlib.sha256(
+            self.mean.tobytes() + self.components.tobytes()
+        ).hexdigest()
+        return f"pca:{self.dim}:{digest[:12]}"
+
+    @classmethod
+    def fit(cls, vectors, dim: int, model: str = "") -> "PCAReducer":
+        """Fit on a sample of (normalised) embeddings via the covariance matrix."""
+        matrix = _normalize(np.asarray(vectors, dtype=np.float64))
+        if dim > matrix.shape[1]:
+            raise ValueError(f"Cannot project {matrix.shape[1]}-d vectors to {dim}")
+        mean = matrix.mean(axis=0)
+        centered = matrix - mean
+        eigenvalues, eigenvectors = np.linalg.eigh(centered.T @ centered)
+        order = np.argsort(eigenvalues)[::-1][:dim]
+        explained = eigenvalues[order].sum() / max(eigenvalues.sum(), 1e-12)
+        logger.info(
+            "PCA to %d dims keeps %.1f%% of variance (%d samples)",
+            dim,
+            explained * 100,
+            matrix.shape[0],
+        )
+        return cls(mean, eigenvectors[:, order].T, model=model)
+
+    def project(self, vectors) -> np.ndarray:
+        matrix = _normalize(np.asarray(vectors, dtype=np.float32))
+        return _normalize((matrix - self.mean) @ self.components.T)
+
+    def save(self, path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as fh:
+            np.savez(
+                fh,
+                mean=self.mean,
+                components=self.components,
+                model=np.array(self.model),
+            )
+
+    @classmethod
+    def load(cls, path) -> "PCAReducer":
+        with np.load(path) as data:
+            return cls(data["mean"], data["components"], model=str(data["model"]))
+
+
+def get_reducer(
+    method: str = VECTOR_REDUCTION,
+    dim: int = VECTOR_REDUCED_DIM,
+    pca_path: str = VECTOR_PCA_PATH,
+):
+    """Configured reducer, or None when VECTOR_REDUCTION is unset."""
+    if not method or method == "none":
+        return None
+    if method == "truncate":
+        return TruncateReducer(dim)
+    if method == "pca":
+        if not Path(pca_path).exists():
+            raise FileNotFoundError(
+                f"VECTOR_REDUCTION=pca but {pca_path} does not exist; "
+                "fit it with scripts/reduce_vectors.py fit"
+            )
+        reducer = PCAReducer.load(pca_path)
+        if reducer.dim != dim:
+            raise ValueError(
+                f"{pca_path} projects to {reducer.dim} dims, "
+                f"VECTOR_REDUCED_DIM is {dim}"
+            )
+        if reducer.model and reducer.model != EMBEDDING_MODEL:
+            logger.warning(
+                "PCA projection was fitted on %s vectors, embedder is %s",
+                reducer.model,
+                EMBEDDING_MODEL,
+            )
+        return reducer
+    raise ValueError(f"Unknown VECTOR_REDUCTION: {method}")
+
+
+def reduction_fingerprint(reducer) -> str:
+    """Identifies the vector space a reducer maps into ("none" for no reducer)."""
+    return reducer.fingerprint if reducer is not None else "none"
+
+
+class ReducedEmbeddings:
+    """Embeddings wrapper that projects every vector through a reducer."""
+
+    def __init__(self, inner, reducer):
+        self.inner = inner
+        self.reducer = reducer
+
+    def _project(self, vectors: list[list[float]]) -> list[list[float]]:
+        if not vectors:
+            return []
+        return self.reducer.project(vectors).tolist()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self._project(self.inner.embed_documents(texts))
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        from backend.src.embedding.embeddings import embed_queries
+
+        return self._project(embed_queries(self.inner, texts))
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._project([self.inner.embed_query(text)])[0]
+
+    def __getattr__(self, name: str):
+        if name == "inner":
+            raise AttributeError(name)
+        return getattr(self.inner, name)
+
+
+@dataclass
+class ReductionReport:
+    """Recall and brute-force search cost of one reduced dimension."""
+
+    dim: int
+    recall: float
+    latency_ms: float
+    bytes_per_vector: int
+
+
+def _top_k(queries: np.ndarray, corpus: np.ndarray, k: int) -> np.ndarray:
+    scores = queries @ corpus.T
+    k = min(k, corpus.shape[0])
+    return np.argpartition(-scores, k - 1, axis=1)[:, :k]
+
+
+def _timed_top_k(queries: np.ndarray, corpus: np.ndarray, k: int):
+    started = time.perf_counter()
+    hits = _top_k(queries, corpus, k)
+    per_query_ms = (time.perf_counter() - started) * 1000 / max(len(queries), 1)
+    return hits, per_query_ms
+
+
+def evaluate_reductions(
+    corpus,
+    queries,
+    dims: Sequence[int],
+    *,
+    method: str = "pca",
+    k: int = 10,
+    fit_sample: Optional[int] = None,
+) -> list[ReductionReport]:
+    """
+    Recall@k of reduced-dimension search against full-dimension search.
+
+    The exact top-k over the full vectors is the ground truth; each reduced
+    space is searched the same brute-force way, so latency_ms compares the
+    cost of scoring per query (HNSW narrows the gap but keeps the ratio).
+    The first report is the full-dimension baseline.
+    """
+    corpus = _normalize(np.asarray(corpus, dtype=np.float32))
+    queries = _normalize(np.asarray(queries, dtype=np.float32))
+    truth, full_ms = _timed_top_k(queries, corpus, k)
+    truth_sets = [set(row) for row in truth]
+    full_dim = corpus.shape[1]
+    reports = [ReductionReport(full_dim, 1.0, full_ms, full_dim * 4)]
+    for dim in dims:
+        if method == "truncate":
+            reducer = TruncateReducer(dim)
+        else:
+            reducer = PCAReducer.fit(corpus[:fit_sample] if fit_sample else corpus, dim)
+        hits, reduced_ms = _timed_top_k(
+            reducer.project(queries), reducer.project(corpus), k
+        )
+        recall = float(
+            np.mean(
+                [
+                    len(truth_set.intersection(row)) / len(truth_set)
+                    for truth_set, row in zip(truth_sets, hits)
+                ]
+            )
+        )
+        reports.append(ReductionReport(dim, recall, reduced_ms, dim * 4))
+    return reports
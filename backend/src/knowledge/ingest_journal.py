@@ -0,0 +1,292 @@
+"""
+Checkpoint journal for resumable bulk ingestion.
+
+A small SQLite file records every item's progress through the pipeline:
+
+  prepared  extracted and hashed; points may have been partly upserted
+  written   points upserted; the KnowledgeBaseDocument row may be missing
+  done      points and row both committed
+  failed    gave up on this run (retried on the next one); keeps the
+            paper_id of an earlier prepared/written record, if any
+
+On restart, plan_resume uses the journal plus the KB's document IDs (one
+query) to skip finished items without re-reading or hashing them, add rows
+for items that were written but not recorded, and clear stray points of
+items that died mid-write so they can be ingested again without duplicates.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from backend.src.db.models import KnowledgeBaseDocument
+from backend.src.knowledge.ingest_pipeline import (
+    IngestItem,
+    PreparedDocument,
+    normalize_arxiv_id,
+)
+
+PREPARED = "prepared"
+WRITTEN = "written"
+DONE = "done"
+FAILED = "failed"
+
+
+def item_key(item: IngestItem) -> str:
+    return f"{item.kind}:{item.value}"
+
+
+def file_signature(item: IngestItem) -> tuple[int, int]:
+    """(size, mtime_ns) of a PDF item; a cheap stand-in for re-hashing it."""
+    if item.kind != "pdf":
+        return 0, 0
+    try:
+        stat = os.stat(item.value)
+    except OSError:
+        return -1, -1
+    return stat.st_size, stat.st_mtime_ns
+
+
+@dataclass
+class JournalEntry:
+    key: str
+    status: str
+    paper_id: str = ""
+    content_hash: str = ""
+    size: int = 0
+    mtime_ns: int = 0
+    title: str = ""
+    source: str = ""
+    chunk_count: int = 0
+    error: str = ""
+
+
+class IngestJournal:
+    """Per-KB item status, persisted in SQLite (WAL, shared across threads)."""
+
+    def __init__(self, path, kb_id: int):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.kb_id = kb_id
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS items ("
+            "kb_id INTEGER NOT NULL, key TEXT NOT NULL, status TEXT NOT NULL, "
+            "paper_id TEXT NOT NULL DEFAULT '', "
+            "content_hash TEXT NOT NULL DEFAULT '', "
+            "size INTEGER NOT NULL DEFAULT 0, mtime_ns INTEGER NOT NULL DEFAULT 0, "
+            "title TEXT NOT NULL DEFAULT '', source TEXT NOT NULL DEFAULT '', "
+            "chunk_count INTEGER NOT NULL DEFAULT 0, "
+            "error TEXT NOT NULL DEFAULT '', updated_at REAL NOT NULL, "
+            "PRIMARY KEY (kb_id, key))"
+        )
+        self._db.commit()
+
+    @staticmethod
+    def default_path(source: Path, kb_id: int) -> Path:
+        """Journal next to the manifest, or inside the input directory."""
+        if source.is_dir():
+            return source / f".ingest-journal-kb{kb_id}.sqlite"
+        return source.with_name(f"{source.name}.ingest-journal-kb{kb_id}.sqlite")
+
+    def entries(self) -> dict[str, JournalEntry]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT key, status, paper_id, content_hash, size, mtime_ns, "
+                "title, source, chunk_count, error FROM items WHERE kb_id = ?",
+                (self.kb_id,),
+            ).fetchall()
+        return {row[0]: JournalEntry(*row) for row in rows}
+
+    def _upsert(self, entries: Iterable[JournalEntry]) -> None:
+        now = time.time()
+        rows = [
+            (
+                self.kb_id,
+                e.key,
+                e.status,
+                e.paper_id,
+                e.content_hash,
+                e.size,
+                e.mtime_ns,
+                e.title,
+                e.source,
+                e.chunk_count,
+                e.error,
+                now,
+            )
+            for e in entries
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO items (kb_id, key, status, paper_id, "
+                "content_hash, size, mtime_ns, title, source, chunk_count, error, "
+                "updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._db.commit()
+
+    def record_prepared(self, item: IngestItem, paper_id: str, content_hash: str):
+        size, mtime_ns = file_signature(item)
+        self._upsert(
+            [
+                JournalEntry(
+                    item_key(item), PREPARED, paper_id, content_hash, size, mtime_ns
+                )
+            ]
+        )
+
+    def record_written(self, entries: Iterable[JournalEntry]) -> None:
+        self._upsert(entries)
+
+    def record_done(self, keys: Iterable[str]) -> None:
+        self._set_status(keys, DONE)
+
+    def record_failed(self, item: IngestItem, error: BaseException) -> None:
+        """
+        Mark an item failed. Only status and error change on an existing
+        row: its paper_id (and file signature) stay, so the next plan_resume
+        can clear points the failed attempt may have left behind.
+        """
+        size, mtime_ns = file_signature(item)
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO items (kb_id, key, status, size, mtime_ns, error, "
+                "updated_at) VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (kb_id, key) DO UPDATE SET status = excluded.status, "
+                "error = excluded.error, updated_at = excluded.updated_at",
+                (
+                    self.kb_id,
+                    item_key(item),
+                    FAILED,
+                    size,
+                    mtime_ns,
+                    str(error)[:500],
+                    time.time(),
+                ),
+            )
+            self._db.commit()
+
+    def _set_status(self, keys: Iterable[str], status: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "UPDATE items SET status = ?, error = '', updated_at = ? "
+                "WHERE kb_id = ? AND key = ?",
+                [(status, now, self.kb_id, key) for key in keys],
+            )
+            self._db.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def written_entry(prepared: PreparedDocument, chunk_count: int) -> JournalEntry:
+    """Journal entry for a document whose points were just upserted."""
+    size, mtime_ns = file_signature(prepared.item)
+    return JournalEntry(
+        item_key(prepared.item),
+        WRITTEN,
+        paper_id=prepared.paper_id,
+        content_hash=prepared.content_hash,
+        size=size,
+        mtime_ns=mtime_ns,
+        title=prepared.title or prepared.paper_id,
+        source=prepared.item.value,
+        chunk_count=chunk_count,
+    )
+
+
+def document_values(kb_id: int, entry: JournalEntry) -> dict:
+    """Column values of the KnowledgeBaseDocument row for a written entry."""
+    return {
+        "kb_id": kb_id,
+        "document_id": entry.paper_id,
+        "title": entry.title or entry.paper_id,
+        "source": entry.source,
+        "chunk_count": entry.chunk_count,
+    }
+
+
+def insert_documents(db: Session, kb_id: int, entries: list[JournalEntry]) -> None:
+    """Insert the rows for several written entries in one statement and commit."""
+    if not entries:
+        return
+    try:
+        db.execute(
+            insert(KnowledgeBaseDocument),
+            [document_values(kb_id, entry) for entry in entries],
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+@dataclass
+class ResumePlan:
+    """What a (re)started ingest still has to do."""
+
+    todo: list[IngestItem] = field(default_factory=list)
+    skipped: int = 0
+    # Written to Qdrant but never recorded: only the DB row is missing.
+    reconcile: list[JournalEntry] = field(default_factory=list)
+    # Died or failed after preparation: may have stray points to clear first.
+    cleanup: list[str] = field(default_factory=list)
+
+
+def existing_document_ids(db: Session, kb_id: int) -> set[str]:
+    """All document IDs recorded for a KB, in one query."""
+    rows = db.query(KnowledgeBaseDocument.document_id).filter(
+        KnowledgeBaseDocument.kb_id == kb_id
+    )
+    return {document_id for (document_id,) in rows}
+
+
+def plan_resume(
+    items: Iterable[IngestItem],
+    entries: dict[str, JournalEntry],
+    existing_ids: set[str],
+) -> ResumePlan:
+    plan = ResumePlan()
+    seen: set[str] = set()
+    for item in items:
+        key = item_key(item)
+        if key in seen:
+            # Listed twice (e.g. a repeated manifest row): ingest it once.
+            plan.skipped += 1
+            continue
+        seen.add(key)
+        entry: Optional[JournalEntry] = entries.get(key)
+        if item.kind == "arxiv" and normalize_arxiv_id(item.value) in existing_ids:
+            plan.skipped += 1
+            continue
+        if entry is None:
+            plan.todo.append(item)
+            continue
+        unchanged = (entry.size, entry.mtime_ns) == file_signature(item)
+        known = unchanged and entry.paper_id
+        if known and entry.paper_id in existing_ids:
+            plan.skipped += 1
+        elif known and entry.status == WRITTEN:
+            plan.reconcile.append(entry)
+            plan.skipped += 1
+        else:
+            if entry.status in (PREPARED, WRITTEN, FAILED) and entry.paper_id:
+                if entry.paper_id not in existing_ids:
+                    plan.cleanup.append(entry.paper_id)
+            plan.todo.append(item)
+    return plan
@@ -0,0 +1,554 @@
+"""
+Staged bulk ingestion: extract/chunk -> embed -> batched upsert.
+
+Each stage has its own workers and the stages are connected by bounded
+queues, so a slow stage holds back the ones before it instead of buffering
+without limit:
+
+  - prepare: a process pool (CPU-bound PDF extraction and chunking), fed
+    with at most extract_workers + queue_size documents in flight
+  - embed: threads calling QdrantStore.prepare_points (network-bound)
+  - write: one thread collecting embedded documents and upserting them with
+    QdrantStore.write_points once upsert_batch chunk points or flush_docs
+    documents are buffered, or at least every flush_seconds. Each flush is
+    a unit: on_flushed records the whole batch (e.g. one DB transaction),
+    and if either the upsert or on_flushed fails, the batch's points are
+    deleted again and every document in it is reported failed.
+
+A reporter logs docs/s and chunks/s per stage, the queue fill levels, and
+which stage is currently the bottleneck.
+"""
+
+import hashlib
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional, Sequence
+
+from langchain_core.documents import Document
+
+from backend.config.settings import ARXIV_OFFLINE
+from backend.src.data.arxiv_download import get_arxiv_downloader
+from backend.src.data.arxiv_metadata import ArxivRecord, get_arxiv_resolver
+from backend.src.data.arxiv_store import get_arxiv_store
+from backend.src.data.chunking import get_chunker, iter_chunks
+from backend.src.data.document_loader import (
+    enrich_chunk_metadata,
+    load_single_arxiv_document,
+    normalize_paper_metadata,
+    preprocess_documents,
+)
+from backend.src.data.extraction import iter_pdf_pages
+from backend.src.retrieval.qdrant_store import DocumentPoints, QdrantStore
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+@dataclass(frozen=True)
+class IngestItem:
+    """One input document: a PDF path or an arXiv ID."""
+
+    kind: str
+    value: str
+    # arXiv metadata resolved ahead of the download (resolve_arxiv_items).
+    record: Optional[ArxivRecord] = field(default=None, compare=False)
+
+
+@dataclass
+class PreparedDocument:
+    """A document extracted and chunked, ready to embed."""
+
+    item: IngestItem
+    paper_id: str
+    title: str
+    source: str
+    chunks: list[Document]
+    content_hash: str = ""
+
+
+_worker_chunker = None
+_worker_use_structure = True
+
+
+def init_prepare_worker(chunking_strategy: str, use_structure: bool) -> None:
+    """Process-pool initializer: build the chunker once per worker."""
+    global _worker_chunker, _worker_use_structure
+    embeddings = None
+    if chunking_strategy == "semantic":
+        from backend.src.embedding.embeddings import get_embedder
+
+        embeddings = get_embedder(reduced=False)
+    _worker_chunker = get_chunker(strategy=chunking_strategy, embeddings=embeddings)
+    _worker_use_structure = use_structure
+
+
+def chunk_document(chunker, doc: Document) -> list[Document]:
+    if hasattr(chunker, "split_documents"):
+        chunks = chunker.split_documents([doc])
+    elif hasattr(chunker, "transform_documents"):
+        chunks = chunker.transform_documents([doc])
+    else:
+        raise ValueError("Chunker has no split/transform method")
+    return [c for c in chunks if getattr(c, "page_content", "").strip()]
+
+
+def normalize_arxiv_id(arxiv_id: str) -> str:
+    arxiv_id = arxiv_id.strip()
+    if arxiv_id.startswith(("arXiv:", "arxiv:")):
+        arxiv_id = arxiv_id.split(":")[-1].strip()
+    return arxiv_id
+
+
+def prepare_pdf(item: IngestItem, chunker, use_structure: bool) -> PreparedDocument:
+    path = Path(item.value)
+    contents = path.read_bytes()
+    content_hash = hashlib.md5(contents).hexdigest()
+    paper_id = f"upload-{content_hash[:12]}"
+    metadata = {"Title": path.name, "source": path.name}
+    metadata["paper_metadata"] = normalize_paper_metadata(metadata)
+    pages = iter_pdf_pages(
+        contents, path.name, use_structure=use_structure, metadata=metadata
+    )
+    chunks = enrich_chunk_metadata(list(iter_chunks(chunker, pages)))
+    return PreparedDocument(item, paper_id, path.name, str(path), chunks, content_hash)
+
+
+def prepare_arxiv(item: IngestItem, chunker) -> PreparedDocument:
+    arxiv_id = normalize_arxiv_id(item.value)
+    empty = PreparedDocument(item, arxiv_id, "", f"arxiv:{arxiv_id}", [])
+    new_doc = load_single_arxiv_document(arxiv_id, item.record)
+    if not new_doc:
+        return empty
+    processed = preprocess_documents([new_doc])
+    if not processed or not processed[0]:
+        return empty
+    doc = processed[0][0]
+    title = getattr(doc, "metadata", {}).get("Title", "Untitled")
+    doc.metadata["paper_metadata"] = normalize_paper_metadata(doc.metadata)
+    chunks = enrich_chunk_metadata(chunk_document(chunker, doc))
+    return PreparedDocument(item, arxiv_id, title, f"arxiv:{arxiv_id}", chunks)
+
+
+def resolve_arxiv_items(
+    items: Sequence[IngestItem], resolver=None, store=None
+) -> list[IngestItem]:
+    """
+    Attach arXiv metadata to the arXiv items with batched lookups before any
+    PDF is fetched, so prepare workers go straight to the download. Papers
+    already in the local arXiv store and IDs arXiv does not know are left
+    as they are.
+    """
+    store = store if store is not None else get_arxiv_store()
+    ids = {
+        item.value: normalize_arxiv_id(item.value)
+        for item in items
+        if item.kind == "arxiv" and item.record is None
+    }
+    if store is not None:
+        ids = {
+            value: arxiv_id
+            for value, arxiv_id in ids.items()
+            if store.get(arxiv_id) is None
+        }
+    if not ids or ARXIV_OFFLINE:
+        return list(items)
+    resolver = resolver or get_arxiv_resolver()
+    started, requests = time.monotonic(), resolver.requests
+    records = resolver.resolve(ids.values())
+    logger.info(
+        "Resolved arXiv metadata for %d of %d papers in %d requests (%.1fs)",
+        len(records),
+        len(ids),
+        resolver.requests - requests,
+        time.monotonic() - started,
+    )
+    return [
+        (
+            IngestItem(item.kind, item.value, records.get(ids[item.value]))
+            if item.value in ids and item.kind == "arxiv"
+            else item
+        )
+        for item in items
+    ]
+
+
+def prefetch_arxiv_pdfs(
+    items: Sequence[IngestItem], downloader=None, store=None
+) -> int:
+    """
+    Download the PDFs of resolved arXiv items into the local arXiv store,
+    several at a time over one pooled session, so prepare workers read them
+    from disk. Returns how many were stored; failures are left for the
+    workers to retry and report. Needs the store; without it, a no-op.
+    """
+    store = store if store is not None else get_arxiv_store()
+    if store is None:
+        return 0
+    records = {
+        normalize_arxiv_id(item.value): item.record
+        for item in items
+        if item.kind == "arxiv" and item.record is not None
+    }
+    urls = {arxiv_id: record.pdf_url for arxiv_id, record in records.items()}
+    if not urls:
+        return 0
+    downloader = downloader or get_arxiv_downloader()
+    started, stored = time.monotonic(), 0
+    for arxiv_id, result in downloader.fetch_many(urls):
+        if isinstance(result, Exception):
+            logger.warning("Prefetch of arXiv %s failed: %s", arxiv_id, result)
+            continue
+        record = records[arxiv_id]
+        metadata = {**record.metadata, "source": f"arxiv:{arxiv_id}"}
+        store.put(arxiv_id, record.version, result, metadata)
+        stored += 1
+    logger.info(
+        "Prefetched %d of %d arXiv PDFs in %.1fs",
+        stored,
+        len(urls),
+        time.monotonic() - started,
+    )
+    return stored
+
+
+def prepare_item(item: IngestItem) -> PreparedDocument:
+    """Extract and chunk one item with the chunker from init_prepare_worker."""
+    if item.kind == "pdf":
+        return prepare_pdf(item, _worker_chunker, _worker_use_structure)
+    return prepare_arxiv(item, _worker_chunker)
+
+
+@dataclass
+class StageCounter:
+    docs: int = 0
+    chunks: int = 0
+    failed: int = 0
+    skipped: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, docs: int = 0, chunks: int = 0, failed: int = 0, skipped: int = 0):
+        with self._lock:
+            self.docs += docs
+            self.chunks += chunks
+            self.failed += failed
+            self.skipped += skipped
+
+
+@dataclass
+class PipelineStats:
+    prepared: StageCounter = field(default_factory=StageCounter)
+    embedded: StageCounter = field(default_factory=StageCounter)
+    written: StageCounter = field(default_factory=StageCounter)
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+
+class IngestPipeline:
+    """
+    Run IngestItems through prepare, embed and write stages into one KB.
+
+    Callbacks: on_prepared(doc) as each document leaves the prepare stage,
+    on_flushed([(doc, chunk_count), ...]) on the writer thread once a batch
+    of documents is upserted, and on_failed(item, exc) from whichever stage
+    failed. skip(item) is checked before an item is extracted, and
+    exists(paper_id) before a prepared document is embedded, so documents
+    already in the KB are not ingested twice. Within a run, only the first
+    document with a given paper_id is embedded (e.g. the same PDF under two
+    paths); later ones are counted as skipped.
+    """
+
+    def __init__(
+        self,
+        store: QdrantStore,
+        *,
+        kb_id: int,
+        domain: Optional[str] = None,
+        user_id: int = 0,
+        prepare: Callable[[IngestItem], PreparedDocument] = prepare_item,
+        initializer: Optional[Callable[..., None]] = None,
+        initargs: tuple = (),
+        use_processes: bool = True,
+        extract_workers: int = 2,
+        embed_workers: int = 4,
+        upsert_batch: int = 512,
+        flush_docs: int = 64,
+        queue_size: int = 32,
+        flush_seconds: float = 2.0,
+        report_every: float = 10.0,
+        skip: Optional[Callable[[IngestItem], bool]] = None,
+        exists: Optional[Callable[[str], bool]] = None,
+        on_prepared: Optional[Callable[[PreparedDocument], None]] = None,
+        on_flushed: Optional[
+            Callable[[list[tuple[PreparedDocument, int]]], None]
+        ] = None,
+        on_failed: Optional[Callable[[IngestItem, BaseException], None]] = None,
+    ):
+        self.store = store
+        self.kb_id = kb_id
+        self.domain = domain
+        self.user_id = user_id
+        self.prepare = prepare
+        self.initializer = initializer
+        self.initargs = initargs
+        self.use_processes = use_processes
+        self.extract_workers = max(1, extract_workers)
+        self.embed_workers = max(1, embed_workers)
+        self.upsert_batch = upsert_batch
+        self.flush_docs = flush_docs
+        self.flush_seconds = flush_seconds
+        self.report_every = report_every
+        self.skip = skip
+        self.exists = exists
+        self.on_prepared = on_prepared
+        self.on_flushed = on_flushed
+        self.on_failed = on_failed
+        self.queue_size = queue_size
+        self._prepared: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self._embedded: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self._claimed: set[str] = set()
+        self._claim_lock = threading.Lock()
+        self.stats = PipelineStats()
+
+    def _fail(self, item: IngestItem, exc: BaseException) -> None:
+        logger.warning("Failed %s: %s", item.value, exc)
+        if self.on_failed is not None:
+            self.on_failed(item, exc)
+
+    def _executor(self) -> Executor:
+        if self.use_processes:
+            # spawn: forking next to live HTTP client threads can deadlock.
+            return ProcessPoolExecutor(
+                max_workers=self.extract_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=self.initializer,
+                initargs=self.initargs,
+            )
+        return ThreadPoolExecutor(
+            max_workers=self.extract_workers,
+            initializer=self.initializer,
+            initargs=self.initargs,
+        )
+
+    def _feed(self, items: Sequence[IngestItem]) -> None:
+        try:
+            self._submit_all(items)
+        finally:
+            for _ in range(self.embed_workers):
+                self._prepared.put(_DONE)
+
+    def _submit_all(self, items: Sequence[IngestItem]) -> None:
+        window = self.extract_workers + self.queue_size
+        pending: dict = {}
+        todo = iter(items)
+        with self._executor() as pool:
+            while True:
+                while len(pending) < window:
+                    item = next(todo, None)
+                    if item is None:
+                        break
+                    if self.skip is not None and self.skip(item):
+                        self.stats.prepared.add(skipped=1)
+                        continue
+                    pending[pool.submit(self.prepare, item)] = item
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = pending.pop(future)
+                    try:
+                        prepared = future.result()
+                    except Exception as exc:
+                        self.stats.prepared.add(failed=1)
+                        self._fail(item, exc)
+                        continue
+                    self.stats.prepared.add(docs=1, chunks=len(prepared.chunks))
+                    if self.on_prepared is not None:
+                        self.on_prepared(prepared)
+                    # Blocks while the embed stage is behind.
+                    self._prepared.put(prepared)
+
+    def _claim(self, paper_id: str) -> bool:
+        """True for the first embed worker to see paper_id in this run."""
+        with self._claim_lock:
+            if paper_id in self._claimed:
+                return False
+            self._claimed.add(paper_id)
+            return True
+
+    def _embed(self) -> None:
+        while True:
+            prepared = self._prepared.get()
+            if prepared is _DONE:
+                return
+            try:
+                if (
+                    not prepared.chunks
+                    or (self.exists is not None and self.exists(prepared.paper_id))
+                    or not self._claim(prepared.paper_id)
+                ):
+                    self.stats.embedded.add(skipped=1)
+                    continue
+                points = self.store.prepare_points(
+                    prepared.chunks,
+                    user_id=self.user_id,
+                    paper_id=prepared.paper_id,
+                    paper_title=prepared.title,
+                    source=prepared.source,
+                    kb_id=self.kb_id,
+                    domain=self.domain,
+                )
+            except Exception as exc:
+                self.stats.embedded.add(failed=1)
+                self._fail(prepared.item, exc)
+                continue
+            if points is None:
+                self.stats.embedded.add(skipped=1)
+                continue
+            self.stats.embedded.add(docs=1, chunks=len(points.chunk_points))
+            self._embedded.put((prepared, points))
+
+    def _flush(self, batch: list[tuple[PreparedDocument, DocumentPoints]]) -> None:
+        written = [(prepared, len(points.chunk_points)) for prepared, points in batch]
+        try:
+            self.store.write_points([points for _, points in batch])
+            if self.on_flushed is not None:
+                self.on_flushed(written)
+        except Exception as exc:
+            self._roll_back(batch, exc)
+            return
+        self.stats.written.add(
+            docs=len(written), chunks=sum(count for _, count in written)
+        )
+
+    def _roll_back(
+        self, batch: list[tuple[PreparedDocument, DocumentPoints]], exc: Exception
+    ) -> None:
+        paper_ids = [prepared.paper_id for prepared, _ in batch]
+        logger.warning("Rolling back a batch of %d documents: %s", len(batch), exc)
+        try:
+            self.store.delete_kb_documents(self.kb_id, paper_ids)
+        except Exception as cleanup_exc:
+            # The journal keeps their paper IDs as failed; a rerun clears them.
+            logger.error("Could not delete points of %s: %s", paper_ids, cleanup_exc)
+        for prepared, _ in batch:
+            self.stats.written.add(failed=1)
+            self._fail(prepared.item, exc)
+
+    def _write(self) -> None:
+        batch: list[tuple[PreparedDocument, DocumentPoints]] = []
+        buffered = 0
+        deadline = time.monotonic() + self.flush_seconds
+        while True:
+            try:
+                entry = self._embedded.get(
+                    timeout=max(deadline - time.monotonic(), 0.01)
+                )
+            except queue.Empty:
+                entry = None
+            if entry is _DONE:
+                break
+            if entry is not None:
+                batch.append(entry)
+                buffered += len(entry[1].chunk_points)
+            if (
+                buffered >= self.upsert_batch
+                or len(batch) >= self.flush_docs
+                or time.monotonic() >= deadline
+            ):
+                if batch:
+                    self._flush(batch)
+                batch, buffered = [], 0
+                deadline = time.monotonic() + self.flush_seconds
+        if batch:
+            self._flush(batch)
+
+    def bottleneck(self) -> str:
+        """Stage holding the pipeline back, judged by queue fill levels."""
+        if self._embedded.qsize() >= 0.8 * self.queue_size:
+            return "write"
+        if self._prepared.qsize() >= 0.8 * self.queue_size:
+            return "embed"
+        return "prepare"
+
+    def _report(self, stop: threading.Event) -> None:
+        last = (0, 0, 0, 0, 0, time.perf_counter())
+        while not stop.wait(self.report_every):
+            now = time.perf_counter()
+            current = (
+                self.stats.prepared.docs,
+                self.stats.embedded.docs,
+                self.stats.embedded.chunks,
+                self.stats.written.docs,
+                self.stats.written.chunks,
+                now,
+            )
+            span = max(now - last[5], 1e-9)
+            rates = [(c - p) / span for c, p in zip(current[:5], last[:5])]
+            logger.info(
+                "prepare %.1f docs/s | embed %.1f docs/s %.0f chunks/s | "
+                "write %.1f docs/s %.0f chunks/s | queues %d/%d, %d/%d | "
+                "bottleneck: %s",
+                *rates,
+                self._prepared.qsize(),
+                self.queue_size,
+                self._embedded.qsize(),
+                self.queue_size,
+                self.bottleneck(),
+            )
+            last = current
+
+    def run(self, items: Sequence[IngestItem]) -> PipelineStats:
+        self.stats = PipelineStats()
+        self._claimed = set()
+        stop = threading.Event()
+        writer = threading.Thread(target=self._write, name="ingest-write")
+        embedders = [
+            threading.Thread(target=self._embed, name=f"ingest-embed-{i}")
+            for i in range(self.embed_workers)
+        ]
+        reporter = threading.Thread(
+            target=self._report, args=(stop,), name="ingest-report", daemon=True
+        )
+        writer.start()
+        for thread in embedders:
+            thread.start()
+        reporter.start()
+        try:
+            self._feed(items)
+        finally:
+            for thread in embedders:
+                thread.join()
+            self._embedded.put(_DONE)
+            writer.join()
+            stop.set()
+        elapsed = self.stats.elapsed
+        logger.info(
+            "Pipeline finished in %.1fs: %d docs, %d chunks written "
+            "(%.1f docs/s, %.0f chunks/s); %d skipped, %d failed",
+            elapsed,
+            self.stats.written.docs,
+            self.stats.written.chunks,
+            self.stats.written.docs / elapsed if elapsed else 0.0,
+            self.stats.written.chunks / elapsed if elapsed else 0.0,
+            self.stats.prepared.skipped + self.stats.embedded.skipped,
+            self.stats.prepared.failed
+            + self.stats.embedded.failed
+            + self.stats.written.failed,
+        )
+        return self.stats
@@ -5,29 +5,31 @@ import logging
 from typing import Annotated, List, Optional
 
 from backend.config.settings import EXTRACTION_MODE
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, UploadFile
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from backend.src.auth.deps import get_current_user
-from backend.src.data.chunking import get_chunker
+from backend.src.data.chunking import get_chunker, iter_chunks
 from backend.src.data.document_loader import (
-    enrich_chunk_metadata,
     load_single_arxiv_document,
     normalize_paper_metadata,
     preprocess_documents,
 )
-from backend.src.data.extraction import extract_pdf_with_structure
+from backend.src.data.extraction import iter_pdf_pages
 from backend.src.db.models import (
     ChunkingStrategy,
     KnowledgeBase,
     KnowledgeBaseDocument,
+    RetrievalMode,
     User,
 )
 from backend.src.db.session import get_db
 from backend.src.embedding.embeddings import get_embedder
 from backend.src.knowledge.schemas import (
+    KBDocumentResponse,
     KnowledgeBaseCreate,
+    KnowledgeBaseDetailResponse,
     KnowledgeBaseResponse,
     KnowledgeBaseUpdate,
 )
@@ -37,6 +39,9 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["knowledge-bases"])
 
+DEFAULT_DOCUMENT_PAGE_SIZE = 50
+MAX_DOCUMENT_PAGE_SIZE = 500
+
 
 def _get_store() -> QdrantStore:
     from backend.main import ensure_resources
@@ -46,9 +51,8 @@ def _get_store() -> QdrantStore:
 
 
 def _kb_to_response(
-    kb: KnowledgeBase, db: Session, store: QdrantStore
+    kb: KnowledgeBase, document_count: int = 0
 ) -> KnowledgeBaseResponse:
-    docs = store.get_kb_documents(kb.id)
     return KnowledgeBaseResponse(
         id=kb.id,
         name=kb.name,
@@ -57,8 +61,55 @@ def _kb_to_response(
         owner_id=kb.owner_id,
         is_system=kb.is_system,
         chunking_strategy=kb.chunking_strategy.value,
-        document_count=len(docs),
+        retrieval_mode=kb.retrieval_mode.value,
+        min_k=kb.min_k,
+        max_k=kb.max_k,
+        score_threshold=kb.score_threshold,
+        document_count=document_count,
+    )
+
+
+def _count_kb_documents(db: Session, kb_id: int) -> int:
+    return db.execute(
+        select(func.count(KnowledgeBaseDocument.id)).where(
+            KnowledgeBaseDocument.kb_id == kb_id
+        )
+    ).scalar_one()
+
+
+def _list_kb_documents(
+    db: Session,
+    kb_id: int,
+    cursor: Optional[int] = None,
+    limit: int = DEFAULT_DOCUMENT_PAGE_SIZE,
+) -> tuple[list[KBDocumentResponse], Optional[int]]:
+    """Return one keyset page of KB documents and the cursor for the next page."""
+    stmt = select(KnowledgeBaseDocument).where(KnowledgeBaseDocument.kb_id == kb_id)
+    if cursor is not None:
+        stmt = stmt.where(KnowledgeBaseDocument.id > cursor)
+    rows = (
+        db.execute(stmt.order_by(KnowledgeBaseDocument.id).limit(limit + 1))
+        .scalars()
+        .all()
     )
+    next_cursor = rows[limit - 1].id if len(rows) > limit else None
+    documents = [
+        KBDocumentResponse(
+            id=row.document_id,
+            title=row.title,
+            source=row.source,
+            chunk_count=row.chunk_count,
+            ingested_at=row.ingested_at,
+        )
+        for row in rows[:limit]
+    ]
+    return documents, next_cursor
+
+
+def _kb_documents_payload(db: Session, kb_id: int) -> list[dict]:
+    """First page of KB documents for mutation responses."""
+    documents, _ = _list_kb_documents(db, kb_id)
+    return [d.model_dump() for d in documents]
 
 
 def _user_can_access_kb(kb: KnowledgeBase, user: User) -> bool:
@@ -77,18 +128,19 @@ async def list_knowledge_bases(
     current_user: Annotated[User, Depends(get_current_user)],
 ):
     """List system KBs and KBs owned by the current user."""
-    store = _get_store()
-    rows = (
-        db.execute(
-            select(KnowledgeBase).where(
-                KnowledgeBase.is_system.is_(True)
-                | (KnowledgeBase.owner_id == current_user.id)
-            )
+    rows = db.execute(
+        select(KnowledgeBase, func.count(KnowledgeBaseDocument.id))
+        .outerjoin(
+            KnowledgeBaseDocument, KnowledgeBaseDocument.kb_id == KnowledgeBase.id
         )
-        .scalars()
-        .all()
-    )
-    return [_kb_to_response(kb, db, store) for kb in rows]
+        .where(
+            KnowledgeBase.is_system.is_(True)
+            | (KnowledgeBase.owner_id == current_user.id)
+        )
+        .group_by(KnowledgeBase.id)
+        .order_by(KnowledgeBase.id)
+    ).all()
+    return [_kb_to_response(kb, count) for kb, count in rows]
 
 
 @router.post("", response_model=KnowledgeBaseResponse)
@@ -105,28 +157,39 @@ async def create_knowledge_base(
         owner_id=current_user.id,
         is_system=False,
         chunking_strategy=ChunkingStrategy(body.chunking_strategy),
+        retrieval_mode=RetrievalMode(body.retrieval_mode),
+        min_k=body.min_k,
+        max_k=body.max_k,
+        score_threshold=body.score_threshold,
     )
     db.add(kb)
     db.commit()
     db.refresh(kb)
-    store = _get_store()
-    return _kb_to_response(kb, db, store)
+    return _kb_to_response(kb)
 
 
-@router.get("/{kb_id}", response_model=KnowledgeBaseResponse)
+@router.get("/{kb_id}", response_model=KnowledgeBaseDetailResponse)
 async def get_knowledge_base(
     kb_id: int,
     db: Annotated[Session, Depends(get_db)],
     current_user: Annotated[User, Depends(get_current_user)],
+    cursor: Optional[int] = None,
+    limit: Annotated[
+        int, Query(ge=1, le=MAX_DOCUMENT_PAGE_SIZE)
+    ] = DEFAULT_DOCUMENT_PAGE_SIZE,
 ):
-    """Get a knowledge base by ID."""
+    """Get a knowledge base by ID with a cursor-paginated page of documents."""
     kb = db.get(KnowledgeBase, kb_id)
     if not kb:
         raise HTTPException(status_code=404, detail="Knowledge base not found")
     if not _user_can_access_kb(kb, current_user):
         raise HTTPException(status_code=403, detail="Access denied")
-    store = _get_store()
-    return _kb_to_response(kb, db, store)
+    documents, next_cursor = _list_kb_documents(db, kb.id, cursor=cursor, limit=limit)
+    return KnowledgeBaseDetailResponse(
+        **_kb_to_response(kb, _count_kb_documents(db, kb.id)).model_dump(),
+        documents=documents,
+        next_cursor=next_cursor,
+    )
 
 
 @router.patch("/{kb_id}", response_model=KnowledgeBaseResponse)
@@ -148,10 +211,14 @@ async def update_knowledge_base(
         kb.description = body.description
     if body.chunking_strategy is not None:
         kb.chunking_strategy = ChunkingStrategy(body.chunking_strategy)
+    if body.retrieval_mode is not None:
+        kb.retrieval_mode = RetrievalMode(body.retrieval_mode)
+    for field in ("min_k", "max_k", "score_threshold"):
+        if field in body.model_fields_set:
+            setattr(kb, field, getattr(body, field))
     db.commit()
     db.refresh(kb)
-    store = _get_store()
-    return _kb_to_response(kb, db, store)
+    return _kb_to_response(kb, _count_kb_documents(db, kb.id))
 
 
 @router.delete("/{kb_id}")
@@ -207,7 +274,7 @@ async def add_document_to_kb(
     store = _get_store()
     use_structure = EXTRACTION_MODE == "structure"
     strategy = kb.chunking_strategy.value
-    embeddings = get_embedder() if strategy == "semantic" else None
+    embeddings = get_embedder(reduced=False) if strategy == "semantic" else None
     chunker = get_chunker(
         strategy=strategy,
         embeddings=embeddings,
@@ -219,7 +286,7 @@ async def add_document_to_kb(
             if paper_id.startswith(("arXiv:", "arxiv:")):
                 paper_id = paper_id.split(":")[-1].strip()
             if store.document_exists_in_kb(kb.id, paper_id):
-                docs = store.get_kb_documents(kb.id)
+                docs = _kb_documents_payload(db, kb.id)
                 return {"message": f"Paper {paper_id} already in KB", "documents": docs}
 
             new_doc = load_single_arxiv_document(paper_id)
@@ -246,44 +313,34 @@ async def add_document_to_kb(
             content_hash = hashlib.md5(contents).hexdigest()
             paper_id = f"upload-{content_hash[:12]}"
             if store.document_exists_in_kb(kb.id, paper_id):
-                docs = store.get_kb_documents(kb.id)
+                docs = _kb_documents_payload(db, kb.id)
                 return {"message": "File already in KB", "documents": docs}
-            doc = extract_pdf_with_structure(
-                contents, filename, use_structure=use_structure
-            )
-            if isinstance(doc, list):
-                doc = doc[0]
-            title = title or str(doc.metadata.get("Title", filename))
+            title = title or filename
             source = filename
-
-        doc.metadata.update(
-            {
-                "Title": title,
-                "Authors": authors or doc.metadata.get("Authors", ""),
-                "Summary": abstract or doc.metadata.get("Summary", ""),
-                "Published": published or doc.metadata.get("Published", ""),
-                "Categories": categories or doc.metadata.get("Categories", ""),
-            }
-        )
-        doc.metadata["paper_metadata"] = normalize_paper_metadata(doc.metadata)
-
-        if hasattr(chunker, "split_documents"):
-            chunks = chunker.split_documents([doc])
-        elif hasattr(chunker, "transform_documents"):
-            chunks = chunker.transform_documents([doc])
+            doc = None
+
+        metadata = {
+            "Title": title,
+            "Authors": authors or "",
+            "Summary": abstract or "",
+            "Published": published or "",
+            "Categories": categories or "",
+        }
+        if doc is not None:
+            for key, value in metadata.items():
+                metadata[key] = value or doc.metadata.get(key, "")
+            doc.metadata.update(metadata)
+            doc.metadata["paper_metadata"] = normalize_paper_metadata(doc.metadata)
+            pages = [doc]
         else:
-            raise HTTPException(
-                status_code=500, detail="Chunker has no split/transform method"
+            # Large PDFs are extracted, chunked and embedded page by page.
+            metadata["paper_metadata"] = normalize_paper_metadata(metadata)
+            pages = iter_pdf_pages(
+                contents, filename, use_structure=use_structure, metadata=metadata
             )
 
-        valid = enrich_chunk_metadata(
-            [c for c in chunks if getattr(c, "page_content", "").strip()]
-        )
-        if not valid:
-            raise HTTPException(status_code=400, detail="No valid chunks from document")
-
-        store.add_documents(
-            chunks=valid,
+        chunk_count = store.add_document_stream(
+            iter_chunks(chunker, pages),
             user_id=0,
             paper_id=paper_id,
             paper_title=str(title),
@@ -291,17 +348,19 @@ async def add_document_to_kb(
             kb_id=kb.id,
             domain=kb.domain,
         )
+        if not chunk_count:
+            raise HTTPException(status_code=400, detail="No valid chunks from document")
         kbdoc = KnowledgeBaseDocument(
             kb_id=kb.id,
             document_id=paper_id,
             title=str(title),
             source=source,
-            chunk_count=len(valid),
+            chunk_count=chunk_count,
         )
         db.add(kbdoc)
         db.commit()
 
-        docs = store.get_kb_documents(kb.id)
+        docs = _kb_documents_payload(db, kb.id)
         return {"message": f"Added {title}", "documents": docs}
     except HTTPException:
         raise
@@ -328,17 +387,7 @@ async def remove_document_from_kb(
     if not store.document_exists_in_kb(kb.id, doc_id):
         raise HTTPException(status_code=404, detail="Document not found in KB")
 
-    from qdrant_client.http.models import FieldCondition, Filter, MatchValue
-
-    store.client.delete(
-        collection_name=store.collection_name,
-        points_selector=Filter(
-            must=[
-                FieldCondition(key="kb_id", match=MatchValue(value=kb_id)),
-                FieldCondition(key="paper_id", match=MatchValue(value=doc_id)),
-            ]
-        ),
-    )
+    store.delete_kb_document(kb_id, doc_id)
     kbdoc = (
         db.execute(
             select(KnowledgeBaseDocument).where(
@@ -353,5 +402,5 @@ async def remove_document_from_kb(
         db.delete(kbdoc)
         db.commit()
 
-    docs = store.get_kb_documents(kb.id)
+    docs = _kb_documents_payload(db, kb.id)
     return {"message": f"Document {doc_id} removed", "documents": docs}
@@ -1,6 +1,7 @@
 """Pydantic schemas for knowledge base API."""
 
-from typing import Optional
+from datetime import datetime
+from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -12,6 +13,10 @@ class KnowledgeBaseCreate(BaseModel):
     chunking_strategy: str = Field(
         default="recursive", pattern="^(recursive|section|semantic)$"
     )
+    retrieval_mode: str = Field(default="flat", pattern="^(flat|two_stage)$")
+    min_k: Optional[int] = Field(None, ge=1, le=50)
+    max_k: Optional[int] = Field(None, ge=1, le=50)
+    score_threshold: Optional[float] = Field(None, ge=-1.0, le=1.0)
 
 
 class KnowledgeBaseUpdate(BaseModel):
@@ -20,6 +25,10 @@ class KnowledgeBaseUpdate(BaseModel):
     chunking_strategy: Optional[str] = Field(
         None, pattern="^(recursive|section|semantic)$"
     )
+    retrieval_mode: Optional[str] = Field(None, pattern="^(flat|two_stage)$")
+    min_k: Optional[int] = Field(None, ge=1, le=50)
+    max_k: Optional[int] = Field(None, ge=1, le=50)
+    score_threshold: Optional[float] = Field(None, ge=-1.0, le=1.0)
 
 
 class KnowledgeBaseResponse(BaseModel):
@@ -30,11 +39,28 @@ class KnowledgeBaseResponse(BaseModel):
     owner_id: Optional[int] = None
     is_system: bool
     chunking_strategy: str
+    retrieval_mode: str = "flat"
+    min_k: Optional[int] = None
+    max_k: Optional[int] = None
+    score_threshold: Optional[float] = None
     document_count: int = 0
 
     class Config:
         from_attributes = True
 
 
+class KBDocumentResponse(BaseModel):
+    id: str
+    title: str
+    source: str
+    chunk_count: int = 0
+    ingested_at: Optional[datetime] = None
+
+
+class KnowledgeBaseDetailResponse(KnowledgeBaseResponse):
+    documents: List[KBDocumentResponse] = []
+    next_cursor: Optional[int] = None
+
+
 class KBDocumentAdd(BaseModel):
     paper_id: Optional[str] = None
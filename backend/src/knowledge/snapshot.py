@@ -0,0 +1,434 @@
+"""
+Portable knowledge base snapshots: export a KB's vectors once, import anywhere.
+
+A bundle is a directory:
+  - manifest.json: format version, embedding model, vector size and
+    reduction, the KB's settings and its KnowledgeBaseDocument rows
+  - chunks.f32 / papers.f32: float32 vectors, one row per point, loadable
+    with np.memmap using the shape in the manifest
+  - chunks.parquet / papers.parquet: payloads, row-aligned with the vectors
+
+kb_id and user_id are left out of the payloads and rewritten on import, so a
+bundle can be loaded into a KB with a different ID in another environment.
+Like every other KB write, imported points get user_id 0 whoever owns the
+KB; a user_id would put them in that user's personal papers and search.
+"""
+
+import json
+import logging
+import re
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+import numpy as np
+from qdrant_client.http.models import FieldCondition, Filter, MatchValue, PointStruct
+from sqlalchemy.orm import Session
+
+from backend.config.qdrant_config import QdrantConfig, get_qdrant_config
+from backend.config.settings import EMBEDDING_MODEL
+from backend.src.db.models import (
+    ChunkingStrategy,
+    KnowledgeBase,
+    KnowledgeBaseDocument,
+    RetrievalMode,
+)
+from backend.src.embedding.reduction import get_reducer, reduction_fingerprint
+from backend.src.retrieval.qdrant_store import QdrantStore
+from backend.src.retrieval.vector_backend import VectorBackend
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+EXPORT_BATCH_SIZE = 1024
+IMPORT_BATCH_SIZE = 2048
+# Rewritten on import; everything else in the payload is carried verbatim.
+SCOPE_FIELDS = ("kb_id", "user_id")
+KB_SETTINGS = ("min_k", "max_k", "score_threshold")
+
+
+class SnapshotError(ValueError):
+    """A bundle is malformed or incompatible with this environment."""
+
+
+def bundle_dirname(kb: KnowledgeBase) -> str:
+    """Stable directory name for a KB's bundle, e.g. nlp-nlp-papers."""
+    return re.sub(r"[^a-z0-9]+", "-", f"{kb.domain}-{kb.name}".lower()).strip("-")
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:  # pragma: no cover - depends on environment
+        raise ImportError("KB snapshots require pyarrow (pip install pyarrow)") from exc
+    return pa, pq
+
+
+def _payload_schema(pa):
+    # Known payload fields get real columns; anything else rides in extra.
+    strings = [
+        "paper_id",
+        "paper_title",
+        "source",
+        "title",
+        "page_content",
+        "authors",
+        "summary",
+        "published",
+        "primary_category",
+        "categories",
+        "entry_id",
+        "doi",
+        "domain",
+        "section_title",
+    ]
+    ints = [
+        "section_level",
+        "page_number",
+        "chunk_index",
+        "chunk_total",
+        "start_index",
+        "chunk_seq",
+        "chunk_count",
+    ]
+    return pa.schema(
+        [pa.field("point_id", pa.string())]
+        + [pa.field(name, pa.string()) for name in strings]
+        + [pa.field(name, pa.int64()) for name in ints]
+        + [pa.field("extra", pa.string())]
+    )
+
+
+def _column_types(schema) -> dict[str, type]:
+    import pyarrow as pa
+
+    return {
+        field.name: int if pa.types.is_integer(field.type) else str
+        for field in schema
+        if field.name not in ("point_id", "extra")
+    }
+
+
+def _payload_row(point_id: Any, payload: dict, columns: dict[str, type]) -> dict:
+    row = {"point_id": str(point_id)}
+    extra = {}
+    for key, value in payload.items():
+        if key in SCOPE_FIELDS:
+            continue
+        expected = columns.get(key)
+        if expected is not None and type(value) is expected:
+            row[key] = value
+        else:
+            # Unknown field, or a value of an unexpected type: keep it as-is.
+            extra[key] = value
+    row["extra"] = json.dumps(extra) if extra else None
+    return row
+
+
+def _row_payload(row: dict) -> dict:
+    extra = row.pop("extra", None)
+    row.pop("point_id", None)
+    payload = {key: value for key, value in row.items() if value is not None}
+    if extra:
+        payload.update(json.loads(extra))
+    return payload
+
+
+def _scroll_kb(
+    client: VectorBackend, collection: str, kb_id: int, batch_size: int
+) -> Iterator[list]:
+    kb_filter = Filter(
+        must=[FieldCondition(key="kb_id", match=MatchValue(value=kb_id))]
+    )
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection,
+            scroll_filter=kb_filter,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True,
+        )
+        if points:
+            yield points
+        if offset is None:
+            return
+
+
+def _export_collection(
+    client: VectorBackend, collection: str, kb_id: int, out: Path, name: str
+) -> dict:
+    pa, pq = _pyarrow()
+    schema = _payload_schema(pa)
+    columns = _column_types(schema)
+    rows = 0
+    dim = None
+    with (
+        (out / f"{name}.f32").open("wb") as vectors_file,
+        pq.ParquetWriter(out / f"{name}.parquet", schema, compression="zstd") as writer,
+    ):
+        for points in _scroll_kb(client, collection, kb_id, EXPORT_BATCH_SIZE):
+            vectors = np.asarray([p.vector for p in points], dtype=np.float32)
+            dim = dim or vectors.shape[1]
+            vectors_file.write(vectors.tobytes())
+            writer.write_table(
+                pa.Table.from_pylist(
+                    [_payload_row(p.id, p.payload or {}, columns) for p in points],
+                    schema=schema,
+                )
+            )
+            rows += len(points)
+    return {"rows": rows, "dim": dim}
+
+
+def export_kb(
+    db: Session,
+    client: VectorBackend,
+    kb_id: int,
+    out_dir: Path,
+    *,
+    config: Optional[QdrantConfig] = None,
+) -> dict:
+    """Write kb_id's chunk and paper vectors, payloads and document rows."""
+    config = config or get_qdrant_config()
+    kb = db.get(KnowledgeBase, kb_id)
+    if kb is None:
+        raise SnapshotError(f"Knowledge base {kb_id} not found")
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    chunks = _export_collection(
+        client, config.collection_name, kb_id, out_dir, "chunks"
+    )
+    papers = _export_collection(
+        client, config.paper_collection, kb_id, out_dir, "papers"
+    )
+    documents = (
+        db.query(KnowledgeBaseDocument)
+        .filter(KnowledgeBaseDocument.kb_id == kb_id)
+        .order_by(KnowledgeBaseDocument.id)
+        .all()
+    )
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "embedding_model": EMBEDDING_MODEL,
+        "vector_size": chunks["dim"] or papers["dim"] or config.vector_size,
+        "vector_reduction": reduction_fingerprint(get_reducer()),
+        "distance": "Cosine",
+        "chunks": chunks["rows"],
+        "papers": papers["rows"],
+        "knowledge_base": {
+            "name": kb.name,
+            "description": kb.description,
+            "domain": kb.domain,
+            "is_system": kb.is_system,
+            "chunking_strategy": kb.chunking_strategy.value,
+            "retrieval_mode": kb.retrieval_mode.value,
+            **{field: getattr(kb, field) for field in KB_SETTINGS},
+        },
+        "documents": [
+            {
+                "document_id": doc.document_id,
+                "title": doc.title,
+                "source": doc.source,
+                "chunk_count": doc.chunk_count,
+                "ingested_at": doc.ingested_at.isoformat() if doc.ingested_at else None,
+            }
+            for doc in documents
+        ],
+    }
+    (out_dir / "manifest.json").write_text(json.dumps(manifest, indent=2))
+    logger.info(
+        "Exported KB %s (%s): %d chunks, %d papers, %d documents to %s",
+        kb_id,
+        kb.name,
+        chunks["rows"],
+        papers["rows"],
+        len(documents),
+        out_dir,
+    )
+    return manifest
+
+
+def read_manifest(bundle: Path) -> dict:
+    try:
+        manifest = json.loads((bundle / "manifest.json").read_text())
+    except FileNotFoundError as exc:
+        raise SnapshotError(f"{bundle} has no manifest.json") from exc
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise SnapshotError(
+            f"Unsupported snapshot format {manifest.get('format_version')}"
+        )
+    return manifest
+
+
+def _find_or_create_kb(
+    db: Session, spec: dict, kb_id: Optional[int], owner_id: Optional[int]
+) -> KnowledgeBase:
+    if kb_id is not None:
+        kb = db.get(KnowledgeBase, kb_id)
+        if kb is None:
+            raise SnapshotError(f"Knowledge base {kb_id} not found")
+        return kb
+    is_system = owner_id is None and spec["is_system"]
+    kb = (
+        db.query(KnowledgeBase)
+        .filter(
+            KnowledgeBase.name == spec["name"],
+            KnowledgeBase.domain == spec["domain"],
+            KnowledgeBase.is_system.is_(is_system),
+            (
+                KnowledgeBase.owner_id.is_(None)
+                if owner_id is None
+                else KnowledgeBase.owner_id == owner_id
+            ),
+        )
+        .first()
+    )
+    if kb is not None:
+        return kb
+    kb = KnowledgeBase(
+        name=spec["name"],
+        description=spec.get("description"),
+        domain=spec["domain"],
+        owner_id=owner_id,
+        is_system=is_system,
+        chunking_strategy=ChunkingStrategy(spec["chunking_strategy"]),
+        retrieval_mode=RetrievalMode(spec.get("retrieval_mode", "flat")),
+        **{field: spec.get(field) for field in KB_SETTINGS},
+    )
+    db.add(kb)
+    db.commit()
+    db.refresh(kb)
+    logger.info("Created knowledge base %s (id=%s)", kb.name, kb.id)
+    return kb
+
+
+def _import_collection(
+    client: VectorBackend,
+    collection: str,
+    bundle: Path,
+    name: str,
+    *,
+    rows: int,
+    dim: int,
+    kb_id: int,
+    user_id: int,
+    batch_size: int,
+) -> int:
+    if rows == 0:
+        return 0
+    _, pq = _pyarrow()
+    vectors = np.memmap(bundle / f"{name}.f32", dtype=np.float32, mode="r")
+    if vectors.size != rows * dim:
+        raise SnapshotError(f"{name}.f32 holds {vectors.size} floats, not {rows}x{dim}")
+    vectors = vectors.reshape(rows, dim)
+    start = 0
+    for batch in pq.ParquetFile(bundle / f"{name}.parquet").iter_batches(batch_size):
+        points = []
+        for offset, row in enumerate(batch.to_pylist()):
+            old_id = row["point_id"]
+            payload = _row_payload(row)
+            payload.update(kb_id=kb_id, user_id=user_id)
+            if name == "papers":
+                point_id = QdrantStore.paper_point_id(
+                    payload["paper_id"], user_id, kb_id
+                )
+            else:
+                # Deterministic, so importing the same bundle again overwrites.
+                point_id = str(uuid.uuid5(uuid.NAMESPACE_URL, f"kb:{kb_id}/{old_id}"))
+            points.append(
+                PointStruct(
+                    id=point_id,
+                    vector=vectors[start + offset].tolist(),
+                    payload=payload,
+                )
+            )
+        client.upsert(collection_name=collection, points=points)
+        start += len(points)
+        logger.info("Imported %d/%d %s", start, rows, name)
+    return start
+
+
+def import_kb(
+    db: Session,
+    client: VectorBackend,
+    bundle: Path,
+    *,
+    kb_id: Optional[int] = None,
+    owner_id: Optional[int] = None,
+    config: Optional[QdrantConfig] = None,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    allow_model_mismatch: bool = False,
+) -> KnowledgeBase:
+    """
+    Load a bundle into kb_id, or into a KB matched (or created) by name and
+    domain. No embedding calls are made, so the bundle must come from the
+    same embedding model and vector size as this environment.
+    """
+    config = config or get_qdrant_config()
+    manifest = read_manifest(bundle)
+    if manifest["vector_size"] != config.vector_size:
+        raise SnapshotError(
+            f"Bundle vectors are {manifest['vector_size']}-d, "
+            f"collection expects {config.vector_size}"
+        )
+    if manifest["embedding_model"] != EMBEDDING_MODEL and not allow_model_mismatch:
+        raise SnapshotError(
+            f"Bundle was embedded with {manifest['embedding_model']}, "
+            f"this environment uses {EMBEDDING_MODEL}"
+        )
+    reduction = reduction_fingerprint(get_reducer())
+    bundle_reduction = manifest.get("vector_reduction", "none")
+    if bundle_reduction != reduction and not allow_model_mismatch:
+        raise SnapshotError(
+            f"Bundle vectors were reduced with {bundle_reduction}, "
+            f"this environment uses {reduction}"
+        )
+
+    kb = _find_or_create_kb(db, manifest["knowledge_base"], kb_id, owner_id)
+    for collection, name in (
+        (config.collection_name, "chunks"),
+        (config.paper_collection, "papers"),
+    ):
+        _import_collection(
+            client,
+            collection,
+            bundle,
+            name,
+            rows=manifest[name],
+            dim=manifest["vector_size"],
+            kb_id=kb.id,
+            user_id=0,
+            batch_size=batch_size,
+        )
+
+    existing = {
+        document_id
+        for (document_id,) in db.query(KnowledgeBaseDocument.document_id).filter(
+            KnowledgeBaseDocument.kb_id == kb.id
+        )
+    }
+    db.add_all(
+        KnowledgeBaseDocument(
+            kb_id=kb.id,
+            document_id=doc["document_id"],
+            title=doc["title"],
+            source=doc["source"],
+            chunk_count=doc["chunk_count"],
+        )
+        for doc in manifest["documents"]
+        if doc["document_id"] not in existing
+    )
+    db.commit()
+    logger.info(
+        "Imported %d chunks and %d documents into KB %s (id=%s)",
+        manifest["chunks"],
+        len(manifest["documents"]),
+        kb.name,
+        kb.id,
+    )
+    return kb
@@ -0,0 +1,117 @@
+"""Adaptive top-k: decide how many retrieved chunks are worth prompting with."""
+
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+from langchain_core.documents import Document
+
+from backend.config.settings import (
+    ADAPTIVE_MAX_K,
+    ADAPTIVE_MIN_GAP,
+    ADAPTIVE_MIN_K,
+    ADAPTIVE_RELATIVE_CUTOFF,
+    RETRIEVAL_SCORE_THRESHOLD,
+)
+
+
+@dataclass(frozen=True)
+class AdaptiveK:
+    """
+    Bounds and cut rules for adaptive top-k.
+
+    Search over-fetches max_k hits (score_threshold is applied by Qdrant),
+    then keeps hits scoring at least relative_cutoff * the top score and
+    stops at the largest score drop of at least min_gap, never going below
+    min_k or above max_k.
+    """
+
+    min_k: int = ADAPTIVE_MIN_K
+    max_k: int = ADAPTIVE_MAX_K
+    score_threshold: Optional[float] = RETRIEVAL_SCORE_THRESHOLD
+    relative_cutoff: float = ADAPTIVE_RELATIVE_CUTOFF
+    min_gap: float = ADAPTIVE_MIN_GAP
+
+    def cache_key(self) -> tuple:
+        return (
+            self.min_k,
+            self.max_k,
+            self.score_threshold,
+            self.relative_cutoff,
+            self.min_gap,
+        )
+
+    @classmethod
+    def with_overrides(
+        cls,
+        min_k: Optional[int] = None,
+        max_k: Optional[int] = None,
+        score_threshold: Optional[float] = None,
+    ) -> "AdaptiveK":
+        """Defaults with a KB's non-null overrides applied."""
+        defaults = cls()
+        low = min_k if min_k is not None else defaults.min_k
+        high = max_k if max_k is not None else defaults.max_k
+        return cls(
+            min_k=low,
+            max_k=max(high, low),
+            score_threshold=(
+                score_threshold
+                if score_threshold is not None
+                else defaults.score_threshold
+            ),
+        )
+
+    @classmethod
+    def combine(cls, policies: Sequence["AdaptiveK"]) -> "AdaptiveK":
+        """Most permissive policy across several KBs searched together."""
+        if not policies:
+            return cls()
+        thresholds = [p.score_threshold for p in policies]
+        return cls(
+            min_k=min(p.min_k for p in policies),
+            max_k=max(p.max_k for p in policies),
+            score_threshold=None if None in thresholds else min(thresholds),
+            relative_cutoff=min(p.relative_cutoff for p in policies),
+            min_gap=max(p.min_gap for p in policies),
+        )
+
+
+def choose_k(scores: Sequence[float], policy: AdaptiveK) -> int:
+    """Number of leading hits to keep, given scores sorted best-first."""
+    available = min(len(scores), policy.max_k)
+    floor = min(policy.min_k, available)
+    if available <= floor:
+        return available
+
+    k = available
+    if scores[0] > 0 and policy.relative_cutoff > 0:
+        cutoff = scores[0] * policy.relative_cutoff
+        k = next((i for i in range(k) if scores[i] < cutoff), k)
+
+    # Elbow: the biggest drop between neighbours, if it is a real cliff.
+    best_gap, elbow = 0.0, None
+    for i in range(max(floor, 1), k):
+        gap = scores[i - 1] - scores[i]
+        if gap > best_gap:
+            best_gap, elbow = gap, i
+    if elbow is not None and best_gap >= policy.min_gap:
+        k = elbow
+    return max(k, floor)
+
+
+def adaptive_cut(docs: list[Document], policy: AdaptiveK) -> list[Document]:
+    """
+    Keep the k best-scoring hits choose_k selects, in their original order
+    (fused multi-KB lists are not sorted by score).
+
+    The chosen k is recorded as retrieval_k on every kept document, since
+    neighbor expansion may later merge hits into fewer passages.
+    """
+    scores = [float(doc.metadata.get("score") or 0.0) for doc in docs]
+    ranked = sorted(range(len(docs)), key=lambda i: scores[i], reverse=True)
+    k = choose_k([scores[i] for i in ranked], policy)
+    keep = set(ranked[:k])
+    kept = [doc for i, doc in enumerate(docs) if i in keep]
+    for doc in kept:
+        doc.metadata["retrieval_k"] = len(kept)
+    return kept
@@ -0,0 +1,93 @@
+"""Small-to-big context expansion: merge retrieved chunks with their neighbors."""
+
+from typing import Any, Iterable, Optional
+
+from langchain_core.documents import Document
+
+
+def chunk_scope(meta: dict[str, Any]) -> tuple[Optional[int], Optional[int], str]:
+    """Key identifying one ingested copy of a paper (KB or user scoped)."""
+    return meta.get("kb_id"), meta.get("user_id"), meta.get("paper_id", "")
+
+
+def stored_overlap(left: Document, right: Document) -> int:
+    """
+    Characters right repeats from the end of left, from their start_index
+    offsets; 0 when either has none or the offsets don't describe an overlap
+    (chunkers that restart offsets per section or page).
+    """
+    left_start = left.metadata.get("start_index")
+    right_start = right.metadata.get("start_index")
+    if left_start is None or right_start is None or right_start <= left_start:
+        return 0
+    return max(left_start + len(left.page_content) - right_start, 0)
+
+
+def join_with_overlap(left: str, right: str, overlap: int = 0) -> str:
+    """
+    Concatenate adjacent chunks, dropping the overlap characters they share
+    at the seam. The overlap must come from chunk offsets: a suffix/prefix
+    match found by searching is often a coincidence ("the" + "each").
+    Without a confirmed overlap the chunks are joined with a line break.
+    """
+    if 0 < overlap < len(right) and left.endswith(right[:overlap]):
+        return left + right[overlap:]
+    return f"{left}\n{right}"
+
+
+def merge_adjacent_chunks(
+    hits: list[Document],
+    neighbors: Iterable[Document],
+) -> list[Document]:
+    """
+    Merge hits and fetched neighbors into contiguous passages.
+
+    Chunks are grouped per paper copy and ordered by chunk_seq; every run of
+    consecutive sequence numbers becomes one passage. Passages keep the metadata
+    of their best-scoring hit and are returned best first. Hits without a
+    chunk_seq (ingested before it was stored) pass through unchanged. Seams
+    are joined with join_with_overlap using the chunks' stored offsets.
+    """
+    by_key: dict[tuple, Document] = {}
+    passthrough: list[Document] = []
+    for doc in [*hits, *neighbors]:
+        seq = doc.metadata.get("chunk_seq")
+        if seq is None:
+            if doc.metadata.get("score") is not None:
+                passthrough.append(doc)
+            continue
+        by_key.setdefault((chunk_scope(doc.metadata), seq), doc)
+
+    grouped: dict[tuple, list[tuple[int, Document]]] = {}
+    for (scope, seq), doc in by_key.items():
+        grouped.setdefault(scope, []).append((seq, doc))
+
+    passages: list[Document] = []
+    for chunks in grouped.values():
+        chunks.sort(key=lambda item: item[0])
+        run: list[tuple[int, Document]] = []
+        for seq, doc in chunks:
+            if run and seq != run[-1][0] + 1:
+                passages.append(_passage_from_run(run))
+                run = []
+            run.append((seq, doc))
+        if run:
+            passages.append(_passage_from_run(run))
+
+    merged = [p for p in passages if p.metadata.get("score") is not None]
+    merged.extend(passthrough)
+    merged.sort(key=lambda d: d.metadata.get("score") or 0.0, reverse=True)
+    return merged
+
+
+def _passage_from_run(run: list[tuple[int, Document]]) -> Document:
+    scored = [doc for _, doc in run if doc.metadata.get("score") is not None]
+    anchor = max(scored, key=lambda d: d.metadata["score"]) if scored else run[0][1]
+    text = run[0][1].page_content
+    for (_, previous), (_, doc) in zip(run, run[1:]):
+        text = join_with_overlap(text, doc.page_content, stored_overlap(previous, doc))
+    meta = {
+        **anchor.metadata,
+        "chunk_span": [run[0][0], run[-1][0]],
+    }
+    return Document(page_content=text, metadata=meta)
@@ -0,0 +1,656 @@
+"""
+Embedded vector backend for single-node, edge and CI deployments.
+
+Each collection is a directory holding:
+  - vectors.f32: append-only float32 rows (L2-normalized), read via np.memmap
+  - payloads.sqlite: point ID, row number and JSON payload, with expression
+    indexes on filtered fields
+  - index.faiss: optional FAISS ANN index over the rows (HNSW, IVF or IVF-PQ)
+  - write.lock: held while a writer allocates rows and appends them
+
+Aliases live in aliases.json at the backend root and are resolved on every
+collection lookup, mirroring Qdrant's alias semantics.
+
+Filters arrive as Qdrant models and are translated to SQL over the payload
+side-index. Deleted or overwritten points leave dead rows in vectors.f32 that
+no longer appear in SQLite, so every search is restricted to live rows.
+
+Several processes may share a collection (e.g. bulk_ingest next to the API).
+Row numbers are allocated under a file lock, and FAISS ids are row numbers:
+a cached index is caught up with rows appended by other processes before
+every add and search.
+"""
+
+import json
+import logging
+import os
+import re
+import shutil
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Iterable, Optional, Sequence
+
+import numpy as np
+from qdrant_client.http.models import (
+    AliasDescription,
+    CollectionsAliasesResponse,
+    CreateAliasOperation,
+    DeleteAliasOperation,
+    Distance,
+    FieldCondition,
+    Filter,
+    FilterSelector,
+    PointIdsList,
+    PointStruct,
+    QueryRequest,
+    QueryResponse,
+    Record,
+    RenameAliasOperation,
+    ScoredPoint,
+    VectorParams,
+)
+
+from backend.config.vector_backend_config import VectorBackendConfig
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process lock applies
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+_FIELD_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def _field_expr(key: str) -> str:
+    if not _FIELD_PATTERN.match(key):
+        raise ValueError(f"Unsupported payload key for embedded backend: {key!r}")
+    # Must match the indexed expression textually for SQLite to use the index.
+    return f"json_extract(payload, '$.{key}')"
+
+
+def _condition_sql(condition: Any) -> tuple[str, list]:
+    if isinstance(condition, Filter):
+        return filter_to_sql(condition)
+    if not isinstance(condition, FieldCondition):
+        raise NotImplementedError(
+            f"Embedded backend does not support {type(condition).__name__}"
+        )
+    expr = _field_expr(condition.key)
+    if condition.match is not None:
+        if hasattr(condition.match, "value"):
+            return f"{expr} = ?", [condition.match.value]
+        if hasattr(condition.match, "any"):
+            values = list(condition.match.any)
+            if not values:
+                return "0", []
+            return f"{expr} IN ({', '.join('?' for _ in values)})", values
+        raise NotImplementedError(
+            f"Embedded backend does not support {type(condition.match).__name__}"
+        )
+    if condition.range is not None:
+        parts, params = [], []
+        for attr, op in (("gt", ">"), ("gte", ">="), ("lt", "<"), ("lte", "<=")):
+            bound = getattr(condition.range, attr)
+            if bound is not None:
+                parts.append(f"{expr} {op} ?")
+                params.append(bound)
+        return " AND ".join(parts) or "1", params
+    raise NotImplementedError("Embedded backend supports match and range only")
+
+
+def filter_to_sql(query_filter: Optional[Filter]) -> tuple[str, list]:
+    """Translate a Qdrant Filter (must/should/must_not) into a SQL predicate."""
+    if query_filter is None:
+        return "1", []
+    clauses: list[str] = []
+    params: list = []
+
+    def _as_list(value) -> list:
+        if value is None:
+            return []
+        return list(value) if isinstance(value, (list, tuple)) else [value]
+
+    for condition in _as_list(query_filter.must):
+        sql, p = _condition_sql(condition)
+        clauses.append(f"({sql})")
+        params.extend(p)
+    should = [_condition_sql(c) for c in _as_list(query_filter.should)]
+    if should:
+        clauses.append("(" + " OR ".join(f"({sql})" for sql, _ in should) + ")")
+        for _, p in should:
+            params.extend(p)
+    for condition in _as_list(query_filter.must_not):
+        sql, p = _condition_sql(condition)
+        clauses.append(f"NOT ({sql})")
+        params.extend(p)
+    return " AND ".join(clauses) or "1", params
+
+
+def _decode_id(point_id: str) -> Any:
+    return int(point_id) if point_id.isdigit() else point_id
+
+
+def _select_payload(payload: dict, with_payload: Any) -> Optional[dict]:
+    if with_payload is True:
+        return payload
+    if not with_payload:
+        return None
+    return {k: payload[k] for k in with_payload if k in payload}
+
+
+@contextmanager
+def _file_lock(path: Path):
+    """Exclusive lock shared by every process writing to the collection."""
+    with path.open("a") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32, copy=False)
+
+
+class _EmbeddedCollection:
+    """One collection: memmapped vectors, SQLite payloads, optional FAISS index."""
+
+    def __init__(self, path: Path, config: VectorBackendConfig):
+        self.path = path
+        self.config = config
+        meta = json.loads((path / "meta.json").read_text())
+        self.dim = int(meta["size"])
+        self._vectors_path = path / "vectors.f32"
+        self._index_path = path / "index.faiss"
+        self._write_lock_path = path / "write.lock"
+        self._vectors_path.touch(exist_ok=True)
+        self._db = sqlite3.connect(
+            str(path / "payloads.sqlite"), check_same_thread=False
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS points ("
+            "row INTEGER PRIMARY KEY, point_id TEXT UNIQUE NOT NULL, "
+            "payload TEXT NOT NULL)"
+        )
+        self._db.commit()
+        self._memmap: Optional[np.memmap] = None
+        self._index = None
+        self._lock = threading.RLock()
+
+    @property
+    def row_count(self) -> int:
+        return self._vectors_path.stat().st_size // (4 * self.dim)
+
+    def _vectors(self) -> np.ndarray:
+        rows = self.row_count
+        if self._memmap is None or self._memmap.shape[0] != rows:
+            if rows == 0:
+                return np.empty((0, self.dim), dtype=np.float32)
+            self._memmap = np.memmap(
+                self._vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim)
+            )
+        return self._memmap
+
+    def create_index(self, field_name: str) -> None:
+        expr = _field_expr(field_name)
+        self._db.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{field_name} ON points({expr})"
+        )
+        self._db.commit()
+
+    def upsert(self, points: Sequence[PointStruct]) -> None:
+        if not points:
+            return
+        vectors = _normalize(np.asarray([p.vector for p in points], dtype=np.float32))
+        if vectors.shape[1] != self.dim:
+            raise ValueError(
+                f"Vector size {vectors.shape[1]} does not match collection {self.dim}"
+            )
+        row_bytes = 4 * self.dim
+        with self._lock, _file_lock(self._write_lock_path):
+            # Vectors first: a crash before the SQLite commit only leaves dead rows.
+            with self._vectors_path.open("r+b") as f:
+                start = f.seek(0, os.SEEK_END) // row_bytes
+                # Drop the partial row a crashed writer may have left, so new
+                # rows start on a row boundary.
+                f.truncate(start * row_bytes)
+                f.seek(start * row_bytes)
+                f.write(vectors.tobytes())
+            self._db.executemany(
+                "INSERT OR REPLACE INTO points(row, point_id, payload) "
+                "VALUES (?, ?, ?)",
+                [
+                    (start + i, str(p.id), json.dumps(p.payload or {}))
+                    for i, p in enumerate(points)
+                ],
+            )
+            self._db.commit()
+            if self._index is not None:
+                self._catch_up(self._index)
+
+    def delete(self, selector: Any) -> None:
+        with self._lock:
+            if isinstance(selector, FilterSelector):
+                selector = selector.filter
+            if isinstance(selector, Filter):
+                sql, params = filter_to_sql(selector)
+                self._db.execute(f"DELETE FROM points WHERE {sql}", params)
+            else:
+                ids = (
+                    selector.points if isinstance(selector, PointIdsList) else selector
+                )
+                self._db.executemany(
+                    "DELETE FROM points WHERE point_id = ?", [(str(i),) for i in ids]
+                )
+            self._db.commit()
+
+    def _candidate_rows(self, query_filter: Optional[Filter]) -> np.ndarray:
+        sql, params = filter_to_sql(query_filter)
+        rows = self._db.execute(f"SELECT row FROM points WHERE {sql}", params)
+        return np.fromiter((r[0] for r in rows), dtype=np.int64)
+
+    def _payloads(self, rows: Iterable[int]) -> dict[int, tuple[str, dict]]:
+        rows = [int(r) for r in rows]
+        if not rows:
+            return {}
+        found = self._db.execute(
+            f"SELECT row, point_id, payload FROM points "
+            f"WHERE row IN ({', '.join('?' for _ in rows)})",
+            rows,
+        )
+        return {row: (pid, json.loads(payload)) for row, pid, payload in found}
+
+    def search(
+        self,
+        query: Sequence[float],
+        query_filter: Optional[Filter],
+        limit: int,
+        with_payload: Any = True,
+        with_vectors: bool = False,
+        score_threshold: Optional[float] = None,
+    ) -> list[ScoredPoint]:
+        with self._lock:
+            candidates = self._candidate_rows(query_filter)
+            if candidates.size == 0 or limit <= 0:
+                return []
+            q = _normalize(np.asarray([query], dtype=np.float32))
+            if (
+                self.config.index_type == "flat"
+                or candidates.size <= self.config.exact_search_threshold
+            ):
+                rows, scores = self._exact_search(q[0], candidates, limit)
+            else:
+                rows, scores = self._ann_search(q, candidates, limit)
+            vectors = self._vectors() if with_vectors else None
+            payloads = self._payloads(rows)
+        results = []
+        for row, score in zip(rows, scores):
+            if row not in payloads:
+                continue
+            if score_threshold is not None and score < score_threshold:
+                continue
+            point_id, payload = payloads[row]
+            results.append(
+                ScoredPoint(
+                    id=_decode_id(point_id),
+                    version=0,
+                    score=float(score),
+                    payload=_select_payload(payload, with_payload),
+                    vector=vectors[row].tolist() if vectors is not None else None,
+                )
+            )
+        return results
+
+    def _exact_search(self, q: np.ndarray, candidates: np.ndarray, limit: int):
+        scores = self._vectors()[candidates] @ q
+        k = min(limit, scores.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [int(r) for r in candidates[top]], scores[top].tolist()
+
+    def _ann_search(self, q: np.ndarray, candidates: np.ndarray, limit: int):
+        import faiss
+
+        index = self._ensure_ann_index()
+        if index is None:
+            return self._exact_search(q[0], candidates, limit)
+        selector = faiss.IDSelectorBatch(candidates)
+        if self.config.index_type == "hnsw":
+            params = faiss.SearchParametersHNSW(
+                sel=selector, efSearch=max(self.config.hnsw_ef_search, limit)
+            )
+        else:
+            params = faiss.SearchParametersIVF(
+                sel=selector, nprobe=self.config.ivf_nprobe
+            )
+        scores, rows = index.search(q, limit, params=params)
+        keep = rows[0] >= 0
+        return [int(r) for r in rows[0][keep]], scores[0][keep].tolist()
+
+    def _catch_up(self, index) -> None:
+        """Add rows appended since index was last extended, by any process."""
+        vectors = self._vectors()
+        if index.ntotal < vectors.shape[0]:
+            index.add(np.ascontiguousarray(vectors[index.ntotal :]))
+
+    def _ensure_ann_index(self):
+        """Load or build the FAISS index and catch it up with appended rows."""
+        if self._index is not None:
+            self._catch_up(self._index)
+            return self._index
+        try:
+            import faiss
+        except ImportError:
+            logger.warning("faiss not installed; embedded backend uses exact search")
+            return None
+        vectors = self._vectors()
+        if self._index_path.exists():
+            index = faiss.read_index(str(self._index_path))
+        else:
+            index = self._new_index(faiss, vectors)
+            if index is None:
+                return None
+        self._catch_up(index)
+        self._index = index
+        faiss.write_index(index, str(self._index_path))
+        logger.info(
+            "Built %s index for %s (%d rows)",
+            self.config.index_type,
+            self.path.name,
+            index.ntotal,
+        )
+        return index
+
+    def _new_index(self, faiss, vectors: np.ndarray):
+        cfg = self.config
+        if cfg.index_type == "hnsw":
+            return faiss.IndexHNSWFlat(self.dim, cfg.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+        quantizer = faiss.IndexFlatIP(self.dim)
+        if cfg.index_type == "ivfpq":
+            index = faiss.IndexIVFPQ(
+                quantizer,
+                self.dim,
+                cfg.ivf_nlist,
+                cfg.pq_m,
+                8,
+                faiss.METRIC_INNER_PRODUCT,
+            )
+        else:
+            index = faiss.IndexIVFFlat(
+                quantizer, self.dim, cfg.ivf_nlist, faiss.METRIC_INNER_PRODUCT
+            )
+        # FAISS wants roughly 39 training points per list.
+        min_train = 39 * cfg.ivf_nlist
+        if vectors.shape[0] < min_train:
+            logger.info(
+                "Too few rows (%d < %d) to train %s; using exact search",
+                vectors.shape[0],
+                min_train,
+                cfg.index_type,
+            )
+            return None
+        sample = np.random.default_rng(0).choice(
+            vectors.shape[0],
+            size=min(vectors.shape[0], 256 * cfg.ivf_nlist),
+            replace=False,
+        )
+        index.train(np.ascontiguousarray(vectors[np.sort(sample)]))
+        return index
+
+    def scroll(
+        self,
+        scroll_filter: Optional[Filter],
+        limit: int,
+        offset: Any,
+        with_payload: Any = True,
+        with_vectors: bool = False,
+    ) -> tuple[list[Record], Optional[int]]:
+        sql, params = filter_to_sql(scroll_filter)
+        start = int(offset) if offset is not None else 0
+        with self._lock:
+            found = self._db.execute(
+                f"SELECT row, point_id, payload FROM points "
+                f"WHERE row >= ? AND ({sql}) ORDER BY row LIMIT ?",
+                [start, *params, limit + 1],
+            ).fetchall()
+            vectors = self._vectors() if with_vectors else None
+        next_offset = found[limit][0] if len(found) > limit else None
+        records = [
+            Record(
+                id=_decode_id(pid),
+                payload=_select_payload(json.loads(payload), with_payload),
+                vector=vectors[row].tolist() if vectors is not None else None,
+            )
+            for row, pid, payload in found[:limit]
+        ]
+        return records, next_offset
+
+    def count(self, count_filter: Optional[Filter] = None) -> int:
+        sql, params = filter_to_sql(count_filter)
+        with self._lock:
+            return self._db.execute(
+                f"SELECT COUNT(*) FROM points WHERE {sql}", params
+            ).fetchone()[0]
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._index is not None:
+                import faiss
+
+                faiss.write_index(self._index, str(self._index_path))
+
+    def close(self) -> None:
+        self.flush()
+        self._memmap = None
+        self._db.close()
+
+
+class EmbeddedVectorBackend:
+    """Local-files implementation of the VectorBackend interface."""
+
+    def __init__(self, config: VectorBackendConfig):
+        self.config = config
+        self.root = Path(config.embedded_path)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._collections: dict[str, _EmbeddedCollection] = {}
+        self._lock = threading.Lock()
+
+        self._aliases_path = self.root / "aliases.json"
+        self._aliases: dict[str, str] = {}
+        self._aliases_mtime: Optional[float] = None
+
+    def _load_aliases(self) -> dict[str, str]:
+        # Re-read when another process (e.g. a re-embed job) swapped an alias.
+        try:
+            mtime = self._aliases_path.stat().st_mtime
+        except FileNotFoundError:
+            self._aliases, self._aliases_mtime = {}, None
+            return self._aliases
+        if mtime != self._aliases_mtime:
+            self._aliases = json.loads(self._aliases_path.read_text())
+            self._aliases_mtime = mtime
+        return self._aliases
+
+    def _save_aliases(self, aliases: dict[str, str]) -> None:
+        tmp = self._aliases_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(aliases, sort_keys=True))
+        os.replace(tmp, self._aliases_path)
+        self._aliases, self._aliases_mtime = aliases, None
+
+    def _resolve(self, name: str) -> str:
+        return self._load_aliases().get(name, name)
+
+    def _collection(self, collection_name: str) -> _EmbeddedCollection:
+        collection_name = self._resolve(collection_name)
+        collection = self._collections.get(collection_name)
+        if collection is None:
+            with self._lock:
+                collection = self._collections.get(collection_name)
+                if collection is None:
+                    if not self.collection_exists(collection_name):
+                        raise ValueError(f"Collection {collection_name} not found")
+                    collection = _EmbeddedCollection(
+                        self.root / collection_name, self.config
+                    )
+                    self._collections[collection_name] = collection
+        return collection
+
+    def collection_exists(self, collection_name: str) -> bool:
+        return (self.root / collection_name / "meta.json").exists()
+
+    def create_collection(
+        self, collection_name: str, vectors_config: VectorParams, **kwargs: Any
+    ) -> bool:
+        if vectors_config.distance != Distance.COSINE:
+            raise NotImplementedError("Embedded backend supports cosine distance only")
+        path = self.root / collection_name
+        path.mkdir(parents=True, exist_ok=True)
+        (path / "meta.json").write_text(
+            json.dumps({"size": vectors_config.size, "distance": "Cosine"})
+        )
+        return True
+
+    def get_collection(self, collection_name: str) -> Any:
+        collection = self._collection(collection_name)
+        return SimpleNamespace(
+            config=SimpleNamespace(
+                params=SimpleNamespace(
+                    vectors=VectorParams(size=collection.dim, distance=Distance.COSINE)
+                )
+            ),
+            points_count=collection.count(),
+        )
+
+    def delete_collection(self, collection_name: str, **kwargs: Any) -> bool:
+        with self._lock:
+            collection = self._collections.pop(collection_name, None)
+            if collection is not None:
+                collection.close()
+            shutil.rmtree(self.root / collection_name, ignore_errors=True)
+            aliases = self._load_aliases()
+            if collection_name in aliases.values():
+                self._save_aliases(
+                    {a: c for a, c in aliases.items() if c != collection_name}
+                )
+        return True
+
+    def get_aliases(self, **kwargs: Any) -> CollectionsAliasesResponse:
+        return CollectionsAliasesResponse(
+            aliases=[
+                AliasDescription(alias_name=alias, collection_name=target)
+                for alias, target in sorted(self._load_aliases().items())
+            ]
+        )
+
+    def update_collection_aliases(
+        self, change_aliases_operations: Sequence[Any], **kwargs: Any
+    ) -> bool:
+        """Apply all alias operations, then publish them in one atomic write."""
+        with self._lock:
+            aliases = dict(self._load_aliases())
+            for operation in change_aliases_operations:
+                if isinstance(operation, CreateAliasOperation):
+                    target = operation.create_alias.collection_name
+                    if not self.collection_exists(target):
+                        raise ValueError(f"Collection {target} not found")
+                    aliases[operation.create_alias.alias_name] = target
+                elif isinstance(operation, DeleteAliasOperation):
+                    aliases.pop(operation.delete_alias.alias_name, None)
+                elif isinstance(operation, RenameAliasOperation):
+                    rename = operation.rename_alias
+                    aliases[rename.new_alias_name] = aliases.pop(rename.old_alias_name)
+                else:
+                    raise NotImplementedError(
+                        f"Unsupported alias operation {operation}"
+                    )
+            self._save_aliases(aliases)
+        return True
+
+    def create_payload_index(
+        self, collection_name: str, field_name: str, field_schema: Any = None, **kwargs
+    ) -> None:
+        self._collection(collection_name).create_index(field_name)
+
+    def upsert(
+        self, collection_name: str, points: Sequence[PointStruct], **kwargs: Any
+    ) -> None:
+        self._collection(collection_name).upsert(list(points))
+
+    def query_points(
+        self,
+        collection_name: str,
+        query: Any = None,
+        query_filter: Optional[Filter] = None,
+        limit: int = 10,
+        with_payload: Any = True,
+        with_vectors: bool = False,
+        score_threshold: Optional[float] = None,
+        **kwargs: Any,
+    ) -> QueryResponse:
+        points = self._collection(collection_name).search(
+            query,
+            query_filter,
+            limit,
+            with_payload=with_payload,
+            with_vectors=with_vectors,
+            score_threshold=score_threshold,
+        )
+        return QueryResponse(points=points)
+
+    def query_batch_points(
+        self, collection_name: str, requests: Sequence[QueryRequest], **kwargs: Any
+    ) -> list[QueryResponse]:
+        return [
+            self.query_points(
+                collection_name,
+                query=request.query,
+                query_filter=request.filter,
+                limit=request.limit or 10,
+                with_payload=(
+                    True if request.with_payload is None else request.with_payload
+                ),
+                with_vectors=bool(request.with_vector),
+                score_threshold=request.score_threshold,
+            )
+            for request in requests
+        ]
+
+    def scroll(
+        self,
+        collection_name: str,
+        scroll_filter: Optional[Filter] = None,
+        limit: int = 10,
+        offset: Any = None,
+        with_payload: Any = True,
+        with_vectors: bool = False,
+        **kwargs: Any,
+    ) -> tuple[list[Record], Optional[int]]:
+        return self._collection(collection_name).scroll(
+            scroll_filter, limit, offset, with_payload, with_vectors
+        )
+
+    def count(
+        self, collection_name: str, count_filter: Optional[Filter] = None, **kwargs
+    ) -> SimpleNamespace:
+        return SimpleNamespace(
+            count=self._collection(collection_name).count(count_filter)
+        )
+
+    def delete(self, collection_name: str, points_selector: Any, **kwargs: Any) -> None:
+        self._collection(collection_name).delete(points_selector)
+
+    def close(self) -> None:
+        with self._lock:
+            for collection in self._collections.values():
+                collection.close()
+            self._collections.clear()
@@ -0,0 +1,74 @@
+"""Rank fusion for combining several retrieval result lists."""
+
+from typing import Hashable, Sequence
+
+from langchain_core.documents import Document
+
+# Standard RRF damping constant (Cormack et al., 2009).
+RRF_K = 60
+
+
+def _doc_key(doc: Document) -> Hashable:
+    meta = doc.metadata
+    return meta.get("point_id") or (
+        meta.get("kb_id"),
+        meta.get("user_id"),
+        meta.get("paper_id"),
+        meta.get("chunk_seq"),
+        doc.page_content,
+    )
+
+
+def reciprocal_rank_fusion(
+    result_lists: Sequence[Sequence[Document]], k: int = RRF_K
+) -> list[Document]:
+    """
+    Fuse ranked lists with reciprocal rank fusion.
+
+    Each document scores sum(1 / (k + rank)) over the lists it appears in. The
+    fused score is stored as metadata["fused_score"]; metadata["score"] keeps the
+    best raw similarity seen for the document.
+    """
+    fused: dict[Hashable, Document] = {}
+    scores: dict[Hashable, float] = {}
+    for results in result_lists:
+        for rank, doc in enumerate(results, start=1):
+            key = _doc_key(doc)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+            best = fused.get(key)
+            if best is None or (doc.metadata.get("score") or 0.0) > (
+                best.metadata.get("score") or 0.0
+            ):
+                fused[key] = doc
+    ordered = sorted(fused, key=lambda key: scores[key], reverse=True)
+    for key in ordered:
+        fused[key].metadata["fused_score"] = scores[key]
+    return [fused[key] for key in ordered]
+
+
+def interleave_quotas(
+    groups: Sequence[Sequence[Document]], limit: int
+) -> list[Document]:
+    """
+    Take results round-robin from each group so every group gets a fair share.
+
+    Groups that run out early leave their remaining slots to the others.
+    """
+    merged: list[Document] = []
+    seen: set = set()
+    iterators = [iter(group) for group in groups]
+    while iterators and len(merged) < limit:
+        remaining = []
+        for it in iterators:
+            for doc in it:
+                key = _doc_key(doc)
+                if key in seen:
+                    continue
+                seen.add(key)
+                merged.append(doc)
+                remaining.append(it)
+                break
+            if len(merged) >= limit:
+                break
+        iterators = remaining
+    return merged
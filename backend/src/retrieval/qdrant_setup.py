@@ -1,85 +1,309 @@
 """Qdrant database setup: client and collection initialization."""
 
 import logging
+import os
+import threading
 from typing import Optional
 
 from qdrant_client import QdrantClient
-from qdrant_client.http.models import Distance, PayloadSchemaType, VectorParams
+from qdrant_client.http.models import (
+    CreateAlias,
+    CreateAliasOperation,
+    DeleteAlias,
+    DeleteAliasOperation,
+    Distance,
+    PayloadSchemaType,
+    VectorParams,
+)
 
-from backend.config.qdrant_config import get_qdrant_config
+from backend.config.qdrant_config import QdrantConfig, get_qdrant_config
+from backend.config.vector_backend_config import get_vector_backend_config
+from backend.src.retrieval.vector_backend import VectorBackend
 
 logger = logging.getLogger(__name__)
 
+CHUNK_PAYLOAD_INDEXES = [
+    ("user_id", PayloadSchemaType.INTEGER),
+    ("paper_id", PayloadSchemaType.KEYWORD),
+    ("kb_id", PayloadSchemaType.INTEGER),
+    ("section_title", PayloadSchemaType.KEYWORD),
+    ("domain", PayloadSchemaType.KEYWORD),
+    ("page_number", PayloadSchemaType.INTEGER),
+    ("chunk_seq", PayloadSchemaType.INTEGER),
+]
+PAPER_PAYLOAD_INDEXES = [
+    ("user_id", PayloadSchemaType.INTEGER),
+    ("paper_id", PayloadSchemaType.KEYWORD),
+    ("kb_id", PayloadSchemaType.INTEGER),
+    ("domain", PayloadSchemaType.KEYWORD),
+]
+
+
+_client: Optional[QdrantClient] = None
+_client_pid: Optional[int] = None
+_client_lock = threading.Lock()
+_embedded: Optional[VectorBackend] = None
+_embedded_pid: Optional[int] = None
+
+
+def create_qdrant_client(config: Optional[QdrantConfig] = None) -> QdrantClient:
+    """Create a new Qdrant client using the configured transport."""
+    config = config or get_qdrant_config()
+    kwargs = {}
+    if config.prefer_grpc:
+        kwargs["grpc_options"] = config.grpc_options
+    else:
+        kwargs["http2"] = config.http2
+    return QdrantClient(
+        host=config.host,
+        port=config.port,
+        grpc_port=config.grpc_port,
+        prefer_grpc=config.prefer_grpc,
+        https=config.use_https,
+        timeout=config.timeout,
+        pool_size=config.pool_size,
+        **kwargs,
+    )
+
 
 def get_qdrant_client() -> QdrantClient:
-    """Create and return a Qdrant client from config."""
-    config = get_qdrant_config()
-    client = QdrantClient(host=config.host, port=config.port, prefer_grpc=False)
-    return client
+    """
+    Return the process-wide Qdrant client, creating it on first use.
+
+    The client is rebuilt after a fork, since gRPC channels and pooled HTTP
+    connections must not be shared across processes.
+    """
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _client_lock:
+            if _client is None or _client_pid != pid:
+                config = get_qdrant_config()
+                _client = create_qdrant_client(config)
+                _client_pid = pid
+                logger.info(
+                    "Connected to Qdrant at %s:%s via %s",
+                    config.host,
+                    config.grpc_port if config.prefer_grpc else config.port,
+                    config.transport,
+                )
+    return _client
+
+
+def get_vector_backend() -> VectorBackend:
+    """
+    Return the process-wide vector backend selected by VECTOR_BACKEND.
+
+    "qdrant" (default) is the shared Qdrant client; "embedded" is a local
+    FAISS/NumPy-memmap store with the same API, for running without a vector
+    service.
+    """
+    global _embedded, _embedded_pid
+    config = get_vector_backend_config()
+    if config.backend != "embedded":
+        return get_qdrant_client()
+    pid = os.getpid()
+    if _embedded is None or _embedded_pid != pid:
+        with _client_lock:
+            if _embedded is None or _embedded_pid != pid:
+                from backend.src.retrieval.embedded_backend import (
+                    EmbeddedVectorBackend,
+                )
+
+                _embedded = EmbeddedVectorBackend(config)
+                _embedded_pid = pid
+                logger.info(
+                    "Using embedded vector backend at %s (%s index)",
+                    config.embedded_path,
+                    config.index_type,
+                )
+    return _embedded
 
 
 def init_qdrant_collection(
-    client: Optional[QdrantClient] = None,
+    client: Optional[VectorBackend] = None,
     *,
     recreate: bool = False,
-) -> QdrantClient:
+) -> VectorBackend:
     """
-    Ensure the Qdrant collection exists with the correct vector size
-    and payload indexes for efficient user-scoped filtering.
-    Returns the Qdrant client.
+    Ensure the chunk and paper-level collections exist with the correct
+    vector size and payload indexes for efficient user-scoped filtering.
+
+    QDRANT_COLLECTION_NAME (and the paper collection name) are aliases onto
+    versioned collections such as research_papers_v1; whatever version an
+    alias points at is served, so a re-embed can swap it without a restart.
+    Returns the vector backend.
     """
     config = get_qdrant_config()
     if client is None:
-        client = get_qdrant_client()
-
-    if recreate and client.collection_exists(config.collection_name):
-        client.delete_collection(config.collection_name)
-        logger.info("Deleted existing Qdrant collection: %s", config.collection_name)
-
-    if client.collection_exists(config.collection_name):
-        collection_info = client.get_collection(config.collection_name)
-        vectors = collection_info.config.params.vectors
-        existing_size = vectors.size if isinstance(vectors, VectorParams) else None
-        if existing_size != config.vector_size:
-            logger.warning(
-                "Qdrant collection %s has vector size %s but expected %s. Recreating...",
-                config.collection_name,
+        client = get_vector_backend()
+
+    for alias, payload_fields in (
+        (config.collection_name, CHUNK_PAYLOAD_INDEXES),
+        (config.paper_collection, PAPER_PAYLOAD_INDEXES),
+    ):
+        _ensure_aliased_collection(
+            client,
+            alias,
+            config.versioned(alias),
+            config.vector_size,
+            recreate=recreate,
+            payload_fields=payload_fields,
+        )
+    return client
+
+
+def resolve_alias(client: VectorBackend, alias: str) -> Optional[str]:
+    """Collection the alias currently points at, or None if it is not an alias."""
+    for description in client.get_aliases().aliases:
+        if description.alias_name == alias:
+            return description.collection_name
+    return None
+
+
+def swap_aliases(client: VectorBackend, targets: dict[str, str]) -> dict[str, str]:
+    """
+    Atomically repoint each alias at its target collection.
+
+    All deletes and creates go in one update request, so searches never see
+    an alias missing or the chunk and paper aliases on different versions.
+    Returns the previous targets; passing them back in is the rollback.
+    """
+    previous = {}
+    operations: list = []
+    for alias, collection_name in targets.items():
+        current = resolve_alias(client, alias)
+        if current is not None:
+            previous[alias] = current
+            operations.append(
+                DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=alias))
+            )
+        operations.append(
+            CreateAliasOperation(
+                create_alias=CreateAlias(
+                    collection_name=collection_name, alias_name=alias
+                )
+            )
+        )
+    client.update_collection_aliases(change_aliases_operations=operations)
+    for alias, collection_name in targets.items():
+        logger.info(
+            "Alias %s now points at %s (was %s)",
+            alias,
+            collection_name,
+            previous.get(alias),
+        )
+    return previous
+
+
+def swap_alias(
+    client: VectorBackend, alias: str, collection_name: str
+) -> Optional[str]:
+    """Repoint one alias; returns the collection it pointed at before."""
+    return swap_aliases(client, {alias: collection_name}).get(alias)
+
+
+def _ensure_aliased_collection(
+    client: VectorBackend,
+    alias: str,
+    versioned_name: str,
+    vector_size: int,
+    *,
+    recreate: bool,
+    payload_fields: list[tuple[str, PayloadSchemaType]],
+) -> None:
+    target = resolve_alias(client, alias)
+    if target is None and client.collection_exists(alias):
+        # Pre-versioning deployment: a plain collection under the alias name.
+        # reembed_collection.py --drop-legacy moves it behind an alias.
+        logger.warning("Qdrant collection %s is not versioned", alias)
+        target = alias
+    if target is not None and not recreate:
+        _ensure_collection(
+            client,
+            target,
+            vector_size,
+            recreate=False,
+            payload_fields=payload_fields,
+        )
+        return
+
+    if recreate and target == alias:
+        # The alias can't be created while a collection holds its name.
+        client.delete_collection(alias)
+        logger.info("Deleted existing Qdrant collection: %s", alias)
+    # Deleting a collection drops the aliases onto it, so recreating always
+    # ends by pointing the alias at the fresh collection again.
+    _ensure_collection(
+        client,
+        versioned_name,
+        vector_size,
+        recreate=recreate,
+        payload_fields=payload_fields,
+    )
+    previous = swap_alias(client, alias, versioned_name)
+    if recreate and previous not in (None, versioned_name):
+        client.delete_collection(previous)
+        logger.info("Deleted existing Qdrant collection: %s", previous)
+
+
+def _vector_size(client: VectorBackend, collection_name: str) -> Optional[int]:
+    vectors = client.get_collection(collection_name).config.params.vectors
+    return vectors.size if isinstance(vectors, VectorParams) else None
+
+
+def _ensure_collection(
+    client: VectorBackend,
+    collection_name: str,
+    vector_size: int,
+    *,
+    recreate: bool,
+    payload_fields: list[tuple[str, PayloadSchemaType]],
+) -> None:
+    if recreate and client.collection_exists(collection_name):
+        client.delete_collection(collection_name)
+        logger.info("Deleted existing Qdrant collection: %s", collection_name)
+
+    if client.collection_exists(collection_name):
+        existing_size = _vector_size(client, collection_name)
+        if existing_size != vector_size:
+            # Dropping the live collection would be an outage plus a full
+            # re-ingest; re-embed into a new version and swap the alias instead.
+            logger.error(
+                "Qdrant collection %s has vector size %s but expected %s; "
+                "run scripts/reembed_collection.py to migrate it",
+                collection_name,
                 existing_size,
-                config.vector_size,
+                vector_size,
             )
-            client.delete_collection(config.collection_name)
         else:
-            logger.debug("Qdrant collection already exists: %s", config.collection_name)
-            _ensure_payload_indexes(client, config.collection_name)
-            return client
+            logger.debug("Qdrant collection already exists: %s", collection_name)
+        _ensure_payload_indexes(client, collection_name, payload_fields)
+        return
 
     client.create_collection(
-        collection_name=config.collection_name,
+        collection_name=collection_name,
         vectors_config=VectorParams(
-            size=config.vector_size,
+            size=vector_size,
             distance=Distance.COSINE,
         ),
     )
     logger.info(
         "Created Qdrant collection %s with vector size %s",
-        config.collection_name,
-        config.vector_size,
+        collection_name,
+        vector_size,
     )
 
-    _ensure_payload_indexes(client, config.collection_name)
-    return client
+    _ensure_payload_indexes(client, collection_name, payload_fields)
 
 
-def _ensure_payload_indexes(client: QdrantClient, collection_name: str) -> None:
+def _ensure_payload_indexes(
+    client: VectorBackend,
+    collection_name: str,
+    payload_fields: list[tuple[str, PayloadSchemaType]],
+) -> None:
     """Create payload indexes for efficient user and KB filtering."""
-    for field, schema_type in [
-        ("user_id", PayloadSchemaType.INTEGER),
-        ("paper_id", PayloadSchemaType.KEYWORD),
-        ("kb_id", PayloadSchemaType.INTEGER),
-        ("section_title", PayloadSchemaType.KEYWORD),
-        ("domain", PayloadSchemaType.KEYWORD),
-        ("page_number", PayloadSchemaType.INTEGER),
-    ]:
+    for field, schema_type in payload_fields:
         try:
             client.create_payload_index(
                 collection_name=collection_name,
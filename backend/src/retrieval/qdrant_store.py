@@ -2,38 +2,101 @@
 
 import logging
 import uuid
-from typing import Any, List, Optional, cast
+from dataclasses import dataclass
+from typing import Any, Iterable, List, Optional, Sequence, cast
 
 from langchain_core.documents import Document
-from qdrant_client import QdrantClient
 from qdrant_client.http.models import (
     FieldCondition,
     Filter,
     MatchAny,
     MatchValue,
     PointStruct,
+    QueryRequest,
+    Range,
 )
 
 from backend.config.qdrant_config import get_qdrant_config
+from backend.config.settings import (
+    NEIGHBOR_WINDOW,
+    STREAM_EMBED_BATCH,
+    TWO_STAGE_PAPER_LIMIT,
+)
 from backend.src.data.document_loader import normalize_paper_metadata
-from backend.src.embedding.embeddings import get_embedder
-from backend.src.retrieval.qdrant_setup import get_qdrant_client
+from backend.src.embedding.embeddings import embed_queries, get_embedder
+from backend.src.embedding.executor import estimate_tokens
+from backend.src.retrieval.adaptive_k import AdaptiveK, adaptive_cut
+from backend.src.retrieval.context_expansion import merge_adjacent_chunks
+from backend.src.retrieval.fusion import interleave_quotas, reciprocal_rank_fusion
+from backend.src.retrieval.qdrant_setup import get_vector_backend
+from backend.src.retrieval.result_cache import SearchResultCache, get_result_cache
+from backend.src.retrieval.retrieval_prefix import PrefixPolicy, PrefixTokenCounts
+from backend.src.retrieval.vector_backend import VectorBackend
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class DocumentPoints:
+    """One document's embedded chunk points and paper point, ready to upsert."""
+
+    user_id: int
+    kb_id: Optional[int]
+    paper_id: str
+    chunk_points: list[PointStruct]
+    paper_point: PointStruct
+
+
 class QdrantStore:
-    """User-scoped vector store backed by Qdrant."""
+    """User-scoped vector store backed by Qdrant or the embedded backend."""
 
     def __init__(
         self,
-        client: Optional[QdrantClient] = None,
+        client: Optional[VectorBackend] = None,
         collection_name: Optional[str] = None,
+        result_cache: Optional[SearchResultCache] = None,
+        prefix_policy: Optional[PrefixPolicy] = None,
     ):
         config = get_qdrant_config()
-        self.client = client or get_qdrant_client()
+        self.client = client or get_vector_backend()
         self.collection_name = collection_name or config.collection_name
+        self.papers_collection_name = (
+            f"{collection_name}_papers" if collection_name else config.paper_collection
+        )
         self.embedder = get_embedder()
+        self.result_cache = (
+            result_cache if result_cache is not None else get_result_cache()
+        )
+        self.prefix_policy = prefix_policy or PrefixPolicy()
+
+    @staticmethod
+    def paper_point_id(paper_id: str, user_id: int, kb_id: Optional[int] = None) -> str:
+        """Deterministic paper-vector ID so re-ingesting a paper overwrites it."""
+        scope = f"kb:{kb_id}" if kb_id is not None else f"user:{user_id}"
+        return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{scope}/{paper_id}"))
+
+    @staticmethod
+    def paper_embedding_text(paper_meta: dict) -> str:
+        """Title plus abstract, embedded once per paper for two-stage search."""
+        return "\n\n".join(
+            part
+            for part in [paper_meta.get("title"), paper_meta.get("summary")]
+            if part
+        )
+
+    @staticmethod
+    def chunk_embedding_text(
+        text: str,
+        paper_meta: dict,
+        *,
+        domain: Optional[str] = None,
+        section: str = "",
+        policy: Optional[PrefixPolicy] = None,
+    ) -> str:
+        """Chunk text behind the retrieval prefix chosen by the prefix policy."""
+        return (policy or PrefixPolicy()).apply(
+            text, paper_meta, domain=domain, section=section
+        )[0]
 
     def add_documents(
         self,
@@ -47,104 +110,305 @@ class QdrantStore:
         domain: Optional[str] = None,
     ) -> int:
         """Embed and upsert document chunks with user/paper or KB metadata."""
-        valid = [
-            c for c in chunks if hasattr(c, "page_content") and c.page_content.strip()
-        ]
-        if not valid:
-            logger.warning("No valid chunks to add")
+        prepared = self.prepare_points(
+            chunks, user_id, paper_id, paper_title, source, kb_id=kb_id, domain=domain
+        )
+        if prepared is None:
             return 0
+        self.write_points([prepared])
+        logger.info(
+            "Added %d chunks for user=%s paper=%s (%s) kb_id=%s",
+            len(prepared.chunk_points),
+            user_id,
+            paper_id,
+            paper_title,
+            kb_id,
+        )
+        return len(prepared.chunk_points)
 
-        texts = [c.page_content for c in valid]
-        enriched_texts = []
-        for chunk in valid:
-            meta = getattr(chunk, "metadata", {}) or {}
-            paper_meta = normalize_paper_metadata(meta)
-            section = meta.get("section_title", "")
-            retrieval_prefix = "\n".join(
-                part
-                for part in [
-                    f"Title: {paper_meta['title']}",
-                    (
-                        f"Authors: {paper_meta['authors']}"
-                        if paper_meta["authors"]
-                        else ""
-                    ),
-                    (
-                        f"Abstract: {paper_meta['summary']}"
-                        if paper_meta["summary"]
-                        else ""
-                    ),
-                    f"Domain: {domain}" if domain else "",
-                    f"Section: {section}" if section else "",
-                ]
-                if part
+    def add_document_stream(
+        self,
+        chunks: Iterable[Document],
+        user_id: int,
+        paper_id: str,
+        paper_title: str,
+        source: str = "",
+        *,
+        kb_id: Optional[int] = None,
+        domain: Optional[str] = None,
+        batch_size: int = STREAM_EMBED_BATCH,
+    ) -> int:
+        """
+        Embed and upsert chunks as they arrive, batch_size at a time, so a
+        document of any length is written while later pages are still being
+        extracted. The paper point follows the last batch. Streamed chunks
+        store chunk_total 0 (unknown up front) unless the chunker set one.
+        If the stream or a write fails, the points written so far are deleted.
+        """
+        scope = dict(
+            user_id=user_id,
+            paper_id=paper_id,
+            paper_title=paper_title,
+            kb_id=kb_id,
+            domain=domain,
+        )
+        first: Optional[Document] = None
+        written = 0
+        batch: list[Document] = []
+
+        def flush() -> None:
+            nonlocal written
+            vectors = self.embedder.embed_documents(
+                self._embedding_inputs(batch, paper_id, domain)
             )
-            enriched_texts.append(f"{retrieval_prefix}\n\n{chunk.page_content}")
-        vectors = self.embedder.embed_documents(enriched_texts)
-
-        points = []
-        for idx, (text, vector, chunk) in enumerate(zip(texts, vectors, valid)):
-            chunk_meta = getattr(chunk, "metadata", {})
-            paper_meta = chunk_meta.get("paper_metadata") or normalize_paper_metadata(
-                chunk_meta
+            points = [
+                self._chunk_point(chunk, vector, written + i, 0, source=source, **scope)
+                for i, (chunk, vector) in enumerate(zip(batch, vectors))
+            ]
+            self.client.upsert(collection_name=self.collection_name, points=points)
+            written += len(points)
+            batch.clear()
+
+        try:
+            for chunk in chunks:
+                if not getattr(chunk, "page_content", "").strip():
+                    continue
+                first = first or chunk
+                batch.append(chunk)
+                if len(batch) >= batch_size:
+                    flush()
+            if batch:
+                flush()
+            if first is None:
+                logger.warning("No valid chunks to add")
+                return 0
+            paper_vector = self.embedder.embed_documents(
+                [self._paper_text(first, paper_title)]
+            )[0]
+            self.client.upsert(
+                collection_name=self.papers_collection_name,
+                points=[self._paper_point(first, paper_vector, written, **scope)],
             )
-            payload = {
-                "user_id": user_id,
-                "paper_id": paper_id,
-                "paper_title": paper_title,
-                "source": source or chunk_meta.get("source", ""),
-                "title": chunk_meta.get("Title", paper_title),
-                "page_content": text,
-                "authors": paper_meta.get("authors", ""),
-                "summary": paper_meta.get("summary", ""),
-                "published": paper_meta.get("published", ""),
-                "primary_category": paper_meta.get("primary_category", ""),
-                "categories": paper_meta.get("categories", ""),
-                "entry_id": paper_meta.get("entry_id", ""),
-                "doi": paper_meta.get("doi", ""),
-            }
+        except Exception:
+            if written:
+                if kb_id is not None:
+                    self.delete_kb_document(kb_id, paper_id)
+                else:
+                    self.delete_user_paper(user_id, paper_id)
+            raise
+        finally:
+            # Chunks become searchable batch by batch, so always invalidate.
+            self.result_cache.bump_user(user_id)
             if kb_id is not None:
-                payload["kb_id"] = kb_id
-            if domain:
-                payload["domain"] = domain
-            payload["section_title"] = chunk_meta.get("section_title", "")
-            payload["section_level"] = chunk_meta.get("section_level", 0)
-            payload["page_number"] = chunk_meta.get("page_number", 0)
-            payload["chunk_index"] = chunk_meta.get("chunk_index", idx)
-            payload["chunk_total"] = chunk_meta.get("chunk_total", len(valid))
-            payload["start_index"] = chunk_meta.get("start_index", 0)
-            points.append(
-                PointStruct(
-                    id=str(uuid.uuid4()),
-                    vector=vector,
-                    payload=payload,
-                )
-            )
-
-        self.client.upsert(collection_name=self.collection_name, points=points)
+                self.result_cache.bump_kb(kb_id)
         logger.info(
-            "Added %d chunks for user=%s paper=%s (%s) kb_id=%s",
-            len(points),
+            "Streamed %d chunks for user=%s paper=%s (%s) kb_id=%s",
+            written,
             user_id,
             paper_id,
             paper_title,
             kb_id,
         )
-        return len(points)
+        return written
 
-    def search(
+    def _embedding_inputs(
+        self, chunks: list[Document], paper_id: str, domain: Optional[str]
+    ) -> list[str]:
+        """Chunk texts behind their retrieval prefixes; logs the token split."""
+        enriched_texts = []
+        token_counts = PrefixTokenCounts()
+        for chunk in chunks:
+            meta = getattr(chunk, "metadata", {}) or {}
+            enriched, prefix_tokens = self.prefix_policy.apply(
+                chunk.page_content,
+                normalize_paper_metadata(meta),
+                domain=domain,
+                section=meta.get("section_title", ""),
+            )
+            enriched_texts.append(enriched)
+            token_counts.add(
+                prefix_tokens,
+                estimate_tokens(chunk.page_content),
+                self.prefix_policy.window_tokens,
+            )
+        logger.info(
+            "Embedding %d chunks of %s: ~%d content + ~%d prefix tokens "
+            "(%.0f%% prefix), %d chunks over the model window",
+            token_counts.chunks,
+            paper_id,
+            token_counts.content_tokens,
+            token_counts.prefix_tokens,
+            token_counts.prefix_share * 100,
+            token_counts.over_window,
+        )
+        return enriched_texts
+
+    @staticmethod
+    def _chunk_point(
+        chunk: Document,
+        vector: list[float],
+        seq: int,
+        total: int,
+        *,
+        user_id: int,
+        paper_id: str,
+        paper_title: str,
+        source: str,
+        kb_id: Optional[int],
+        domain: Optional[str],
+    ) -> PointStruct:
+        chunk_meta = getattr(chunk, "metadata", {})
+        paper_meta = chunk_meta.get("paper_metadata") or normalize_paper_metadata(
+            chunk_meta
+        )
+        payload = {
+            "user_id": user_id,
+            "paper_id": paper_id,
+            "paper_title": paper_title,
+            "source": source or chunk_meta.get("source", ""),
+            "title": chunk_meta.get("Title", paper_title),
+            "page_content": chunk.page_content,
+            "authors": paper_meta.get("authors", ""),
+            "summary": paper_meta.get("summary", ""),
+            "published": paper_meta.get("published", ""),
+            "primary_category": paper_meta.get("primary_category", ""),
+            "categories": paper_meta.get("categories", ""),
+            "entry_id": paper_meta.get("entry_id", ""),
+            "doi": paper_meta.get("doi", ""),
+        }
+        if kb_id is not None:
+            payload["kb_id"] = kb_id
+        if domain:
+            payload["domain"] = domain
+        payload["section_title"] = chunk_meta.get("section_title", "")
+        payload["section_level"] = chunk_meta.get("section_level", 0)
+        payload["page_number"] = chunk_meta.get("page_number", 0)
+        payload["chunk_index"] = chunk_meta.get("chunk_index", seq)
+        payload["chunk_total"] = chunk_meta.get("chunk_total", total)
+        payload["start_index"] = chunk_meta.get("start_index", 0)
+        # Document-wide position; chunk_index restarts per section.
+        payload["chunk_seq"] = seq
+        return PointStruct(id=str(uuid.uuid4()), vector=vector, payload=payload)
+
+    @staticmethod
+    def _document_paper_meta(first_chunk: Document) -> dict:
+        first_meta = getattr(first_chunk, "metadata", {}) or {}
+        doc_paper_meta = first_meta.get("paper_metadata") or normalize_paper_metadata(
+            first_meta
+        )
+        return doc_paper_meta
+
+    def _paper_point(
         self,
-        query: str,
-        user_id: Optional[int] = None,
-        limit: int = 5,
+        first_chunk: Document,
+        vector: list[float],
+        chunk_count: int,
         *,
-        kb_ids: Optional[List[int]] = None,
-        section_filter: Optional[str] = None,
-        domain_filter: Optional[str] = None,
-    ) -> list[Document]:
-        """Retrieve documents relevant to query, with optional filters."""
-        query_vector = self.embedder.embed_query(query)
+        user_id: int,
+        paper_id: str,
+        paper_title: str,
+        kb_id: Optional[int],
+        domain: Optional[str],
+    ) -> PointStruct:
+        doc_paper_meta = self._document_paper_meta(first_chunk)
+        paper_payload = {
+            "user_id": user_id,
+            "paper_id": paper_id,
+            "paper_title": paper_title,
+            "summary": doc_paper_meta.get("summary", ""),
+            "chunk_count": chunk_count,
+        }
+        if kb_id is not None:
+            paper_payload["kb_id"] = kb_id
+        if domain:
+            paper_payload["domain"] = domain
+        return PointStruct(
+            id=self.paper_point_id(paper_id, user_id, kb_id),
+            vector=vector,
+            payload=paper_payload,
+        )
+
+    def _paper_text(self, first_chunk: Document, paper_title: str) -> str:
+        doc_paper_meta = self._document_paper_meta(first_chunk)
+        return self.paper_embedding_text(
+            {**doc_paper_meta, "title": paper_title or doc_paper_meta.get("title")}
+        )
+
+    def prepare_points(
+        self,
+        chunks: list[Document],
+        user_id: int,
+        paper_id: str,
+        paper_title: str,
+        source: str = "",
+        *,
+        kb_id: Optional[int] = None,
+        domain: Optional[str] = None,
+    ) -> Optional[DocumentPoints]:
+        """
+        Embed a document's chunks (and its paper vector) into points, without
+        writing them; None when no chunk has text. See write_points.
+        """
+        valid = [
+            c for c in chunks if hasattr(c, "page_content") and c.page_content.strip()
+        ]
+        if not valid:
+            logger.warning("No valid chunks to add")
+            return None
+
+        # The paper-level vector rides along in the same embedding request.
+        vectors = self.embedder.embed_documents(
+            self._embedding_inputs(valid, paper_id, domain)
+            + [self._paper_text(valid[0], paper_title)]
+        )
+        paper_vector = vectors.pop()
+        scope = dict(
+            user_id=user_id,
+            paper_id=paper_id,
+            paper_title=paper_title,
+            kb_id=kb_id,
+            domain=domain,
+        )
+        points = [
+            self._chunk_point(chunk, vector, idx, len(valid), source=source, **scope)
+            for idx, (chunk, vector) in enumerate(zip(valid, vectors))
+        ]
+        return DocumentPoints(
+            user_id=user_id,
+            kb_id=kb_id,
+            paper_id=paper_id,
+            chunk_points=points,
+            paper_point=self._paper_point(valid[0], paper_vector, len(points), **scope),
+        )
 
+    def write_points(self, documents: Sequence[DocumentPoints]) -> None:
+        """
+        Upsert prepared documents: all chunk points in one request, then all
+        paper points in another, then invalidate cached results they affect.
+        """
+        if not documents:
+            return
+        self.client.upsert(
+            collection_name=self.collection_name,
+            points=[point for doc in documents for point in doc.chunk_points],
+        )
+        self.client.upsert(
+            collection_name=self.papers_collection_name,
+            points=[doc.paper_point for doc in documents],
+        )
+        # KB chunks also carry user_id, so user-scoped results can change too.
+        for user_id in {doc.user_id for doc in documents}:
+            self.result_cache.bump_user(user_id)
+        for kb_id in {doc.kb_id for doc in documents if doc.kb_id is not None}:
+            self.result_cache.bump_kb(kb_id)
+
+    def _scope_conditions(
+        self,
+        user_id: Optional[int],
+        kb_ids: Optional[List[int]],
+        domain_filter: Optional[str],
+    ) -> list[FieldCondition]:
+        """Conditions shared by the chunk and paper collections."""
         must_conditions: list[FieldCondition] = []
         if kb_ids:
             must_conditions.append(
@@ -154,56 +418,294 @@ class QdrantStore:
             must_conditions.append(
                 FieldCondition(key="user_id", match=MatchValue(value=user_id))
             )
-        if section_filter:
-            must_conditions.append(
-                FieldCondition(
-                    key="section_title",
-                    match=MatchValue(value=section_filter),
-                )
-            )
         if domain_filter:
             must_conditions.append(
                 FieldCondition(key="domain", match=MatchValue(value=domain_filter))
             )
-
         if not must_conditions:
             must_conditions.append(
                 FieldCondition(key="user_id", match=MatchValue(value=user_id or 0))
             )
+        return must_conditions
+
+    def search(
+        self,
+        query: str,
+        user_id: Optional[int] = None,
+        limit: int = 5,
+        *,
+        kb_ids: Optional[List[int]] = None,
+        section_filter: Optional[str] = None,
+        domain_filter: Optional[str] = None,
+        two_stage: bool = False,
+        paper_limit: int = TWO_STAGE_PAPER_LIMIT,
+        neighbor_window: int = 0,
+        adaptive: Optional[AdaptiveK] = None,
+    ) -> list[Document]:
+        """
+        Retrieve documents relevant to query, with optional filters.
+
+        With two_stage=True the paper-level collection is searched first and the
+        chunk search is restricted to the top paper_limit papers. Falls back to
+        flat search when no paper vectors match (e.g. data ingested before
+        paper vectors existed).
+
+        With neighbor_window > 0 each hit is widened with up to that many
+        chunks on either side and contiguous chunks are merged into passages.
+
+        With adaptive set, limit is ignored: adaptive.max_k hits are fetched
+        (below adaptive.score_threshold filtered out by Qdrant) and cut to the
+        k chosen by adaptive_cut, before neighbor expansion.
+
+        Results are cached per normalized query and filters; a hit skips both
+        the embedding call and the vector search.
+        """
+        cache_key = self.result_cache.make_key(
+            query,
+            kb_ids=kb_ids,
+            user_id=user_id,
+            extra=(
+                self.collection_name,
+                section_filter,
+                domain_filter,
+                limit,
+                two_stage,
+                paper_limit if two_stage else None,
+                neighbor_window,
+                adaptive.cache_key() if adaptive else None,
+            ),
+        )
+        cached = self.result_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        query_vector = self.embedder.embed_query(query)
+
+        must_conditions = self._scope_conditions(user_id, kb_ids, domain_filter)
+        if two_stage:
+            paper_ids = self._search_paper_ids(
+                query_vector, must_conditions, paper_limit
+            )
+            if paper_ids:
+                must_conditions.append(
+                    FieldCondition(key="paper_id", match=MatchAny(any=paper_ids))
+                )
+            else:
+                logger.debug("No paper-level hits; using flat chunk search")
+        if section_filter:
+            must_conditions.append(
+                FieldCondition(
+                    key="section_title",
+                    match=MatchValue(value=section_filter),
+                )
+            )
 
         results = self.client.query_points(
             collection_name=self.collection_name,
             query=query_vector,
             query_filter=Filter(must=cast(Any, must_conditions)),
-            limit=limit,
+            limit=adaptive.max_k if adaptive else limit,
             with_payload=True,
+            score_threshold=adaptive.score_threshold if adaptive else None,
         )
+        docs = [self._point_to_document(point) for point in results.points]
+        if adaptive:
+            docs = adaptive_cut(docs, adaptive)
+        if neighbor_window > 0:
+            docs = self.expand_neighbors(docs, neighbor_window)
+        self.result_cache.put(cache_key, docs)
+        return docs
 
-        docs = []
-        for point in results.points:
-            payload = point.payload or {}
-            meta = {
-                "source": payload.get("source", ""),
-                "Title": payload.get("title", ""),
-                "paper_id": payload.get("paper_id", ""),
-                "paper_title": payload.get("paper_title", ""),
-                "score": point.score,
-                "authors": payload.get("authors", ""),
-                "summary": payload.get("summary", ""),
-                "published": payload.get("published", ""),
-                "primary_category": payload.get("primary_category", ""),
-                "categories": payload.get("categories", ""),
-                "section_title": payload.get("section_title", ""),
-            }
-            if payload.get("domain"):
-                meta["domain"] = payload["domain"]
-            docs.append(
-                Document(page_content=payload.get("page_content", ""), metadata=meta)
+    def search_many(
+        self,
+        queries: Sequence[str],
+        user_id: Optional[int] = None,
+        limit: int = 5,
+        *,
+        kb_ids: Optional[List[int]] = None,
+        per_kb_quota: bool = False,
+        section_filter: Optional[str] = None,
+        domain_filter: Optional[str] = None,
+        neighbor_window: int = 0,
+        adaptive: Optional[AdaptiveK] = None,
+    ) -> list[Document]:
+        """
+        Run several searches in one embedding call and one Qdrant round trip.
+
+        Every query variant is searched against every filter (one per KB when
+        per_kb_quota is set, otherwise a single combined filter) in a single
+        query_batch_points request. Results are fused with reciprocal rank
+        fusion; with per_kb_quota each KB is fused separately and the KBs share
+        the limit round-robin so no KB is crowded out. adaptive works as in
+        search, cutting on the original similarity scores; with per_kb_quota
+        each KB's list is cut on its own before the round-robin, since score
+        scales differ between KBs, and the KBs share up to adaptive.max_k.
+        """
+        queries = [q for q in queries if q and q.strip()]
+        if not queries:
+            return []
+        vectors = embed_queries(self.embedder, queries)
+        if adaptive:
+            limit = adaptive.max_k
+
+        if kb_ids and per_kb_quota:
+            groups = [[kb_id] for kb_id in kb_ids]
+        else:
+            groups = [kb_ids]
+        filters = []
+        for group in groups:
+            must_conditions = self._scope_conditions(user_id, group, domain_filter)
+            if section_filter:
+                must_conditions.append(
+                    FieldCondition(
+                        key="section_title", match=MatchValue(value=section_filter)
+                    )
+                )
+            filters.append(Filter(must=cast(Any, must_conditions)))
+
+        requests = [
+            QueryRequest(
+                query=vector,
+                filter=query_filter,
+                # Full limit per filter so other KBs can backfill a sparse one.
+                limit=limit,
+                with_payload=True,
+                score_threshold=adaptive.score_threshold if adaptive else None,
             )
+            for query_filter in filters
+            for vector in vectors
+        ]
+        responses = self.client.query_batch_points(
+            collection_name=self.collection_name, requests=requests
+        )
+        result_lists = [
+            [self._point_to_document(point) for point in response.points]
+            for response in responses
+        ]
+
+        per_filter = len(vectors)
+        fused_groups = [
+            reciprocal_rank_fusion(result_lists[i : i + per_filter])
+            for i in range(0, len(result_lists), per_filter)
+        ]
+        if len(fused_groups) > 1:
+            if adaptive:
+                fused_groups = [adaptive_cut(g, adaptive) for g in fused_groups]
+            docs = interleave_quotas(fused_groups, limit)
+            if adaptive:
+                for doc in docs:
+                    doc.metadata["retrieval_k"] = len(docs)
+        else:
+            docs = fused_groups[0][:limit]
+            if adaptive:
+                docs = adaptive_cut(docs, adaptive)
+        if neighbor_window > 0:
+            docs = self.expand_neighbors(docs, neighbor_window)
         return docs
 
-    def _collect_distinct_papers(self, points) -> list[dict]:
-        seen = {}
+    def expand_neighbors(
+        self, docs: list[Document], window: int = NEIGHBOR_WINDOW
+    ) -> list[Document]:
+        """Fetch +/- window neighbors of every hit in one scroll and merge spans."""
+        clauses = []
+        for doc in docs:
+            meta = doc.metadata
+            seq = meta.get("chunk_seq")
+            if seq is None or not meta.get("paper_id"):
+                continue
+            conditions = [
+                FieldCondition(
+                    key="paper_id", match=MatchValue(value=meta["paper_id"])
+                ),
+                FieldCondition(
+                    key="chunk_seq", range=Range(gte=seq - window, lte=seq + window)
+                ),
+            ]
+            if meta.get("kb_id") is not None:
+                conditions.append(
+                    FieldCondition(key="kb_id", match=MatchValue(value=meta["kb_id"]))
+                )
+            else:
+                conditions.append(
+                    FieldCondition(
+                        key="user_id", match=MatchValue(value=meta.get("user_id", 0))
+                    )
+                )
+            clauses.append(Filter(must=cast(Any, conditions)))
+        if not clauses:
+            return docs
+
+        points, _ = self.client.scroll(
+            collection_name=self.collection_name,
+            scroll_filter=Filter(should=cast(Any, clauses)),
+            limit=len(clauses) * (2 * window + 1),
+            with_payload=True,
+        )
+        neighbors = [self._point_to_document(point) for point in points]
+        for neighbor in neighbors:
+            neighbor.metadata["score"] = None
+        return merge_adjacent_chunks(docs, neighbors)
+
+    def _search_paper_ids(
+        self,
+        query_vector: list[float],
+        must_conditions: list[FieldCondition],
+        paper_limit: int,
+    ) -> list[str]:
+        """Stage one of two-stage retrieval: top paper IDs for the query."""
+        results = self.client.query_points(
+            collection_name=self.papers_collection_name,
+            query=query_vector,
+            query_filter=Filter(must=cast(Any, list(must_conditions))),
+            limit=paper_limit,
+            with_payload=["paper_id"],
+        )
+        paper_ids: list[str] = []
+        for point in results.points:
+            pid = (point.payload or {}).get("paper_id")
+            if pid and pid not in paper_ids:
+                paper_ids.append(pid)
+        return paper_ids
+
+    @staticmethod
+    def _point_to_document(point) -> Document:
+        payload = point.payload or {}
+        meta = {
+            "point_id": str(point.id),
+            "source": payload.get("source", ""),
+            "Title": payload.get("title", ""),
+            "paper_id": payload.get("paper_id", ""),
+            "paper_title": payload.get("paper_title", ""),
+            "score": getattr(point, "score", None),
+            "authors": payload.get("authors", ""),
+            "summary": payload.get("summary", ""),
+            "published": payload.get("published", ""),
+            "primary_category": payload.get("primary_category", ""),
+            "categories": payload.get("categories", ""),
+            "section_title": payload.get("section_title", ""),
+            "chunk_index": payload.get("chunk_index", 0),
+            "chunk_seq": payload.get("chunk_seq"),
+            "start_index": payload.get("start_index"),
+            "user_id": payload.get("user_id"),
+        }
+        if payload.get("kb_id") is not None:
+            meta["kb_id"] = payload["kb_id"]
+        if payload.get("domain"):
+            meta["domain"] = payload["domain"]
+        return Document(page_content=payload.get("page_content", ""), metadata=meta)
+
+    PAPER_LISTING_FIELDS = [
+        "paper_id",
+        "paper_title",
+        "source",
+        "authors",
+        "published",
+        "primary_category",
+        "categories",
+    ]
+
+    def _collect_distinct_papers(self, points, seen: Optional[dict] = None) -> dict:
+        seen = {} if seen is None else seen
         for point in points:
             pid = point.payload.get("paper_id", "")
             if pid and pid not in seen:
@@ -216,29 +718,35 @@ class QdrantStore:
                     "primary_category": point.payload.get("primary_category", ""),
                     "categories": point.payload.get("categories", ""),
                 }
+        return seen
+
+    def _scroll_distinct_papers(
+        self, scroll_filter: Filter, page_size: int = 1000
+    ) -> list[dict]:
+        """Page through every matching chunk and return distinct papers."""
+        seen: dict = {}
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=scroll_filter,
+                limit=page_size,
+                offset=offset,
+                with_payload=self.PAPER_LISTING_FIELDS,
+            )
+            self._collect_distinct_papers(points, seen)
+            if offset is None:
+                break
         return list(seen.values())
 
     def get_user_papers(self, user_id: int) -> list[dict]:
         """Get distinct papers uploaded by a user."""
-        results = self.client.scroll(
-            collection_name=self.collection_name,
-            scroll_filter=Filter(
+        return self._scroll_distinct_papers(
+            Filter(
                 must=[FieldCondition(key="user_id", match=MatchValue(value=user_id))]
-            ),
-            limit=1000,
-            with_payload=[
-                "paper_id",
-                "paper_title",
-                "source",
-                "authors",
-                "published",
-                "primary_category",
-                "categories",
-            ],
+            )
         )
 
-        return self._collect_distinct_papers(results[0])
-
     def paper_exists_for_user(self, user_id: int, paper_id: str) -> bool:
         """Check if a paper already exists for a user."""
         results = self.client.scroll(
@@ -253,49 +761,78 @@ class QdrantStore:
         )
         return len(results[0]) > 0
 
+    def _delete_everywhere(self, selector: Filter) -> None:
+        """Delete matching chunk points and their paper-level vectors."""
+        for collection in (self.collection_name, self.papers_collection_name):
+            self.client.delete(collection_name=collection, points_selector=selector)
+
     def delete_user_paper(self, user_id: int, paper_id: str) -> None:
         """Delete all chunks for a specific user's paper."""
-        self.client.delete(
-            collection_name=self.collection_name,
-            points_selector=Filter(
+        self._delete_everywhere(
+            Filter(
                 must=[
                     FieldCondition(key="user_id", match=MatchValue(value=user_id)),
                     FieldCondition(key="paper_id", match=MatchValue(value=paper_id)),
                 ]
-            ),
+            )
         )
+        # The paper may also sit in any KB this user owns.
+        self.result_cache.bump_user(user_id)
+        self.result_cache.bump_all_kbs()
         logger.info("Deleted paper %s for user %s", paper_id, user_id)
 
     def get_kb_documents(self, kb_id: int) -> list[dict]:
-        """Get distinct documents (papers) in a knowledge base."""
-        results = self.client.scroll(
-            collection_name=self.collection_name,
-            scroll_filter=Filter(
-                must=[FieldCondition(key="kb_id", match=MatchValue(value=kb_id))]
-            ),
-            limit=10000,
-            with_payload=[
-                "paper_id",
-                "paper_title",
-                "source",
-                "authors",
-                "published",
-                "primary_category",
-                "categories",
-            ],
+        """
+        Get distinct documents (papers) in a knowledge base from Qdrant.
+
+        Scans every chunk of the KB; API listings read KnowledgeBaseDocument
+        instead and this is kept for reconciliation against the index.
+        """
+        return self._scroll_distinct_papers(
+            Filter(must=[FieldCondition(key="kb_id", match=MatchValue(value=kb_id))])
         )
-        return self._collect_distinct_papers(results[0])
+
+    def _invalidate_kb(self, kb_id: int) -> None:
+        # Removed chunks may belong to any user's scope, not just the KB's.
+        self.result_cache.bump_kb(kb_id)
+        self.result_cache.bump_all_users()
 
     def delete_kb(self, kb_id: int) -> None:
         """Delete all chunks for a knowledge base."""
-        self.client.delete(
-            collection_name=self.collection_name,
-            points_selector=Filter(
-                must=[FieldCondition(key="kb_id", match=MatchValue(value=kb_id))]
-            ),
+        self._delete_everywhere(
+            Filter(must=[FieldCondition(key="kb_id", match=MatchValue(value=kb_id))])
         )
+        self._invalidate_kb(kb_id)
         logger.info("Deleted all chunks for kb_id=%s", kb_id)
 
+    def delete_kb_document(self, kb_id: int, paper_id: str) -> None:
+        """Delete all chunks for one document in a knowledge base."""
+        self._delete_everywhere(
+            Filter(
+                must=[
+                    FieldCondition(key="kb_id", match=MatchValue(value=kb_id)),
+                    FieldCondition(key="paper_id", match=MatchValue(value=paper_id)),
+                ]
+            )
+        )
+        self._invalidate_kb(kb_id)
+        logger.info("Deleted document %s from kb_id=%s", paper_id, kb_id)
+
+    def delete_kb_documents(self, kb_id: int, paper_ids: Sequence[str]) -> None:
+        """Delete several documents of one knowledge base in one request each."""
+        if not paper_ids:
+            return
+        self._delete_everywhere(
+            Filter(
+                must=[
+                    FieldCondition(key="kb_id", match=MatchValue(value=kb_id)),
+                    FieldCondition(key="paper_id", match=MatchAny(any=list(paper_ids))),
+                ]
+            )
+        )
+        self._invalidate_kb(kb_id)
+        logger.info("Deleted %d documents from kb_id=%s", len(paper_ids), kb_id)
+
     def document_exists_in_kb(self, kb_id: int, paper_id: str) -> bool:
         """Check if a document already exists in a knowledge base."""
         results = self.client.scroll(
@@ -0,0 +1,245 @@
+"""
+Re-embed a collection into a new version while the old one keeps serving.
+
+Points are streamed out of the source collection with scroll, their stored
+page_content is rebuilt into the exact text ingestion embeds, re-embedded in
+large batches and upserted (same IDs and payloads) into the target. Searches
+keep hitting the alias until swap_aliases repoints it. Writes made to the
+source while the job runs are not copied, so pause ingestion meanwhile.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional, Sequence
+
+from qdrant_client.http.models import Distance, PointStruct, VectorParams
+
+from backend.config.qdrant_config import QdrantConfig
+from backend.src.data.document_loader import normalize_paper_metadata
+from backend.src.retrieval.qdrant_setup import (
+    CHUNK_PAYLOAD_INDEXES,
+    PAPER_PAYLOAD_INDEXES,
+    _ensure_payload_indexes,
+    resolve_alias,
+    swap_aliases,
+)
+from backend.src.retrieval.qdrant_store import QdrantStore
+from backend.src.retrieval.vector_backend import VectorBackend
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 512
+
+
+@dataclass
+class ReembedProgress:
+    """Running totals for one collection, passed to the progress callback."""
+
+    collection: str
+    done: int
+    total: int
+    elapsed: float
+
+    @property
+    def rate(self) -> float:
+        """Points per second so far."""
+        return self.done / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        if self.rate <= 0:
+            return None
+        return max(self.total - self.done, 0) / self.rate
+
+    def __str__(self) -> str:
+        eta = self.eta_seconds
+        eta_text = "?" if eta is None else f"{int(eta // 60)}m{int(eta % 60):02d}s"
+        return (
+            f"{self.collection}: {self.done}/{self.total} points "
+            f"({self.rate:.0f} pts/s, ETA {eta_text})"
+        )
+
+
+def _paper_key(payload: dict) -> tuple:
+    return payload.get("kb_id"), payload.get("user_id"), payload.get("paper_id")
+
+
+def chunk_text_from_payload(payload: dict) -> str:
+    """Rebuild the text add_documents embedded for a stored chunk."""
+    return QdrantStore.chunk_embedding_text(
+        payload.get("page_content", ""),
+        normalize_paper_metadata(payload),
+        domain=payload.get("domain"),
+        section=payload.get("section_title", ""),
+    )
+
+
+def copy_reembedded(
+    client: VectorBackend,
+    source: str,
+    target: str,
+    embedder,
+    text_for: Callable[[dict], str],
+    *,
+    payload_fields: list,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    empty_vector_size: Optional[int] = None,
+    on_batch: Optional[Callable[[list], None]] = None,
+    on_progress: Optional[Callable[[ReembedProgress], None]] = None,
+) -> int:
+    """
+    Stream source into target with fresh vectors; returns points written.
+
+    The target is created on the first batch, sized from the new model's
+    output, so the new vector size need not be configured up front. An empty
+    source gets an empty target of empty_vector_size, so it can still be
+    swapped in.
+    """
+    if client.collection_exists(target):
+        raise ValueError(f"Target collection {target} already exists")
+    total = client.count(collection_name=source, exact=True).count
+    started = time.perf_counter()
+    done = 0
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=source,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=False,
+        )
+        if points:
+            payloads = [point.payload or {} for point in points]
+            vectors = embedder.embed_documents([text_for(p) for p in payloads])
+            if done == 0:
+                client.create_collection(
+                    collection_name=target,
+                    vectors_config=VectorParams(
+                        size=len(vectors[0]), distance=Distance.COSINE
+                    ),
+                )
+                _ensure_payload_indexes(client, target, payload_fields)
+            client.upsert(
+                collection_name=target,
+                points=[
+                    PointStruct(id=point.id, vector=vector, payload=payload)
+                    for point, vector, payload in zip(points, vectors, payloads)
+                ],
+            )
+            if on_batch is not None:
+                on_batch(payloads)
+            done += len(points)
+            if on_progress is not None:
+                on_progress(
+                    ReembedProgress(target, done, total, time.perf_counter() - started)
+                )
+        if offset is None:
+            break
+    if done == 0 and empty_vector_size:
+        client.create_collection(
+            collection_name=target,
+            vectors_config=VectorParams(
+                size=empty_vector_size, distance=Distance.COSINE
+            ),
+        )
+        _ensure_payload_indexes(client, target, payload_fields)
+    return done
+
+
+def reembed_collections(
+    client: VectorBackend,
+    config: QdrantConfig,
+    embedder,
+    version: int,
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    on_progress: Optional[Callable[[ReembedProgress], None]] = None,
+) -> dict[str, tuple[str, str]]:
+    """
+    Re-embed the chunk and paper collections into version.
+
+    Returns {alias: (source, target)} for swap_aliases. Sources are whatever
+    the aliases point at now (or the plain legacy collection). Paper vectors
+    need each paper's abstract; older paper points don't store it, so it is
+    picked up from the chunks as they stream past.
+    """
+    summaries: dict[tuple, str] = {}
+
+    def remember_summaries(payloads: list) -> None:
+        for payload in payloads:
+            if payload.get("summary"):
+                summaries.setdefault(_paper_key(payload), payload["summary"])
+
+    def paper_text(payload: dict) -> str:
+        return QdrantStore.paper_embedding_text(
+            {
+                "title": payload.get("paper_title"),
+                "summary": payload.get("summary") or summaries.get(_paper_key(payload)),
+            }
+        )
+
+    plan = [
+        (
+            config.collection_name,
+            chunk_text_from_payload,
+            CHUNK_PAYLOAD_INDEXES,
+            remember_summaries,
+        ),
+        (config.paper_collection, paper_text, PAPER_PAYLOAD_INDEXES, None),
+    ]
+    swaps: dict[str, tuple[str, str]] = {}
+    for alias, text_for, payload_fields, on_batch in plan:
+        source = resolve_alias(client, alias) or alias
+        target = config.versioned(alias, version)
+        if source == target:
+            raise ValueError(f"{alias} already points at {target}")
+        logger.info("Re-embedding %s into %s", source, target)
+        written = copy_reembedded(
+            client,
+            source,
+            target,
+            embedder,
+            text_for,
+            payload_fields=payload_fields,
+            batch_size=batch_size,
+            empty_vector_size=config.vector_size,
+            on_batch=on_batch,
+            on_progress=on_progress,
+        )
+        logger.info("Wrote %d points to %s", written, target)
+        swaps[alias] = (source, target)
+    return swaps
+
+
+def replace_legacy_collections(
+    client: VectorBackend, targets: dict[str, str], legacy: Sequence[str]
+) -> None:
+    """
+    Swap aliases in over the plain collections that hold their names.
+
+    An alias can't share a name with a collection, so the legacy collections
+    must go first. Nothing is deleted unless every target holds at least as
+    many points as the collection it replaces; the deletes and the alias
+    update then run back to back. Raises ValueError if a target is short.
+    """
+    for alias in legacy:
+        old = client.count(collection_name=alias, exact=True).count
+        new = client.count(collection_name=targets[alias], exact=True).count
+        if new < old:
+            raise ValueError(
+                f"{targets[alias]} has {new} points but {alias} has {old}; "
+                "re-embed again before dropping it"
+            )
+    for alias in legacy:
+        client.delete_collection(alias)
+        logger.warning("Deleted legacy collection %s", alias)
+    try:
+        swap_aliases(client, targets)
+    except Exception:
+        # The data is safe in the targets; only the aliases are missing.
+        logger.error(
+            "Alias swap failed after deleting %s; rerun with --swap-only", legacy
+        )
+        raise
@@ -0,0 +1,166 @@
+"""Process-wide cache of search results, invalidated by corpus generations."""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Iterable, Optional
+
+from langchain_core.documents import Document
+
+from backend.config.settings import RESULT_CACHE_MAX_BYTES, RESULT_CACHE_TTL_SECONDS
+
+# (page_content, metadata as JSON): immutable, so callers mutating the
+# Documents they were handed can't change what later hits return.
+CompactDocument = tuple[str, str]
+
+
+def normalize_query(query: str) -> str:
+    """Collapse whitespace so trivially different spellings share an entry."""
+    return " ".join(query.split())
+
+
+def compact_document(doc: Document) -> CompactDocument:
+    return doc.page_content, json.dumps(doc.metadata, default=str)
+
+
+def expand_document(compact: CompactDocument) -> Document:
+    page_content, metadata = compact
+    return Document(page_content=page_content, metadata=json.loads(metadata))
+
+
+def _entry_size(docs: tuple[CompactDocument, ...]) -> int:
+    return sum(len(content) + len(metadata) for content, metadata in docs) + 128
+
+
+class SearchResultCache:
+    """
+    Size-bounded LRU of search results.
+
+    Keys embed the generation of every KB (or user) the search is scoped to.
+    Writes bump that generation, so stale entries stop matching immediately
+    and are evicted as the cache fills. Generations are per process: a write
+    through another process (e.g. bulk_ingest, reembed, snapshot import) is
+    not seen here, so entries also expire ttl seconds after they are stored.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = RESULT_CACHE_MAX_BYTES,
+        ttl: float = RESULT_CACHE_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._clock = clock
+        # key -> (docs, size in bytes, expiry on clock)
+        self._entries: OrderedDict[
+            str, tuple[tuple[CompactDocument, ...], int, float]
+        ] = OrderedDict()
+        self._bytes = 0
+        self._kb_generations: dict[int, int] = {}
+        self._user_generations: dict[int, int] = {}
+        # Bumped by writes whose affected KBs or users aren't known up front.
+        self._kb_epoch = 0
+        self._user_epoch = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0 and self.ttl > 0
+
+    def bump_kb(self, kb_id: int) -> None:
+        with self._lock:
+            self._kb_generations[kb_id] = self._kb_generations.get(kb_id, 0) + 1
+
+    def bump_user(self, user_id: int) -> None:
+        with self._lock:
+            self._user_generations[user_id] = self._user_generations.get(user_id, 0) + 1
+
+    def bump_all_kbs(self) -> None:
+        with self._lock:
+            self._kb_epoch += 1
+
+    def bump_all_users(self) -> None:
+        with self._lock:
+            self._user_epoch += 1
+
+    def make_key(
+        self,
+        query: str,
+        *,
+        kb_ids: Optional[Iterable[int]],
+        user_id: Optional[int],
+        extra: tuple[Hashable, ...] = (),
+    ) -> str:
+        """Hash of the normalized query, scope with generations, and options."""
+        with self._lock:
+            if kb_ids:
+                scope = [("kbs", self._kb_epoch)] + [
+                    ("kb", kb_id, self._kb_generations.get(kb_id, 0))
+                    for kb_id in sorted(set(kb_ids))
+                ]
+            else:
+                user_id = user_id or 0  # unscoped searches fall back to user 0
+                scope = [
+                    ("users", self._user_epoch),
+                    ("user", user_id, self._user_generations.get(user_id, 0)),
+                ]
+        raw = json.dumps([normalize_query(query), scope, list(extra)], default=str)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[list[Document]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] <= self._clock():
+                del self._entries[key]
+                self._bytes -= entry[1]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            docs = entry[0]
+        return [expand_document(doc) for doc in docs]
+
+    def put(self, key: str, docs: list[Document]) -> None:
+        if not self.enabled:
+            return
+        compact = tuple(compact_document(doc) for doc in docs)
+        size = _entry_size(compact)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (compact, size, self._clock() + self.ttl)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_cache: Optional[SearchResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> SearchResultCache:
+    """Return the process-wide cache so all QdrantStore instances share generations."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SearchResultCache()
+        return _cache
@@ -0,0 +1,121 @@
+"""Token-aware retrieval prefix placed in front of each chunk before embedding."""
+
+from dataclasses import dataclass
+from typing import Optional
+
+from backend.config.settings import (
+    EMBED_MODEL_MAX_TOKENS,
+    RETRIEVAL_PREFIX_FIELDS,
+    RETRIEVAL_PREFIX_MAX_TOKENS,
+)
+from backend.src.embedding.executor import estimate_tokens
+
+PREFIX_FIELDS = ("title", "authors", "abstract", "domain", "section")
+# Rough inverse of estimate_tokens, for trimming a field to a token budget.
+_CHARS_PER_TOKEN = 4
+
+
+def _field_lines(
+    paper_meta: dict, domain: Optional[str], section: str
+) -> dict[str, str]:
+    values = {
+        "title": paper_meta.get("title"),
+        "authors": paper_meta.get("authors"),
+        "abstract": paper_meta.get("summary"),
+        "domain": domain,
+        "section": section,
+    }
+    return {
+        name: f"{name.capitalize()}: {value}" for name, value in values.items() if value
+    }
+
+
+@dataclass(frozen=True)
+class PrefixPolicy:
+    """
+    Which paper fields prefix a chunk, in priority order, and how many
+    tokens they may take.
+
+    The prefix gets at most max_tokens, and never more than what is left of
+    the model's window_tokens after the chunk itself, so it cannot push chunk
+    content past the point where the embedder truncates. Fields are added
+    in order; the first that does not fit is trimmed to the remaining budget
+    and ends the prefix. The abstract is off by default: it already
+    goes into the paper-level vector.
+    """
+
+    fields: tuple[str, ...] = RETRIEVAL_PREFIX_FIELDS
+    max_tokens: int = RETRIEVAL_PREFIX_MAX_TOKENS
+    window_tokens: int = EMBED_MODEL_MAX_TOKENS
+
+    def __post_init__(self):
+        unknown = set(self.fields) - set(PREFIX_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown retrieval prefix fields: {sorted(unknown)}")
+
+    def prefix(
+        self,
+        paper_meta: dict,
+        *,
+        domain: Optional[str] = None,
+        section: str = "",
+        content_tokens: int = 0,
+    ) -> str:
+        budget = min(self.max_tokens, self.window_tokens - content_tokens)
+        lines = _field_lines(paper_meta, domain, section)
+        kept: list[str] = []
+        for name in self.fields:
+            line = lines.get(name)
+            if not line or budget <= 0:
+                continue
+            cost = estimate_tokens(line)
+            if cost <= budget:
+                kept.append(line)
+                budget -= cost
+            else:
+                cut = budget * _CHARS_PER_TOKEN - 1  # room for the ellipsis
+                kept.append(line[:cut].rstrip() + "…")
+                budget = 0
+        return "\n".join(kept)
+
+    def apply(
+        self,
+        text: str,
+        paper_meta: dict,
+        *,
+        domain: Optional[str] = None,
+        section: str = "",
+    ) -> tuple[str, int]:
+        """Embedding input for a chunk, and the estimated tokens of its prefix."""
+        prefix = self.prefix(
+            paper_meta,
+            domain=domain,
+            section=section,
+            content_tokens=estimate_tokens(text),
+        )
+        if not prefix:
+            return text, 0
+        return f"{prefix}\n\n{text}", estimate_tokens(prefix)
+
+
+@dataclass
+class PrefixTokenCounts:
+    """Estimated prefix vs content tokens sent to the embedder for one ingest."""
+
+    chunks: int = 0
+    prefix_tokens: int = 0
+    content_tokens: int = 0
+    # Chunks longer than the window on their own; the embedder truncates them.
+    over_window: int = 0
+
+    def add(self, prefix_tokens: int, content_tokens: int, window_tokens: int):
+        self.chunks += 1
+        self.prefix_tokens += prefix_tokens
+        self.content_tokens += content_tokens
+        if content_tokens > window_tokens:
+            self.over_window += 1
+
+    @property
+    def prefix_share(self) -> float:
+        total = self.prefix_tokens + self.content_tokens
+        return self.prefix_tokens / total if total else 0.0
@@ -0,0 +1,81 @@
+"""The vector backend interface QdrantStore and collection setup depend on."""
+
+from typing import Any, Optional, Protocol, Sequence, Union
+
+from qdrant_client.http.models import (
+    Filter,
+    PayloadSchemaType,
+    PointStruct,
+    QueryRequest,
+    QueryResponse,
+    Record,
+    VectorParams,
+)
+
+
+class VectorBackend(Protocol):
+    """
+    Subset of the QdrantClient API used by this app.
+
+    QdrantClient satisfies it as-is; EmbeddedVectorBackend implements the same
+    calls over local files. Filters, points and results use the Qdrant models
+    for both, so QdrantStore behaves identically on either backend.
+    """
+
+    def collection_exists(self, collection_name: str) -> bool: ...
+
+    def create_collection(
+        self, collection_name: str, vectors_config: VectorParams, **kwargs: Any
+    ) -> Any: ...
+
+    def get_collection(self, collection_name: str) -> Any: ...
+
+    def delete_collection(self, collection_name: str, **kwargs: Any) -> Any: ...
+
+    def create_payload_index(
+        self,
+        collection_name: str,
+        field_name: str,
+        field_schema: Optional[PayloadSchemaType] = None,
+        **kwargs: Any,
+    ) -> Any: ...
+
+    def upsert(
+        self, collection_name: str, points: Sequence[PointStruct], **kwargs: Any
+    ) -> Any: ...
+
+    def query_points(
+        self,
+        collection_name: str,
+        query: Any = None,
+        query_filter: Optional[Filter] = None,
+        limit: int = 10,
+        **kwargs: Any,
+    ) -> QueryResponse: ...
+
+    def query_batch_points(
+        self, collection_name: str, requests: Sequence[QueryRequest], **kwargs: Any
+    ) -> list[QueryResponse]: ...
+
+    def scroll(
+        self,
+        collection_name: str,
+        scroll_filter: Optional[Filter] = None,
+        limit: int = 10,
+        offset: Any = None,
+        **kwargs: Any,
+    ) -> tuple[list[Record], Optional[Union[int, str]]]: ...
+
+    def count(
+        self, collection_name: str, count_filter: Optional[Filter] = None, **kwargs
+    ) -> Any: ...
+
+    def delete(
+        self, collection_name: str, points_selector: Any, **kwargs: Any
+    ) -> Any: ...
+
+    def get_aliases(self, **kwargs: Any) -> Any: ...
+
+    def update_collection_aliases(
+        self, change_aliases_operations: Sequence[Any], **kwargs: Any
+    ) -> Any: ...
@@ -0,0 +1,55 @@
+from langchain_core.documents import Document
+
+from backend.src.retrieval.adaptive_k import AdaptiveK, adaptive_cut, choose_k
+
+POLICY = AdaptiveK(
+    min_k=1, max_k=6, score_threshold=None, relative_cutoff=0.75, min_gap=0.05
+)
+
+
+def test_cuts_at_score_cliff():
+    assert choose_k([0.82, 0.80, 0.79, 0.55, 0.54, 0.53], POLICY) == 3
+
+
+def test_keeps_flat_score_profile_up_to_max_k():
+    scores = [0.60, 0.59, 0.58, 0.57, 0.56, 0.55, 0.54, 0.53]
+
+    assert choose_k(scores, POLICY) == 6
+
+
+def test_relative_cutoff_drops_weak_tail_without_a_cliff():
+    scores = [0.80, 0.70, 0.62, 0.58, 0.55]
+    policy = AdaptiveK(min_k=1, max_k=6, relative_cutoff=0.75, min_gap=1.0)
+
+    assert choose_k(scores, policy) == 3
+
+
+def test_min_k_bounds_the_cut():
+    policy = AdaptiveK(min_k=3, max_k=6, relative_cutoff=0.75, min_gap=0.05)
+
+    assert choose_k([0.9, 0.3, 0.29, 0.28], policy) == 3
+    assert choose_k([0.9], policy) == 1
+
+
+def test_adaptive_cut_keeps_best_scores_in_original_order():
+    docs = [
+        Document(page_content=name, metadata={"score": score})
+        for name, score in [("a", 0.5), ("b", 0.8), ("c", 0.2), ("d", 0.78)]
+    ]
+
+    kept = adaptive_cut(docs, POLICY)
+
+    assert [d.page_content for d in kept] == ["b", "d"]
+    assert all(d.metadata["retrieval_k"] == 2 for d in kept)
+
+
+def test_combine_is_most_permissive():
+    combined = AdaptiveK.combine(
+        [
+            AdaptiveK.with_overrides(min_k=3, max_k=4, score_threshold=0.4),
+            AdaptiveK.with_overrides(min_k=1, max_k=10, score_threshold=0.2),
+        ]
+    )
+
+    assert (combined.min_k, combined.max_k, combined.score_threshold) == (1, 10, 0.2)
+    assert AdaptiveK.with_overrides(min_k=9, max_k=4).max_k == 9
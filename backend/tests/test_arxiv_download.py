@@ -0,0 +1,136 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from backend.src.data.arxiv_download import ArxivDownloader, RetryableDownloadError
+from backend.src.data.arxiv_metadata import ArxivRecord
+from backend.src.data.arxiv_store import ArxivBlobStore
+from backend.src.knowledge.ingest_pipeline import IngestItem, prefetch_arxiv_pdfs
+
+PDF = b"%PDF-1.4\n" + bytes(range(256)) * 1024
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.hits.append((self.path, self.headers.get("Range")))
+            hits = sum(1 for path, _ in server.hits if path == self.path)
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+        try:
+            self._respond(hits)
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def _respond(self, hits):
+        start = 0
+        requested = self.headers.get("Range")
+        if requested and self.path != "/no-range":
+            start = int(requested.split("=")[1].rstrip("-"))
+        if self.path == "/busy" and hits == 1:
+            self.send_response(503)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = b"<html>not yet</html>" if self.path == "/html" else PDF[start:]
+        self.send_response(206 if start else 200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.path == "/broken" or (
+            self.path in ("/flaky", "/no-range") and hits == 1
+        ):
+            # Drop the connection halfway through the (first) transfer.
+            self.wfile.write(body[: len(body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        if self.path.startswith("/slow"):
+            self.server.release.wait(5)
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.hits, httpd.active, httpd.peak = [], 0, 0
+    httpd.lock, httpd.release = threading.Lock(), threading.Event()
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.release.set()
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _url(server, path):
+    return f"http://127.0.0.1:{server.server_address[1]}{path}"
+
+
+def _downloader(**kwargs):
+    return ArxivDownloader(sleep=lambda _: None, **kwargs)
+
+
+def test_fetch_resumes_a_broken_transfer_with_a_range_request(server):
+    downloader = _downloader()
+
+    assert downloader.fetch(_url(server, "/flaky")) == PDF
+    _, requested = server.hits[1]
+    assert requested.startswith("bytes=") and requested != "bytes=0-"
+
+
+def test_fetch_restarts_when_the_server_ignores_range(server):
+    assert _downloader().fetch(_url(server, "/no-range")) == PDF
+
+
+def test_fetch_retries_busy_responses_and_rejects_non_pdfs(server):
+    downloader = _downloader(retries=1)
+
+    assert downloader.fetch(_url(server, "/busy")) == PDF
+    with pytest.raises(ValueError):
+        downloader.fetch(_url(server, "/html"))
+    with pytest.raises(RetryableDownloadError):
+        _downloader(retries=0).fetch(_url(server, "/broken"))
+
+
+def test_fetch_many_caps_concurrency(server):
+    downloader = _downloader(max_workers=2)
+    urls = {f"p{i}": _url(server, f"/slow{i}") for i in range(5)}
+    threading.Timer(0.3, server.release.set).start()
+
+    results = dict(downloader.fetch_many(urls))
+
+    assert results == {key: PDF for key in urls}
+    assert server.peak == 2
+
+
+def test_prefetch_stores_resolved_papers(server, tmp_path):
+    store = ArxivBlobStore(str(tmp_path / "arxiv"), max_bytes=10**6)
+    items = [
+        IngestItem(
+            "arxiv",
+            "2301.00001",
+            ArxivRecord("2301.00001", "v3", _url(server, "/a"), {}),
+        ),
+        IngestItem(
+            "arxiv",
+            "2301.00002",
+            ArxivRecord("2301.00002", "v1", _url(server, "/html"), {}),
+        ),
+        IngestItem("arxiv", "2301.00003"),
+    ]
+
+    assert prefetch_arxiv_pdfs(items, _downloader(), store) == 1
+    stored = store.get("2301.00001")
+    assert stored.version == "v3"
+    assert store.read_pdf(stored) == PDF
+    assert stored.metadata["source"] == "arxiv:2301.00001"
+    store.close()
@@ -0,0 +1,118 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from backend.src.data.arxiv_metadata import ArxivMetadataResolver, TokenBucket
+from backend.src.data.arxiv_store import ArxivBlobStore
+from backend.src.knowledge import ingest_pipeline
+from backend.src.knowledge.ingest_pipeline import IngestItem, resolve_arxiv_items
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def _result(versioned_id):
+    return SimpleNamespace(
+        title=f"Paper {versioned_id}",
+        authors=["A. Author"],
+        summary="",
+        published=datetime(2023, 1, 1),
+        primary_category="cs.CL",
+        categories=["cs.CL"],
+        entry_id=f"http://arxiv.org/abs/{versioned_id}",
+        doi=None,
+        pdf_url=f"http://arxiv.org/pdf/{versioned_id}",
+    )
+
+
+class FakeResolver(ArxivMetadataResolver):
+    def __init__(self, known, bad=(), **kwargs):
+        super().__init__(bucket=TokenBucket(1000.0, 1000), **kwargs)
+        self.known = known
+        self.bad = set(bad)
+        self.queries = []
+
+    def _search(self, ids):
+        self.queries.append(list(ids))
+        if self.bad & set(ids):
+            raise ValueError("malformed id")
+        return [_result(self.known[i.split("v")[0]]) for i in ids if i in self.known]
+
+
+def test_token_bucket_paces_requests_after_the_burst():
+    clock = FakeClock()
+    bucket = TokenBucket(1 / 3, capacity=2, clock=clock, sleep=clock.sleep)
+
+    for _ in range(4):
+        bucket.acquire()
+
+    # Two tokens up front, then one every three seconds.
+    assert clock.now == pytest.approx(6.0)
+
+
+def test_resolver_batches_ids_and_caches_records():
+    known = {f"2301.{i:05d}": f"2301.{i:05d}v2" for i in range(250)}
+    resolver = FakeResolver(known, batch_size=100)
+
+    records = resolver.resolve(list(known))
+    again = resolver.resolve_one("2301.00007")
+
+    assert [len(q) for q in resolver.queries] == [100, 100, 50]
+    assert len(records) == 250
+    assert again.version == "v2"
+    assert again.pdf_url == "http://arxiv.org/pdf/2301.00007v2"
+    assert again.metadata["source"] == "arxiv:2301.00007"
+    assert resolver.requests == 3
+
+
+def test_unversioned_lookup_gets_the_numerically_latest_version():
+    class VersionResolver(FakeResolver):
+        def _search(self, ids):
+            return [_result(i) for i in ids]
+
+    resolver = VersionResolver({})
+
+    resolver.resolve(["2301.00001v10", "2301.00001v9"])
+
+    assert resolver.resolve_one("2301.00001").version == "v10"
+    assert resolver.requests == 1
+
+
+def test_resolver_bisects_a_batch_around_a_bad_id():
+    known = {"a1": "a1v1", "b2": "b2v1", "c3": "c3v1"}
+    resolver = FakeResolver(known, bad={"bogus"}, batch_size=4)
+
+    records = resolver.resolve(["a1", "bogus", "b2", "c3"])
+
+    assert sorted(records) == ["a1", "b2", "c3"]
+
+
+def test_resolve_arxiv_items_skips_stored_papers(monkeypatch, tmp_path):
+    monkeypatch.setattr(ingest_pipeline, "ARXIV_OFFLINE", False)
+    store = ArxivBlobStore(str(tmp_path / "arxiv"), max_bytes=10**6)
+    store.put("2301.00001", "v1", b"%PDF", {})
+    resolver = FakeResolver({"2301.00002": "2301.00002v1"})
+    items = [
+        IngestItem("pdf", "paper.pdf"),
+        IngestItem("arxiv", "2301.00001"),
+        IngestItem("arxiv", "arXiv:2301.00002"),
+    ]
+
+    resolved = resolve_arxiv_items(items, resolver, store)
+
+    assert resolved == items
+    assert resolver.queries == [["2301.00002"]]
+    assert [item.record for item in resolved[:2]] == [None, None]
+    assert resolved[2].record.pdf_url == "http://arxiv.org/pdf/2301.00002v1"
+    store.close()
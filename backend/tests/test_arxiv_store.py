@@ -0,0 +1,64 @@
+import pytest
+
+from backend.src.data import document_loader
+from backend.src.data.arxiv_store import ArxivBlobStore, split_version
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ArxivBlobStore(str(tmp_path / "arxiv"), max_bytes=10**6)
+    yield store
+    store.close()
+
+
+def test_split_version():
+    assert split_version("2301.00001v12") == ("2301.00001", "v12")
+    assert split_version("2301.00001") == ("2301.00001", "")
+    assert split_version("hep-th/9901001v1") == ("hep-th/9901001", "v1")
+
+
+def test_unversioned_lookup_returns_the_latest_version(store):
+    store.put("2301.00001", "v1", b"%PDF old", {"Title": "Old"})
+    store.put("2301.00001", "v2", b"%PDF new", {"Title": "New"})
+
+    latest = store.get("2301.00001")
+    pinned = store.get("2301.00001v1")
+
+    assert (latest.version, latest.metadata["Title"]) == ("v2", "New")
+    assert store.read_pdf(pinned) == b"%PDF old"
+    assert store.get("2301.00001v3") is None
+
+
+def test_corrupt_blob_is_dropped_on_read(store):
+    paper = store.put("2301.00002", "v1", b"%PDF data", {})
+    store.blob_path(paper.sha256).write_bytes(b"%PDF tampered")
+
+    assert store.read_pdf(paper) is None
+    assert store.get("2301.00002") is None
+
+
+def test_eviction_removes_least_recently_used_blobs(tmp_path):
+    store = ArxivBlobStore(str(tmp_path / "arxiv"), max_bytes=2500)
+    a = store.put("a", "v1", b"a" * 1000, {})
+    store.put("b", "v1", b"b" * 1000, {})
+    store.get("a")  # a is now newer than b
+
+    store.put("c", "v1", b"c" * 1000, {})
+
+    assert store.get("b") is None
+    assert store.get("a") is not None
+    assert store.blob_path(a.sha256).exists()
+    assert store.size_bytes <= 2500
+    store.close()
+
+
+def test_fetch_serves_stored_papers_without_network(monkeypatch, store):
+    store.put("2301.00003", "v1", b"%PDF stored", {"Title": "T", "source": "x"})
+    monkeypatch.setattr(document_loader, "get_arxiv_store", lambda: store)
+    monkeypatch.setattr(document_loader, "ARXIV_OFFLINE", True)
+
+    pdf_bytes, metadata = document_loader.fetch_arxiv_paper("2301.00003")
+
+    assert pdf_bytes == b"%PDF stored"
+    assert metadata == {"Title": "T", "source": "arxiv:2301.00003"}
+    assert document_loader.fetch_arxiv_paper("2301.99999") is None
@@ -0,0 +1,63 @@
+from langchain_core.documents import Document
+
+from backend.src.data.backmatter import back_matter_start, strip_back_matter
+from backend.src.data.document_loader import preprocess_documents
+
+BODY = (
+    "Abstract\nWe study things.\n\n1 Introduction\n"
+    "References to prior work are collected in Section 2.\n\n"
+    "2 Related Work\nSee the References section for details.\n\n"
+    "3 Conclusion\nIt works.\n"
+)
+
+
+def test_cuts_at_the_last_references_heading_not_a_body_mention():
+    text = BODY + "\nReferences\n[1] A. Author. A paper. 2020.\n"
+
+    assert strip_back_matter(text) == BODY.rstrip()
+
+
+def test_recognises_numbered_and_markdown_headings():
+    for heading in (
+        "7 REFERENCES",
+        "## References",
+        "**Bibliography**",
+        "VI. References:",
+    ):
+        text = f"{BODY}\n{heading}\n[1] Someone.\n"
+        assert back_matter_start(text) == len(BODY) + 1, heading
+
+
+def test_text_without_references_is_unchanged():
+    assert strip_back_matter(BODY) is BODY
+
+
+def test_appendices_are_stripped_only_on_request():
+    text = BODY + "\nAppendix A: Proofs\nLemma 1 holds.\n\nReferences\n[1] X.\n"
+
+    assert strip_back_matter(text).endswith("Lemma 1 holds.")
+    assert strip_back_matter(text, strip_appendices=True) == BODY.rstrip()
+
+
+def test_early_appendix_mention_is_not_treated_as_back_matter():
+    text = "Contents\nAppendix A\n\n" + BODY * 3 + "\nReferences\n[1] X.\n"
+
+    assert (
+        strip_back_matter(text, strip_appendices=True)
+        == ("Contents\nAppendix A\n\n" + BODY * 3).rstrip()
+    )
+
+
+def test_preprocess_keeps_raw_text_for_chunking():
+    doc = Document(page_content=BODY + "\nReferences\n[1] X.\n")
+
+    [[processed]] = preprocess_documents([[doc]], strip_appendices=False)
+
+    assert processed.page_content == BODY.rstrip()
+    assert "\n\n2 Related Work\n" in processed.page_content
+
+
+def test_offsets_survive_characters_that_lowercase_to_two():
+    body = "İstanbul results\n" * 3
+
+    assert strip_back_matter(body + "REFERENCES\n[1] X.\n") == body.rstrip()
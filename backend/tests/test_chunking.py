@@ -1,7 +1,12 @@
 from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
-from backend.src.data.chunking import SectionChunker, get_chunker
+from backend.src.data.chunking import (
+    SectionChunker,
+    SinglePassSectionChunker,
+    get_chunker,
+    iter_chunks,
+)
 
 
 def test_section_chunker_merges_metadata():
@@ -36,6 +41,52 @@ def test_get_chunker_returns_section_chunker():
     chunker = get_chunker(strategy="section")
 
     assert isinstance(chunker, SectionChunker)
+    assert isinstance(chunker, SinglePassSectionChunker)
+
+
+def test_single_pass_chunker_tracks_heading_hierarchy():
+    chunker = SinglePassSectionChunker(chunk_size=200, min_chunk_length=1)
+    text = (
+        "Preamble.\n# Paper\nIntro.\n2. Related Work\nPrior art.\n"
+        "### Details\nFine print.\n```\n# comment\n```\n# Next\nEnd."
+    )
+
+    chunks = chunker.transform_documents([Document(page_content=text)])
+
+    sections = [
+        (c.metadata["section_title"], c.metadata["section_level"]) for c in chunks
+    ]
+    assert sections == [
+        ("Unknown", 0),
+        ("Paper", 1),
+        ("2. Related Work", 2),
+        ("Details", 3),
+        ("Next", 1),
+    ]
+    assert chunks[3].page_content == "Fine print.\n```\n# comment\n```"
+    assert "header_2" not in chunks[4].metadata
+
+
+def test_single_pass_chunks_are_spans_of_the_original_text():
+    chunker = SinglePassSectionChunker(
+        chunk_size=100, chunk_overlap=20, min_chunk_length=1
+    )
+    first = "\n".join(f"Line {i} of the first paragraph." for i in range(3))
+    second = "\n".join(f"Line {i} of the second paragraph." for i in range(3))
+    text = f"# Methods\n{first}\n\n{second}"
+    doc = Document(page_content=text, metadata={"paper_metadata": {"title": "T"}})
+
+    chunks = chunker.transform_documents([doc])
+
+    for chunk in chunks:
+        start = chunk.metadata["start_index"]
+        assert text[start : start + len(chunk.page_content)] == chunk.page_content
+        assert len(chunk.page_content) <= 100
+        assert chunk.metadata["paper_metadata"] is doc.metadata["paper_metadata"]
+    # The full chunk ends at the paragraph break rather than mid-paragraph.
+    assert chunks[0].page_content == first
+    assert [c.metadata["chunk_index"] for c in chunks] == list(range(len(chunks)))
+    assert {c.metadata["chunk_total"] for c in chunks} == {len(chunks)}
 
 
 def test_get_chunker_semantic_missing_embeddings_falls_back():
@@ -48,3 +99,54 @@ def test_get_chunker_unknown_strategy_falls_back():
     chunker = get_chunker(strategy="unknown")
 
     assert isinstance(chunker, RecursiveCharacterTextSplitter)
+
+
+def _page(text, number):
+    return Document(page_content=text, metadata={"source": "x", "page_number": number})
+
+
+def test_iter_chunks_keeps_paragraphs_across_page_breaks():
+    splitter = RecursiveCharacterTextSplitter(chunk_size=60, chunk_overlap=0)
+    pages = [
+        _page("First paragraph on page one.\n\nSecond paragraph starts", 1),
+        _page("and ends on page two.\n\nThird paragraph.", 2),
+    ]
+
+    chunks = list(iter_chunks(splitter, pages, carry_chars=60))
+
+    texts = [c.page_content for c in chunks]
+    assert "Second paragraph starts\nand ends on page two." in texts
+    pages_by_text = {c.page_content: c.metadata["page_number"] for c in chunks}
+    assert pages_by_text["First paragraph on page one."] == 1
+    assert pages_by_text["Second paragraph starts\nand ends on page two."] == 1
+    assert pages_by_text["Third paragraph."] == 2
+    assert [c.metadata["chunk_index"] for c in chunks] == list(range(len(chunks)))
+
+
+def test_iter_chunks_carries_the_section_onto_later_pages():
+    chunker = SectionChunker(chunk_size=200, chunk_overlap=0, min_chunk_length=1)
+    pages = [
+        _page("# Methods\n\nWe train a model.", 1),
+        _page("More method details.\n\n# Results\n\nIt works.", 2),
+    ]
+
+    chunks = list(iter_chunks(chunker, pages, carry_chars=10))
+
+    sections = {c.page_content: c.metadata["section_title"] for c in chunks}
+    assert sections["More method details."] == "Methods"
+    assert sections["It works."] == "Results"
+
+
+def test_iter_chunks_yields_before_later_pages_are_read():
+    splitter = RecursiveCharacterTextSplitter(chunk_size=20, chunk_overlap=0)
+    read = []
+
+    def pages():
+        for number in range(1, 100):
+            read.append(number)
+            yield _page(f"Page {number} text.\n\nMore text here.", number)
+
+    first = next(iter_chunks(splitter, pages(), carry_chars=20))
+
+    assert first.page_content == "Page 1 text."
+    assert read == [1]
@@ -0,0 +1,70 @@
+"""SectionChunker vs SinglePassSectionChunker: throughput and peak memory.
+
+Run with `pytest tests/test_chunking_benchmark.py --benchmark-only`; chars/s
+and peak traced memory are in each benchmark's extra_info.
+"""
+
+import tracemalloc
+
+import pytest
+from langchain_core.documents import Document
+
+from backend.src.data.chunking import SectionChunker, SinglePassSectionChunker
+
+pytest.importorskip("pytest_benchmark")
+
+SECTIONS = ["Abstract", "1 Introduction", "2 Related Work", "3 Methods"]
+SECTIONS += ["## 3.1 Model", "### Training details", "4 Experiments", "5 Results"]
+SECTIONS += ["6 Discussion", "7 Conclusion", "Acknowledgements"]
+
+
+def _paper(paragraphs_per_section: int = 40) -> str:
+    sentence = (
+        "We evaluate the retrieval model on {n} benchmark queries, and the "
+        "results, shown in Table {n}, improve on the baseline by {n}.{n}%. "
+    )
+    parts = []
+    for section in SECTIONS:
+        parts.append(section)
+        for n in range(paragraphs_per_section):
+            lines = [sentence.format(n=n + i) for i in range(4)]
+            parts.append("\n".join(lines) + "\n")
+    return "\n".join(parts)
+
+
+PAPER = Document(
+    page_content=_paper(),
+    metadata={"source": "bench.pdf", "paper_metadata": {"title": "Bench"}},
+)
+CHUNKERS = {"legacy": SectionChunker, "single_pass": SinglePassSectionChunker}
+
+
+def _peak_bytes(chunker) -> int:
+    tracemalloc.start()
+    chunker.transform_documents([PAPER])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+@pytest.mark.parametrize("name", sorted(CHUNKERS))
+def test_section_chunker_throughput(benchmark, name):
+    chunker = CHUNKERS[name]()
+
+    chunks = benchmark.pedantic(
+        chunker.transform_documents, args=([PAPER],), rounds=5, iterations=1
+    )
+
+    benchmark.extra_info["chars_per_second"] = int(
+        len(PAPER.page_content) / benchmark.stats.stats.mean
+    )
+    benchmark.extra_info["peak_bytes"] = _peak_bytes(chunker)
+    benchmark.extra_info["chunks"] = len(chunks)
+    assert chunks
+
+
+def test_single_pass_uses_less_peak_memory():
+    legacy = _peak_bytes(SectionChunker())
+    single_pass = _peak_bytes(SinglePassSectionChunker())
+
+    assert single_pass < legacy
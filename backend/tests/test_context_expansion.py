@@ -0,0 +1,80 @@
+from langchain_core.documents import Document
+
+from backend.src.retrieval.context_expansion import (
+    join_with_overlap,
+    merge_adjacent_chunks,
+)
+
+
+def _chunk(seq, text, score=None, paper_id="p1", kb_id=1, start_index=None):
+    return Document(
+        page_content=text,
+        metadata={
+            "paper_id": paper_id,
+            "kb_id": kb_id,
+            "user_id": 0,
+            "chunk_seq": seq,
+            "start_index": start_index,
+            "score": score,
+        },
+    )
+
+
+def test_join_with_overlap_drops_shared_seam():
+    assert join_with_overlap("alpha beta", "beta gamma", 4) == "alpha beta gamma"
+    assert join_with_overlap("alpha", "gamma") == "alpha\ngamma"
+
+
+def test_coincidental_suffix_match_is_not_an_overlap():
+    assert join_with_overlap("we trained the", "each layer uses") == (
+        "we trained the\neach layer uses"
+    )
+
+    passages = merge_adjacent_chunks(
+        [
+            _chunk(0, "we trained the", score=0.9, start_index=0),
+            _chunk(1, "each layer uses", start_index=15),
+        ],
+        [],
+    )
+
+    assert passages[0].page_content == "we trained the\neach layer uses"
+
+
+def test_merge_uses_stored_offsets_for_the_seam():
+    text = "alpha beta gamma delta"
+    left, right = text[:10], text[6:]  # "alpha beta", "beta gamma delta"
+
+    passages = merge_adjacent_chunks(
+        [_chunk(0, left, score=0.9, start_index=0), _chunk(1, right, start_index=6)],
+        [],
+    )
+
+    assert passages[0].page_content == text
+
+
+def test_merge_adjacent_chunks_merges_contiguous_runs():
+    hits = [_chunk(5, "five", score=0.9), _chunk(1, "one", score=0.5)]
+    neighbors = [_chunk(4, "four"), _chunk(6, "six"), _chunk(0, "zero")]
+
+    passages = merge_adjacent_chunks(hits, neighbors)
+
+    assert [p.page_content for p in passages] == ["four\nfive\nsix", "zero\none"]
+    assert passages[0].metadata["chunk_span"] == [4, 6]
+    assert passages[0].metadata["score"] == 0.9
+
+
+def test_merge_adjacent_chunks_keeps_scopes_apart():
+    hits = [_chunk(1, "a", score=0.8, kb_id=1), _chunk(2, "b", score=0.7, kb_id=2)]
+
+    passages = merge_adjacent_chunks(hits, [])
+
+    assert [p.page_content for p in passages] == ["a", "b"]
+
+
+def test_merge_adjacent_chunks_passes_through_legacy_hits():
+    legacy = Document(page_content="old", metadata={"score": 0.4})
+
+    passages = merge_adjacent_chunks([legacy], [])
+
+    assert passages == [legacy]
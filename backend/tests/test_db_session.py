@@ -0,0 +1,35 @@
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import sessionmaker
+
+from backend.src.db.models import Base, KnowledgeBase, RetrievalMode
+from backend.src.db.session import ADDED_COLUMNS, ADDED_INDEXES, migrate_schema
+
+
+def test_migrate_schema_adds_missing_columns_and_indexes_idempotently():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for table_name, columns in ADDED_COLUMNS.items():
+            for column in columns:
+                conn.execute(text(f"ALTER TABLE {table_name} DROP COLUMN {column}"))
+        for indexes in ADDED_INDEXES.values():
+            for index in indexes:
+                conn.execute(text(f"DROP INDEX {index}"))
+        conn.execute(
+            text(
+                "INSERT INTO knowledge_bases (name, domain, is_system, "
+                "chunking_strategy) VALUES ('kb', 'ml', 0, 'section')"
+            )
+        )
+
+    migrate_schema(engine)
+    migrate_schema(engine)
+
+    inspector = inspect(engine)
+    columns = {c["name"] for c in inspector.get_columns("knowledge_bases")}
+    assert set(ADDED_COLUMNS["knowledge_bases"]) <= columns
+    for table_name, indexes in ADDED_INDEXES.items():
+        assert set(indexes) <= {i["name"] for i in inspector.get_indexes(table_name)}
+    db = sessionmaker(bind=engine)()
+    assert db.query(KnowledgeBase).one().retrieval_mode == RetrievalMode.flat
+    db.close()
@@ -0,0 +1,209 @@
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+from qdrant_client.http.models import FieldCondition, Filter, MatchValue
+
+from backend.config.vector_backend_config import VectorBackendConfig
+from backend.src.retrieval import qdrant_setup
+from backend.src.retrieval import qdrant_store as qdrant_store_module
+from backend.src.retrieval.embedded_backend import EmbeddedVectorBackend
+from backend.src.retrieval.result_cache import SearchResultCache
+
+DIM = 8
+
+
+class KeywordEmbedder:
+    """Deterministic embedder: one dimension per keyword."""
+
+    KEYWORDS = ["attention", "vision", "speech", "graph"]
+
+    def _embed(self, text):
+        vector = [1.0 if word in text.lower() else 0.0 for word in self.KEYWORDS]
+        return vector + [0.1] * (DIM - len(vector))
+
+    def embed_documents(self, texts):
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+@pytest.fixture
+def backend(tmp_path):
+    config = VectorBackendConfig(backend="embedded", embedded_path=str(tmp_path))
+    embedded = EmbeddedVectorBackend(config)
+    yield embedded
+    embedded.close()
+
+
+@pytest.fixture
+def store(backend, monkeypatch):
+    monkeypatch.setattr(qdrant_store_module, "get_embedder", KeywordEmbedder)
+    qdrant_setup._ensure_collection(
+        backend,
+        "chunks",
+        DIM,
+        recreate=False,
+        payload_fields=qdrant_setup.CHUNK_PAYLOAD_INDEXES,
+    )
+    qdrant_setup._ensure_collection(
+        backend,
+        "chunks_papers",
+        DIM,
+        recreate=False,
+        payload_fields=qdrant_setup.PAPER_PAYLOAD_INDEXES,
+    )
+    return qdrant_store_module.QdrantStore(
+        client=backend, collection_name="chunks", result_cache=SearchResultCache()
+    )
+
+
+def _chunks(*texts):
+    return [Document(page_content=t, metadata={"Title": "T"}) for t in texts]
+
+
+def test_store_round_trip_on_embedded_backend(store):
+    store.add_documents(
+        _chunks("attention is all you need", "more attention details"),
+        user_id=0,
+        paper_id="p-attn",
+        paper_title="Attention",
+        kb_id=1,
+        domain="NLP",
+    )
+    store.add_documents(
+        _chunks("vision transformers", "vision results"),
+        user_id=0,
+        paper_id="p-vit",
+        paper_title="ViT",
+        kb_id=2,
+        domain="CV",
+    )
+
+    hits = store.search("vision", kb_ids=[1, 2], limit=1)
+    assert hits[0].metadata["paper_id"] == "p-vit"
+
+    scoped = store.search("vision", kb_ids=[1], limit=5)
+    assert {d.metadata["paper_id"] for d in scoped} == {"p-attn"}
+
+    assert store.search("vision", kb_ids=[1, 2], domain_filter="NLP", limit=5)
+    assert store.document_exists_in_kb(2, "p-vit")
+
+    store.delete_kb(2)
+
+    assert not store.document_exists_in_kb(2, "p-vit")
+    assert store.search("vision", kb_ids=[2], limit=5) == []
+
+
+def test_neighbor_expansion_and_two_stage_on_embedded_backend(store):
+    store.add_documents(
+        _chunks("intro text", "attention mechanism", "closing text"),
+        user_id=5,
+        paper_id="p1",
+        paper_title="attention paper",
+    )
+
+    docs = store.search("attention", user_id=5, limit=1, neighbor_window=1)
+    assert docs[0].metadata["chunk_span"] == [0, 2]
+
+    staged = store.search("attention", user_id=5, limit=1, two_stage=True)
+    assert staged[0].metadata["paper_id"] == "p1"
+
+
+def test_upsert_same_id_replaces_point(backend):
+    from qdrant_client.http.models import PointStruct, VectorParams
+
+    backend.create_collection(
+        "c", vectors_config=VectorParams(size=2, distance="Cosine")
+    )
+    backend.upsert("c", [PointStruct(id=1, vector=[1.0, 0.0], payload={"v": 1})])
+    backend.upsert("c", [PointStruct(id=1, vector=[0.0, 1.0], payload={"v": 2})])
+
+    points, _ = backend.scroll("c", limit=10)
+
+    assert [(p.id, p.payload["v"]) for p in points] == [(1, 2)]
+    hits = backend.query_points("c", query=[0.0, 1.0], limit=5).points
+    assert len(hits) == 1
+    assert hits[0].score == pytest.approx(1.0)
+
+
+def test_hnsw_search_respects_filters(tmp_path):
+    from qdrant_client.http.models import PointStruct, VectorParams
+
+    config = VectorBackendConfig(
+        backend="embedded",
+        embedded_path=str(tmp_path),
+        index_type="hnsw",
+        exact_search_threshold=0,
+    )
+    backend = EmbeddedVectorBackend(config)
+    backend.create_collection(
+        "c", vectors_config=VectorParams(size=4, distance="Cosine")
+    )
+    rng = np.random.default_rng(0)
+    backend.upsert(
+        "c",
+        [
+            PointStruct(
+                id=i, vector=rng.standard_normal(4).tolist(), payload={"kb": i % 2}
+            )
+            for i in range(200)
+        ],
+    )
+    only_odd = Filter(must=[FieldCondition(key="kb", match=MatchValue(value=1))])
+
+    hits = backend.query_points(
+        "c", query=[1, 0, 0, 0], query_filter=only_odd, limit=10
+    )
+
+    assert len(hits.points) == 10
+    assert all(p.payload["kb"] == 1 for p in hits.points)
+    assert (tmp_path / "c" / "index.faiss").exists()
+    backend.close()
+
+
+def test_hnsw_index_catches_up_with_rows_from_another_process(tmp_path):
+    from qdrant_client.http.models import PointStruct, VectorParams
+
+    config = VectorBackendConfig(
+        backend="embedded",
+        embedded_path=str(tmp_path),
+        index_type="hnsw",
+        exact_search_threshold=0,
+    )
+    api, ingest = EmbeddedVectorBackend(config), EmbeddedVectorBackend(config)
+    api.create_collection("c", vectors_config=VectorParams(size=4, distance="Cosine"))
+    rng = np.random.default_rng(0)
+    api.upsert(
+        "c",
+        [
+            PointStruct(id=i, vector=rng.standard_normal(4).tolist(), payload={})
+            for i in range(50)
+        ],
+    )
+    api.query_points("c", query=[1, 0, 0, 0], limit=1)  # builds the index
+
+    ingest.upsert("c", [PointStruct(id=999, vector=[0, 0, 0, 1], payload={})])
+    api.upsert("c", [PointStruct(id=1000, vector=[0, 0, 1, 0], payload={})])
+
+    assert api.query_points("c", query=[0, 0, 0, 1], limit=1).points[0].id == 999
+    assert api.query_points("c", query=[0, 0, 1, 0], limit=1).points[0].id == 1000
+    api.close()
+    ingest.close()
+
+
+def test_upsert_after_a_torn_write_starts_on_a_row_boundary(backend, tmp_path):
+    from qdrant_client.http.models import PointStruct, VectorParams
+
+    backend.create_collection(
+        "c", vectors_config=VectorParams(size=2, distance="Cosine")
+    )
+    backend.upsert("c", [PointStruct(id=1, vector=[1.0, 0.0], payload={})])
+    with (tmp_path / "c" / "vectors.f32").open("ab") as f:
+        f.write(b"\x00\x01\x02")  # a writer died mid-row
+
+    backend.upsert("c", [PointStruct(id=2, vector=[0.0, 1.0], payload={})])
+
+    hits = backend.query_points("c", query=[0.0, 1.0], limit=1).points
+    assert hits[0].id == 2
+    assert hits[0].score == pytest.approx(1.0)
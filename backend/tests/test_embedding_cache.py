@@ -0,0 +1,80 @@
+import pytest
+
+from backend.src.embedding.embedding_cache import CachedEmbeddings, EmbeddingCacheStore
+
+
+class CountingEmbedder:
+    model = "test/model"
+    truncate = "END"
+
+    def __init__(self):
+        self.document_batches = []
+        self.query_batches = []
+
+    def embed_documents(self, texts):
+        self.document_batches.append(list(texts))
+        return [[float(len(t)), 1.0] for t in texts]
+
+    def embed_query(self, text):
+        self.query_batches.append([text])
+        return [float(len(text)), -1.0]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = EmbeddingCacheStore(str(tmp_path / "cache.sqlite"), max_bytes=1 << 20)
+    yield store
+    store.close()
+
+
+def test_only_misses_are_sent_upstream(store):
+    inner = CountingEmbedder()
+    cached = CachedEmbeddings(inner, store)
+
+    first = cached.embed_documents(["a", "bb", "a"])
+    second = cached.embed_documents(["bb", "ccc"])
+
+    assert inner.document_batches == [["a", "bb"], ["ccc"]]
+    assert first == [[1.0, 1.0], [2.0, 1.0], [1.0, 1.0]]
+    assert second == [[2.0, 1.0], [3.0, 1.0]]
+    assert cached.stats()["hits"] == 1
+    assert cached.stats()["misses"] == 4
+
+
+def test_queries_and_passages_are_cached_separately(store):
+    inner = CountingEmbedder()
+    cached = CachedEmbeddings(inner, store)
+
+    cached.embed_documents(["q"])
+    assert cached.embed_query("q") == [1.0, -1.0]
+    assert cached.embed_query("q") == [1.0, -1.0]
+
+    assert inner.query_batches == [["q"]]
+
+
+def test_cache_persists_across_instances_and_is_keyed_by_model(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    inner = CountingEmbedder()
+    CachedEmbeddings(inner, EmbeddingCacheStore(path, 1 << 20)).embed_documents(["x"])
+
+    reopened = EmbeddingCacheStore(path, 1 << 20)
+    CachedEmbeddings(inner, reopened).embed_documents(["x"])
+    CachedEmbeddings(inner, reopened, model="other/model").embed_documents(["x"])
+
+    assert inner.document_batches == [["x"], ["x"]]
+
+
+def test_evicts_least_recently_used_past_size_cap(tmp_path):
+    # Each 2-d float32 vector is 8 bytes; cap at three entries.
+    store = EmbeddingCacheStore(str(tmp_path / "cache.sqlite"), max_bytes=24)
+    inner = CountingEmbedder()
+    cached = CachedEmbeddings(inner, store)
+    cached.embed_documents(["a", "b", "c"])
+    cached.embed_documents(["a"])  # refresh "a"
+
+    cached.embed_documents(["d"])
+
+    assert store.size_bytes <= 24
+    inner.document_batches.clear()
+    cached.embed_documents(["a", "d"])
+    assert inner.document_batches == []
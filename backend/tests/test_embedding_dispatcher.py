@@ -0,0 +1,102 @@
+import threading
+
+import pytest
+
+from backend.src.embedding.batching import BatchingEmbeddings, EmbeddingDispatcher
+
+
+class RecordingEmbedder:
+    def __init__(self, fail=False):
+        self.query_batches = []
+        self.document_batches = []
+        self.fail = fail
+
+    def embed_queries(self, texts):
+        if self.fail:
+            raise RuntimeError("upstream down")
+        self.query_batches.append(list(texts))
+        return [[float(len(t)), -1.0] for t in texts]
+
+    def embed_documents(self, texts):
+        self.document_batches.append(list(texts))
+        return [[float(len(t)), 1.0] for t in texts]
+
+
+def _concurrently(fn, args):
+    barrier = threading.Barrier(len(args))
+    results = [None] * len(args)
+    errors = [None] * len(args)
+
+    def run(i, arg):
+        barrier.wait()
+        try:
+            results[i] = fn(arg)
+        except Exception as exc:
+            errors[i] = exc
+
+    threads = [threading.Thread(target=run, args=(i, a)) for i, a in enumerate(args)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+def test_concurrent_queries_share_upstream_calls():
+    inner = RecordingEmbedder()
+    embedder = BatchingEmbeddings(
+        inner, EmbeddingDispatcher(inner, max_batch_size=64, max_wait_ms=50)
+    )
+    questions = ["q" * n for n in range(1, 9)]
+
+    results, errors = _concurrently(embedder.embed_query, questions)
+
+    assert errors == [None] * len(questions)
+    # Every caller gets its own vector back.
+    assert results == [[float(n), -1.0] for n in range(1, 9)]
+    assert len(inner.query_batches) < len(questions)
+    assert sorted(t for batch in inner.query_batches for t in batch) == questions
+    assert embedder.dispatcher.stats()["requests"] == len(questions)
+
+
+def test_queries_and_passages_go_out_separately():
+    inner = RecordingEmbedder()
+    embedder = BatchingEmbeddings(
+        inner, EmbeddingDispatcher(inner, max_batch_size=64, max_wait_ms=50)
+    )
+
+    results, errors = _concurrently(
+        lambda call: call(),
+        [
+            lambda: embedder.embed_query("what"),
+            lambda: embedder.embed_documents(["a passage", "another"]),
+        ],
+    )
+
+    assert errors == [None, None]
+    assert results == [[4.0, -1.0], [[9.0, 1.0], [7.0, 1.0]]]
+    assert inner.query_batches == [["what"]]
+    assert inner.document_batches == [["a passage", "another"]]
+
+
+def test_large_requests_skip_the_queue():
+    inner = RecordingEmbedder()
+    dispatcher = EmbeddingDispatcher(inner, max_batch_size=2, max_wait_ms=1000)
+
+    vectors = BatchingEmbeddings(inner, dispatcher).embed_documents(["a", "b", "c"])
+
+    assert vectors == [[1.0, 1.0]] * 3
+    assert dispatcher._worker is None
+
+
+def test_upstream_errors_reach_every_caller():
+    inner = RecordingEmbedder(fail=True)
+    embedder = BatchingEmbeddings(
+        inner, EmbeddingDispatcher(inner, max_batch_size=64, max_wait_ms=20)
+    )
+
+    _, errors = _concurrently(embedder.embed_query, ["a", "b", "c"])
+
+    assert all(isinstance(e, RuntimeError) for e in errors)
+    with pytest.raises(RuntimeError):
+        embedder.embed_query("d")
@@ -0,0 +1,142 @@
+import threading
+
+import pytest
+
+from backend.src.embedding.executor import (
+    EmbeddingExecutor,
+    plan_batches,
+    retry_after_seconds,
+    status_of,
+)
+
+
+class FlakyEmbedder:
+    """Fails with the queued errors first, then embeds by text length."""
+
+    def __init__(self, errors=(), max_texts=None):
+        self.errors = list(errors)
+        self.max_texts = max_texts
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def embed_documents(self, texts):
+        with self.lock:
+            if self.errors:
+                raise self.errors.pop(0)
+            if self.max_texts is not None and len(texts) > self.max_texts:
+                raise Exception("[413] Payload Too Large\nrequest too big")
+            self.batches.append(list(texts))
+        return [[float(len(t))] for t in texts]
+
+
+class HTTPError(Exception):
+    def __init__(self, status, headers=None):
+        super().__init__(f"HTTP {status}")
+        self.response = type("R", (), {"status_code": status, "headers": headers})()
+
+
+def _executor(inner, **kwargs):
+    sleeps = []
+    kwargs.setdefault("max_batch_tokens", 1000)
+    kwargs.setdefault("max_batch_texts", 4)
+    kwargs.setdefault("concurrency", 3)
+    executor = EmbeddingExecutor(inner, sleep=sleeps.append, **kwargs)
+    return executor, sleeps
+
+
+def test_plan_batches_respects_tokens_and_count():
+    assert plan_batches([5, 5, 5, 5, 5], max_tokens=10, max_texts=4) == [
+        (0, 2),
+        (2, 4),
+        (4, 5),
+    ]
+    assert plan_batches([1] * 5, max_tokens=100, max_texts=2) == [
+        (0, 2),
+        (2, 4),
+        (4, 5),
+    ]
+    # An oversized text still goes out, on its own.
+    assert plan_batches([50, 1], max_tokens=10, max_texts=4) == [(0, 1), (1, 2)]
+
+
+def test_status_and_retry_after_parsing():
+    assert status_of(Exception("[429] Too Many Requests\nslow down")) == 429
+    assert status_of(HTTPError(503)) == 503
+    assert status_of(ValueError("boom")) is None
+    assert retry_after_seconds({"Retry-After": "7"}) == 7.0
+    assert retry_after_seconds({"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}) == 0
+    assert retry_after_seconds({}) is None
+
+
+def test_batches_run_concurrently_and_keep_order():
+    inner = FlakyEmbedder()
+    executor, _ = _executor(inner)
+    texts = ["x" * n for n in range(1, 11)]
+
+    vectors = executor.embed_documents(texts)
+
+    assert vectors == [[float(n)] for n in range(1, 11)]
+    assert sorted(len(batch) for batch in inner.batches) == [2, 4, 4]
+    assert executor.last_run.batches == 3
+    assert executor.last_run.tokens_per_second > 0
+
+
+def test_rate_limits_are_retried_honoring_retry_after():
+    inner = FlakyEmbedder(
+        errors=[HTTPError(429, {"Retry-After": "3"}), Exception("[503] Unavailable")]
+    )
+    executor, sleeps = _executor(inner, base_delay=0.5)
+
+    assert executor.embed_documents(["a", "bb"]) == [[1.0], [2.0]]
+    assert executor.last_run.retries == 2
+    assert 3.0 <= sleeps[0] <= 3.5
+    # No Retry-After: full jitter within base_delay * 2**attempt.
+    assert 0 <= sleeps[1] <= 1.0
+
+
+def test_retry_after_comes_from_the_failing_call_not_the_shared_client():
+    def nvidia_style_error(headers):
+        # langchain-nvidia: raise Exception(message) from None in the handler.
+        try:
+            raise HTTPError(429, headers)
+        except HTTPError:
+            try:
+                raise Exception("[429] Too Many Requests") from None
+            except Exception as exc:
+                return exc
+
+    inner = FlakyEmbedder(errors=[nvidia_style_error({"Retry-After": "4"})])
+    # Another thread's response, left on the shared client.
+    other = HTTPError(429, {"Retry-After": "50"}).response
+    inner._client = type("Client", (), {"last_response": other})()
+    executor, sleeps = _executor(inner, base_delay=0.5)
+
+    executor.embed_documents(["a"])
+
+    assert 4.0 <= sleeps[0] <= 4.5
+
+
+def test_gives_up_after_max_retries_and_skips_client_errors():
+    executor, sleeps = _executor(
+        FlakyEmbedder(errors=[Exception("[429] Too Many Requests")] * 3),
+        max_retries=2,
+    )
+    with pytest.raises(Exception, match="429"):
+        executor.embed_documents(["a"])
+    assert len(sleeps) == 2
+
+    executor, sleeps = _executor(FlakyEmbedder(errors=[Exception("[400] Bad")]))
+    with pytest.raises(Exception, match="400"):
+        executor.embed_documents(["a"])
+    assert sleeps == []
+
+
+def test_payload_too_large_shrinks_batches():
+    inner = FlakyEmbedder(max_texts=1)
+    executor, _ = _executor(inner, max_batch_texts=4)
+
+    vectors = executor.embed_documents(["aaaa", "bbbb", "cccc", "dddd"])
+
+    assert vectors == [[4.0]] * 4
+    assert all(len(batch) == 1 for batch in inner.batches)
+    assert executor.max_batch_tokens < 1000
@@ -3,7 +3,13 @@ from types import SimpleNamespace
 
 import pytest
 
-from backend.src.data.extraction import extract_pdf_with_structure
+from backend.src.data import extraction
+from backend.src.data.extraction import extract_pdf_with_structure, iter_pdf_pages
+
+
+@pytest.fixture(autouse=True)
+def no_extraction_cache(monkeypatch):
+    monkeypatch.setattr(extraction, "get_extraction_cache", lambda: None)
 
 
 class FakePage:
@@ -22,6 +28,13 @@ class FakeDoc:
     def __iter__(self):
         return iter(self._pages)
 
+    def __getitem__(self, number):
+        return self._pages[number]
+
+    @property
+    def page_count(self):
+        return len(self._pages)
+
     def close(self):
         self.closed = True
 
@@ -60,3 +73,50 @@ def test_extract_pdf_with_structure_raises_on_empty_text(monkeypatch):
 
     with pytest.raises(ValueError):
         extract_pdf_with_structure(b"%PDF", "file.pdf", use_structure=False)
+
+
+def test_iter_pdf_pages_yields_numbered_pages(monkeypatch):
+    _install_fake_fitz(monkeypatch, [FakePage("one"), FakePage(" "), FakePage("3")])
+
+    pages = list(
+        iter_pdf_pages(b"%PDF", "f.pdf", use_structure=False, metadata={"x": 1})
+    )
+
+    assert [p.page_content for p in pages] == ["one", "3"]
+    assert [p.metadata["page_number"] for p in pages] == [1, 3]
+    assert pages[0].metadata["Title"] == "f.pdf"
+    assert pages[0].metadata["x"] == 1
+
+
+def test_iter_pdf_pages_converts_markdown_in_page_batches(monkeypatch):
+    _install_fake_fitz(monkeypatch, [FakePage(f"flat{i}") for i in range(5)])
+    calls = []
+
+    def to_markdown(doc, pages, page_chunks):
+        calls.append(pages)
+        if 2 in pages:
+            raise RuntimeError("bad page")
+        return [{"text": f"# md{number}"} for number in pages]
+
+    monkeypatch.setitem(
+        sys.modules, "pymupdf4llm", SimpleNamespace(to_markdown=to_markdown)
+    )
+
+    pages = list(iter_pdf_pages(b"%PDF", "f.pdf", pages_per_batch=2))
+
+    assert calls == [[0, 1], [2, 3], [4]]
+    # The failing batch falls back to flat text; the others stay markdown.
+    assert [p.page_content for p in pages] == [
+        "# md0",
+        "# md1",
+        "flat2",
+        "flat3",
+        "# md4",
+    ]
+
+
+def test_iter_pdf_pages_raises_when_no_page_has_text(monkeypatch):
+    _install_fake_fitz(monkeypatch, [FakePage(""), FakePage(" ")])
+
+    with pytest.raises(ValueError):
+        list(iter_pdf_pages(b"%PDF", "file.pdf", use_structure=False))
@@ -0,0 +1,112 @@
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+from backend.src.data import extraction
+from backend.src.data.extraction_cache import (
+    CachedExtraction,
+    ExtractionCacheStore,
+    PageRecorder,
+    pdf_hash,
+)
+
+
+class FakePage:
+    def __init__(self, text):
+        self._text = text
+
+    def get_text(self):
+        return self._text
+
+
+class FakeDoc:
+    def __init__(self, pages):
+        self._pages = pages
+
+    def __iter__(self):
+        return iter(self._pages)
+
+    def __getitem__(self, number):
+        return self._pages[number]
+
+    @property
+    def page_count(self):
+        return len(self._pages)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ExtractionCacheStore(str(tmp_path / "extractions.sqlite"), 10**6)
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def fitz_opens(monkeypatch, store):
+    opens = []
+
+    def open_pdf(**_):
+        opens.append(1)
+        return FakeDoc([FakePage("page one\n"), FakePage(""), FakePage("page ∑ three")])
+
+    monkeypatch.setitem(sys.modules, "fitz", SimpleNamespace(open=open_pdf))
+    monkeypatch.setitem(sys.modules, "pymupdf4llm", None)
+    monkeypatch.setattr(extraction, "get_extraction_cache", lambda: store)
+    return opens
+
+
+def test_recorded_pages_stream_back_unchanged():
+    recorder = PageRecorder()
+    pages = ["alpha " * 5000, "", "βeta\n" * 3000, "gamma"]
+    for page in pages:
+        recorder.add(page)
+
+    cached = recorder.finish()
+
+    assert list(cached.pages()) == pages
+    assert cached.text() == "".join(pages)
+
+
+def test_store_round_trips_and_evicts_least_recently_used(tmp_path):
+    store = ExtractionCacheStore(str(tmp_path / "c.sqlite"), max_bytes=2500)
+    blobs = {name: CachedExtraction(bytes([i]) * 1000) for i, name in enumerate("abc")}
+    store.put(b"a", "x", "flat", blobs["a"])
+    store.put(b"b", "x", "flat", blobs["b"])
+    assert store.get(b"a", "x", "flat").blob == blobs["a"].blob  # a is now newer
+
+    store.put(b"c", "x", "flat", blobs["c"])
+
+    assert store.get(b"b", "x", "flat") is None
+    assert store.get(b"a", "x", "flat") is not None
+    assert store.get(b"a", "x", "structure") is None
+    assert store.size_bytes <= 2500
+    store.close()
+
+
+def test_pages_are_extracted_once_and_then_served_from_cache(fitz_opens, store):
+    first = list(extraction.iter_pdf_pages(b"%PDF-1", "f.pdf", use_structure=False))
+    second = list(extraction.iter_pdf_pages(b"%PDF-1", "f.pdf", use_structure=False))
+
+    assert len(fitz_opens) == 1
+    assert [p.page_content for p in second] == [p.page_content for p in first]
+    assert [p.metadata["page_number"] for p in second] == [1, 3]
+
+    # The whole-document extraction reuses the same entry.
+    doc = extraction.extract_pdf_with_structure(b"%PDF-1", "f.pdf", use_structure=False)
+    assert doc.page_content == "page one\npage ∑ three"
+    assert len(fitz_opens) == 1
+
+
+def test_whole_document_entry_does_not_serve_pages(fitz_opens, store):
+    extractor = extraction.extractor_name(False)
+    store.put(pdf_hash(b"%PDF-2"), extractor, "flat", CachedExtraction(b"x"))
+
+    pages = list(extraction.iter_pdf_pages(b"%PDF-2", "f.pdf", use_structure=False))
+
+    assert len(pages) == 2
+    assert len(fitz_opens) == 1
+    assert store.get(pdf_hash(b"%PDF-2"), extractor, "flat").offsets == [0, 9, 9, 23]
@@ -0,0 +1,24 @@
+from langchain_core.documents import Document
+
+from backend.src.retrieval.fusion import interleave_quotas, reciprocal_rank_fusion
+
+
+def _doc(point_id, score=0.5):
+    return Document(
+        page_content=point_id, metadata={"point_id": point_id, "score": score}
+    )
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion(
+        [[_doc("a"), _doc("b")], [_doc("b"), _doc("c")]], k=60
+    )
+
+    assert [d.page_content for d in fused] == ["b", "a", "c"]
+    assert fused[0].metadata["fused_score"] > fused[1].metadata["fused_score"]
+
+
+def test_interleave_quotas_backfills_from_longer_groups():
+    merged = interleave_quotas([[_doc("a")], [_doc("b"), _doc("c"), _doc("d")]], 3)
+
+    assert [d.page_content for d in merged] == ["a", "b", "c"]
@@ -0,0 +1,168 @@
+import pytest
+from langchain_core.documents import Document
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.src.db.models import Base, KnowledgeBase, KnowledgeBaseDocument
+from backend.src.knowledge.ingest_journal import (
+    DONE,
+    FAILED,
+    IngestJournal,
+    existing_document_ids,
+    insert_documents,
+    item_key,
+    plan_resume,
+    written_entry,
+)
+from backend.src.knowledge.ingest_pipeline import IngestItem, PreparedDocument
+
+
+@pytest.fixture
+def pdfs(tmp_path):
+    paths = []
+    for name in "abcd":
+        path = tmp_path / f"{name}.pdf"
+        path.write_bytes(name.encode() * 10)
+        paths.append(IngestItem("pdf", str(path)))
+    return paths
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = IngestJournal(tmp_path / "journal.sqlite", kb_id=1)
+    yield journal
+    journal.close()
+
+
+def _prepared(item, paper_id):
+    return PreparedDocument(item, paper_id, "T", item.value, [Document("x")], "hash")
+
+
+def test_default_path_sits_next_to_the_input(tmp_path):
+    manifest = tmp_path / "docs.csv"
+    manifest.write_text("path\n")
+
+    assert IngestJournal.default_path(manifest, 3) == (
+        tmp_path / "docs.csv.ingest-journal-kb3.sqlite"
+    )
+    assert IngestJournal.default_path(tmp_path, 3).parent == tmp_path
+
+
+def test_resume_skips_done_reconciles_written_and_clears_partial(journal, pdfs):
+    done, written, partial, fresh = pdfs
+    journal.record_prepared(done, "p-done", "h1")
+    journal.record_written([written_entry(_prepared(done, "p-done"), 3)])
+    journal.record_done([item_key(done)])
+    journal.record_prepared(written, "p-written", "h2")
+    journal.record_written([written_entry(_prepared(written, "p-written"), 5)])
+    journal.record_prepared(partial, "p-partial", "h3")
+
+    # Reopened after a crash: only p-done made it into the KB table.
+    reopened = IngestJournal(journal.path, kb_id=1)
+    plan = plan_resume(pdfs, reopened.entries(), {"p-done"})
+    reopened.close()
+
+    assert plan.todo == [partial, fresh]
+    assert plan.skipped == 2
+    assert [(e.paper_id, e.chunk_count) for e in plan.reconcile] == [("p-written", 5)]
+    assert plan.cleanup == ["p-partial"]
+
+
+def test_changed_files_and_failures_are_retried(journal, pdfs):
+    changed, failed = pdfs[:2]
+    journal.record_prepared(changed, "p-old", "h1")
+    journal.record_written([written_entry(_prepared(changed, "p-old"), 2)])
+    journal.record_done([item_key(changed)])
+    journal.record_failed(failed, RuntimeError("boom"))
+    with open(changed.value, "ab") as fh:
+        fh.write(b"new revision")
+
+    entries = journal.entries()
+    plan = plan_resume([changed, failed], entries, {"p-old"})
+
+    assert entries[item_key(changed)].status == DONE
+    assert entries[item_key(failed)].status == FAILED
+    assert plan.todo == [changed, failed]
+    assert plan.cleanup == []
+
+
+def test_failure_after_preparation_keeps_paper_id_for_cleanup(journal, pdfs):
+    item = pdfs[0]
+    journal.record_prepared(item, "p-partial", "h1")
+    journal.record_failed(item, RuntimeError("upsert timed out"))
+
+    entry = journal.entries()[item_key(item)]
+    plan = plan_resume([item], journal.entries(), set())
+
+    assert (entry.status, entry.paper_id, entry.content_hash) == (
+        FAILED,
+        "p-partial",
+        "h1",
+    )
+    assert entry.error == "upsert timed out"
+    assert plan.todo == [item]
+    assert plan.cleanup == ["p-partial"]
+
+
+def test_repeated_items_are_planned_once(journal, pdfs):
+    item = pdfs[0]
+    journal.record_prepared(item, "p-partial", "h1")
+
+    plan = plan_resume([item, pdfs[1], item], journal.entries(), set())
+
+    assert plan.todo == [item, pdfs[1]]
+    assert plan.skipped == 1
+    assert plan.cleanup == ["p-partial"]
+
+
+def test_arxiv_items_already_in_the_kb_are_skipped_without_journal(journal):
+    items = [IngestItem("arxiv", "arXiv:1706.03762"), IngestItem("arxiv", "2101.1")]
+
+    plan = plan_resume(items, journal.entries(), {"1706.03762"})
+
+    assert plan.todo == [items[1]]
+    assert plan.skipped == 1
+
+
+def test_existing_document_ids_are_scoped_to_the_kb():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add_all(
+        [
+            KnowledgeBase(id=1, name="a", domain="ml"),
+            KnowledgeBase(id=2, name="b", domain="ml"),
+        ]
+    )
+    db.add_all(
+        KnowledgeBaseDocument(kb_id=kb, document_id=doc, title=doc, source="s")
+        for kb, doc in [(1, "x"), (1, "y"), (2, "z")]
+    )
+    db.commit()
+
+    assert existing_document_ids(db, 1) == {"x", "y"}
+    db.close()
+
+
+def test_insert_documents_writes_all_rows_or_none():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add(KnowledgeBase(id=1, name="a", domain="ml"))
+    db.commit()
+    entries = [
+        written_entry(_prepared(IngestItem("arxiv", f"x{i}"), f"p{i}"), i)
+        for i in range(3)
+    ]
+
+    insert_documents(db, 1, entries)
+    assert existing_document_ids(db, 1) == {"p0", "p1", "p2"}
+
+    broken = written_entry(_prepared(IngestItem("arxiv", "y"), "p-bad"), 1)
+    broken.source = None  # violates NOT NULL
+    with pytest.raises(Exception):
+        insert_documents(
+            db, 1, [written_entry(_prepared(IngestItem("arxiv", "z"), "p3"), 1), broken]
+        )
+    assert existing_document_ids(db, 1) == {"p0", "p1", "p2"}
+    db.close()
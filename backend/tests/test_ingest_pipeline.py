@@ -0,0 +1,174 @@
+import threading
+import time
+
+from langchain_core.documents import Document
+
+from backend.src.knowledge.ingest_pipeline import (
+    IngestItem,
+    IngestPipeline,
+    PreparedDocument,
+)
+from backend.src.retrieval.qdrant_store import DocumentPoints
+
+
+class FakeStore:
+    def __init__(self, fail_paper=None, embed_delay=0.0):
+        self.fail_paper = fail_paper
+        self.embed_delay = embed_delay
+        self.writes = []
+        self.deleted = []
+        self.lock = threading.Lock()
+
+    def prepare_points(self, chunks, user_id, paper_id, paper_title, source, **kw):
+        time.sleep(self.embed_delay)
+        if paper_id == self.fail_paper:
+            raise RuntimeError("embedding failed")
+        return DocumentPoints(
+            user_id=user_id,
+            kb_id=kw["kb_id"],
+            paper_id=paper_id,
+            chunk_points=[f"{paper_id}-{i}" for i in range(len(chunks))],
+            paper_point=paper_id,
+        )
+
+    def write_points(self, documents):
+        with self.lock:
+            self.writes.append([doc.paper_id for doc in documents])
+
+    def delete_kb_documents(self, kb_id, paper_ids):
+        self.deleted.append((kb_id, sorted(paper_ids)))
+
+
+def prepare(item):
+    count = int(item.value.split(":")[1])
+    chunks = [Document(page_content=f"chunk {i}") for i in range(count)]
+    return PreparedDocument(item, item.value, item.value.upper(), "src", chunks)
+
+
+def _pipeline(store, on_flushed=None, **kwargs):
+    written, failed = [], []
+
+    def record(batch):
+        if on_flushed is not None:
+            on_flushed(batch)
+        written.extend((doc.paper_id, count) for doc, count in batch)
+
+    pipeline = IngestPipeline(
+        store,
+        kb_id=3,
+        prepare=prepare,
+        use_processes=False,
+        on_flushed=record,
+        on_failed=lambda item, exc: failed.append(item.value),
+        **kwargs,
+    )
+    return pipeline, written, failed
+
+
+def test_all_documents_flow_through_every_stage():
+    store = FakeStore()
+    pipeline, written, failed = _pipeline(
+        store, extract_workers=2, embed_workers=3, upsert_batch=5, queue_size=2
+    )
+    items = [IngestItem("pdf", f"p{i}:{i % 3 + 1}") for i in range(12)]
+
+    stats = pipeline.run(items)
+
+    assert failed == []
+    assert sorted(written) == sorted((i.value, int(i.value[-1])) for i in items)
+    assert stats.written.docs == 12
+    assert stats.written.chunks == sum(i % 3 + 1 for i in range(12))
+    # Points are upserted in batches spanning several documents.
+    assert len(store.writes) < 12
+    assert sorted(p for batch in store.writes for p in batch) == sorted(
+        i.value for i in items
+    )
+
+
+def test_skips_and_failures_do_not_stop_the_pipeline():
+    store = FakeStore(fail_paper="bad:2")
+    pipeline, written, failed = _pipeline(
+        store,
+        skip=lambda item: item.value.startswith("old"),
+        exists=lambda paper_id: paper_id == "dup:1",
+    )
+    items = [
+        IngestItem("pdf", value)
+        for value in ["a:1", "old:1", "dup:1", "bad:2", "empty:0", "b:2"]
+    ]
+
+    stats = pipeline.run(items)
+
+    assert sorted(paper for paper, _ in written) == ["a:1", "b:2"]
+    assert failed == ["bad:2"]
+    assert stats.prepared.skipped == 1
+    assert stats.embedded.skipped == 2
+    assert stats.embedded.failed == 1
+
+
+def test_documents_sharing_a_paper_id_are_embedded_once():
+    store = FakeStore(embed_delay=0.01)
+    written = []
+    pipeline = IngestPipeline(
+        store,
+        kb_id=3,
+        # "a:2" and "a#copy:2" stand for one PDF under two paths.
+        prepare=lambda item: PreparedDocument(
+            item, item.value.split("#")[0].split(":")[0], "T", "src", [Document("x")]
+        ),
+        use_processes=False,
+        embed_workers=4,
+        exists=lambda paper_id: False,
+        on_flushed=lambda batch: written.extend(doc.paper_id for doc, _ in batch),
+    )
+    items = [IngestItem("pdf", v) for v in ("a:1", "a#copy:1", "b:1", "a#2:1")]
+
+    stats = pipeline.run(items)
+
+    assert sorted(written) == ["a", "b"]
+    assert stats.embedded.skipped == 2
+
+
+def test_flush_docs_bounds_each_batch():
+    store = FakeStore()
+    pipeline, written, _ = _pipeline(
+        store, upsert_batch=1000, flush_docs=3, flush_seconds=60
+    )
+    items = [IngestItem("pdf", f"p{i}:1") for i in range(7)]
+
+    pipeline.run(items)
+
+    assert len(written) == 7
+    assert [len(batch) for batch in store.writes][:2] == [3, 3]
+    assert sum(len(batch) for batch in store.writes) == 7
+
+
+def test_failed_bookkeeping_rolls_back_the_whole_batch():
+    store = FakeStore()
+
+    def record(batch):
+        raise RuntimeError("db down")
+
+    pipeline, written, failed = _pipeline(
+        store, on_flushed=record, upsert_batch=1000, flush_docs=2, flush_seconds=60
+    )
+    items = [IngestItem("pdf", value) for value in ["a:1", "b:2"]]
+
+    stats = pipeline.run(items)
+
+    assert written == []
+    assert sorted(failed) == ["a:1", "b:2"]
+    assert store.deleted == [(3, ["a:1", "b:2"])]
+    assert stats.written.docs == 0
+    assert stats.written.failed == 2
+
+
+def test_bottleneck_follows_the_full_queue():
+    pipeline, _, _ = _pipeline(FakeStore(), queue_size=2)
+    assert pipeline.bottleneck() == "prepare"
+    pipeline._prepared.put(object())
+    pipeline._prepared.put(object())
+    assert pipeline.bottleneck() == "embed"
+    pipeline._embedded.put(object())
+    pipeline._embedded.put(object())
+    assert pipeline.bottleneck() == "write"
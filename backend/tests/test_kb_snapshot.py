@@ -0,0 +1,154 @@
+import dataclasses
+
+import pytest
+from langchain_core.documents import Document
+from qdrant_client.http.models import FieldCondition, Filter, MatchValue
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.config.vector_backend_config import VectorBackendConfig
+from backend.src.db.models import Base, KnowledgeBase, KnowledgeBaseDocument
+from backend.src.knowledge import snapshot
+from backend.src.retrieval import qdrant_setup
+from backend.src.retrieval import qdrant_store as qdrant_store_module
+from backend.src.retrieval.embedded_backend import EmbeddedVectorBackend
+from backend.src.retrieval.result_cache import SearchResultCache
+
+pytest.importorskip("pyarrow")
+
+DIM = 4
+
+
+class FakeEmbedder:
+    def embed_documents(self, texts):
+        return [[1.0, float(i), 0.5, 0.0] for i in range(len(texts))]
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def config(monkeypatch):
+    config = dataclasses.replace(
+        qdrant_setup.get_qdrant_config(), collection_name="chunks", vector_size=DIM
+    )
+    monkeypatch.setattr(qdrant_setup, "get_qdrant_config", lambda: config)
+    return config
+
+
+def _backend(path):
+    backend = EmbeddedVectorBackend(
+        VectorBackendConfig(backend="embedded", embedded_path=str(path))
+    )
+    qdrant_setup.init_qdrant_collection(backend)
+    return backend
+
+
+def test_export_then_import_into_another_environment(tmp_path, db, config, monkeypatch):
+    monkeypatch.setattr(qdrant_store_module, "get_embedder", FakeEmbedder)
+    source = _backend(tmp_path / "source")
+    kb = KnowledgeBase(name="NLP", domain="NLP", is_system=True, max_k=6)
+    db.add(kb)
+    db.commit()
+    store = qdrant_store_module.QdrantStore(
+        client=source, collection_name="chunks", result_cache=SearchResultCache(0)
+    )
+    chunks = [
+        Document(page_content=f"chunk {i}", metadata={"Title": "T", "page_number": p})
+        for i, p in enumerate([1, "ii"])
+    ]
+    store.add_documents(chunks, user_id=0, paper_id="p1", paper_title="T", kb_id=kb.id)
+    db.add(
+        KnowledgeBaseDocument(
+            kb_id=kb.id, document_id="p1", title="T", source="arxiv:p1", chunk_count=2
+        )
+    )
+    db.commit()
+
+    manifest = snapshot.export_kb(db, source, kb.id, tmp_path / "bundle", config=config)
+
+    assert (manifest["chunks"], manifest["papers"]) == (2, 1)
+    assert (tmp_path / "bundle" / "chunks.f32").stat().st_size == 2 * DIM * 4
+
+    target = _backend(tmp_path / "target")
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    other_db = sessionmaker(bind=engine)()
+    other_db.add(KnowledgeBase(name="other", domain="CV", is_system=True))
+    other_db.commit()
+
+    imported = snapshot.import_kb(other_db, target, tmp_path / "bundle", config=config)
+    # Importing twice is idempotent.
+    snapshot.import_kb(other_db, target, tmp_path / "bundle", config=config)
+
+    assert (imported.id, imported.name) == (2, "NLP")
+    assert imported.max_k == 6
+    kb_filter = Filter(
+        must=[FieldCondition(key="kb_id", match=MatchValue(value=imported.id))]
+    )
+    points, _ = target.scroll(
+        "chunks", scroll_filter=kb_filter, limit=10, with_vectors=True
+    )
+    assert sorted(p.payload["page_content"] for p in points) == ["chunk 0", "chunk 1"]
+    assert {p.payload["page_number"] for p in points} == {1, "ii"}
+    assert all(p.payload["user_id"] == 0 for p in points)
+    papers, _ = target.scroll("chunks_papers", scroll_filter=kb_filter, limit=10)
+    assert [p.payload["paper_id"] for p in papers] == ["p1"]
+    docs = other_db.query(KnowledgeBaseDocument).filter_by(kb_id=imported.id).all()
+    assert [(d.document_id, d.chunk_count) for d in docs] == [("p1", 2)]
+    other_db.close()
+
+
+def test_import_for_an_owner_keeps_points_out_of_personal_papers(
+    tmp_path, db, config, monkeypatch
+):
+    monkeypatch.setattr(qdrant_store_module, "get_embedder", FakeEmbedder)
+    source = _backend(tmp_path / "source")
+    kb = KnowledgeBase(name="Mine", domain="NLP", is_system=False)
+    db.add(kb)
+    db.commit()
+    qdrant_store_module.QdrantStore(
+        client=source, collection_name="chunks", result_cache=SearchResultCache(0)
+    ).add_documents(
+        [Document(page_content="chunk", metadata={"Title": "T"})],
+        user_id=0,
+        paper_id="p1",
+        paper_title="T",
+        kb_id=kb.id,
+    )
+    snapshot.export_kb(db, source, kb.id, tmp_path / "bundle", config=config)
+    target = _backend(tmp_path / "target")
+
+    imported = snapshot.import_kb(
+        db, target, tmp_path / "bundle", owner_id=7, config=config
+    )
+
+    assert (imported.owner_id, imported.is_system) == (7, False)
+    points, _ = target.scroll("chunks", limit=10)
+    papers, _ = target.scroll("chunks_papers", limit=10)
+    assert {p.payload["user_id"] for p in points + papers} == {0}
+    store = qdrant_store_module.QdrantStore(
+        client=target, collection_name="chunks", result_cache=SearchResultCache(0)
+    )
+    assert store.get_user_papers(7) == []
+
+
+def test_import_rejects_other_embedding_model(tmp_path, db, config):
+    kb = KnowledgeBase(name="NLP", domain="NLP", is_system=True)
+    db.add(kb)
+    db.commit()
+    backend = _backend(tmp_path / "vectors")
+    snapshot.export_kb(db, backend, kb.id, tmp_path / "bundle", config=config)
+    manifest_path = tmp_path / "bundle" / "manifest.json"
+    manifest_path.write_text(
+        manifest_path.read_text().replace(snapshot.EMBEDDING_MODEL, "other/model")
+    )
+
+    with pytest.raises(snapshot.SnapshotError):
+        snapshot.import_kb(db, backend, tmp_path / "bundle", config=config)
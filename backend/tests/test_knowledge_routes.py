@@ -0,0 +1,55 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.src.db.models import Base, KnowledgeBase, KnowledgeBaseDocument
+from backend.src.knowledge import routes
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _add_kb(db, name, docs):
+    kb = KnowledgeBase(name=name, domain="ML", is_system=True)
+    db.add(kb)
+    db.flush()
+    for i in range(docs):
+        db.add(
+            KnowledgeBaseDocument(
+                kb_id=kb.id,
+                document_id=f"{name}-{i}",
+                title=f"Doc {i}",
+                source="src",
+                chunk_count=i + 1,
+            )
+        )
+    db.commit()
+    return kb
+
+
+def test_list_kb_documents_paginates_with_cursor(db):
+    kb = _add_kb(db, "a", 5)
+
+    first, cursor = routes._list_kb_documents(db, kb.id, limit=2)
+    second, cursor2 = routes._list_kb_documents(db, kb.id, cursor=cursor, limit=2)
+    third, cursor3 = routes._list_kb_documents(db, kb.id, cursor=cursor2, limit=2)
+
+    assert [d.id for d in first] == ["a-0", "a-1"]
+    assert [d.id for d in second] == ["a-2", "a-3"]
+    assert [d.id for d in third] == ["a-4"]
+    assert cursor3 is None
+    assert third[0].chunk_count == 5
+
+
+def test_count_kb_documents_is_scoped_to_kb(db):
+    kb_a = _add_kb(db, "a", 3)
+    kb_b = _add_kb(db, "b", 1)
+
+    assert routes._count_kb_documents(db, kb_a.id) == 3
+    assert routes._count_kb_documents(db, kb_b.id) == 1
@@ -0,0 +1,45 @@
+import dataclasses
+
+from backend.src.retrieval import qdrant_setup
+
+
+def test_get_qdrant_client_is_shared_per_process(monkeypatch):
+    created = []
+    monkeypatch.setattr(qdrant_setup, "_client", None)
+    monkeypatch.setattr(
+        qdrant_setup,
+        "create_qdrant_client",
+        lambda config: created.append(config) or object(),
+    )
+
+    first = qdrant_setup.get_qdrant_client()
+    second = qdrant_setup.get_qdrant_client()
+
+    assert first is second
+    assert len(created) == 1
+
+
+def test_get_qdrant_client_rebuilds_after_fork(monkeypatch):
+    monkeypatch.setattr(qdrant_setup, "create_qdrant_client", lambda config: object())
+    monkeypatch.setattr(qdrant_setup, "_client", None)
+    parent = qdrant_setup.get_qdrant_client()
+
+    monkeypatch.setattr(qdrant_setup, "_client_pid", -1)
+
+    assert qdrant_setup.get_qdrant_client() is not parent
+
+
+def test_create_qdrant_client_uses_grpc_when_preferred(monkeypatch):
+    captured = {}
+    monkeypatch.setattr(
+        qdrant_setup, "QdrantClient", lambda **kwargs: captured.update(kwargs)
+    )
+    grpc_config = dataclasses.replace(
+        qdrant_setup.get_qdrant_config(), prefer_grpc=True
+    )
+
+    qdrant_setup.create_qdrant_client(grpc_config)
+
+    assert captured["prefer_grpc"] is True
+    assert captured["grpc_port"] == grpc_config.grpc_port
+    assert "grpc.keepalive_time_ms" in captured["grpc_options"]
@@ -0,0 +1,310 @@
+import itertools
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.documents import Document
+
+from backend.src.retrieval import qdrant_store as qdrant_store_module
+from backend.src.retrieval.adaptive_k import AdaptiveK
+from backend.src.retrieval.result_cache import SearchResultCache
+
+_ids = itertools.count()
+
+
+class FakeEmbedder:
+    def __init__(self):
+        self.document_calls = []
+        self.query_calls = []
+
+    def embed_documents(self, texts):
+        self.document_calls.append(list(texts))
+        return [[float(i), 1.0] for i in range(len(texts))]
+
+    def embed_query(self, text):
+        self.query_calls.append(text)
+        return [0.5, 0.5]
+
+
+class FakeClient:
+    def __init__(self, paper_hits=None, chunk_hits=None, scroll_points=None):
+        self.scroll_points = scroll_points or []
+        self.batch_hits = {}
+        self.scrolls = []
+        self.upserts = []
+        self.queries = []
+        self.deletes = []
+        self.paper_hits = paper_hits or []
+        self.chunk_hits = chunk_hits or []
+
+    def upsert(self, collection_name, points):
+        self.upserts.append((collection_name, points))
+
+    def query_points(self, collection_name, **kwargs):
+        self.queries.append((collection_name, kwargs))
+        hits = self.paper_hits if collection_name.endswith("_papers") else None
+        return SimpleNamespace(points=hits if hits is not None else self.chunk_hits)
+
+    def query_batch_points(self, collection_name, requests):
+        self.queries.append((collection_name, {"requests": requests}))
+        return [
+            SimpleNamespace(points=self.batch_hits[req.filter.must[0].match.any[0]])
+            for req in requests
+        ]
+
+    def scroll(self, collection_name, **kwargs):
+        self.scrolls.append(kwargs)
+        return self.scroll_points, None
+
+    def delete(self, collection_name, points_selector):
+        self.deletes.append(collection_name)
+
+
+def _point(payload, score=0.9):
+    return SimpleNamespace(id=next(_ids), payload=payload, score=score)
+
+
+@pytest.fixture
+def embedder(monkeypatch):
+    fake = FakeEmbedder()
+    monkeypatch.setattr(qdrant_store_module, "get_embedder", lambda: fake)
+    return fake
+
+
+def _store(client, max_cache_bytes=0):
+    return qdrant_store_module.QdrantStore(
+        client=client,
+        collection_name="chunks",
+        result_cache=SearchResultCache(max_bytes=max_cache_bytes),
+    )
+
+
+def _chunks():
+    meta = {"Title": "Paper", "Summary": "An abstract."}
+    return [
+        Document(page_content="first chunk", metadata=dict(meta)),
+        Document(page_content="second chunk", metadata=dict(meta)),
+    ]
+
+
+def test_add_documents_embeds_paper_vector_in_same_call(embedder):
+    client = FakeClient()
+    store = _store(client)
+
+    count = store.add_documents(
+        _chunks(), user_id=0, paper_id="p1", paper_title="T", kb_id=3
+    )
+
+    assert count == 2
+    assert len(embedder.document_calls) == 1
+    assert embedder.document_calls[0][-1] == "T\n\nAn abstract."
+    collections = [name for name, _ in client.upserts]
+    assert collections == ["chunks", "chunks_papers"]
+    paper_point = client.upserts[1][1][0]
+    assert paper_point.payload["kb_id"] == 3
+    assert paper_point.id == store.paper_point_id("p1", 0, 3)
+
+
+def test_add_document_stream_upserts_in_batches_then_the_paper(embedder):
+    client = FakeClient()
+    store = _store(client)
+    chunks = (
+        Document(page_content=f"chunk {i}", metadata={"Title": "Paper"})
+        for i in range(5)
+    )
+
+    count = store.add_document_stream(
+        chunks, user_id=0, paper_id="p1", paper_title="T", kb_id=3, batch_size=2
+    )
+
+    assert count == 5
+    assert [name for name, _ in client.upserts] == ["chunks"] * 3 + ["chunks_papers"]
+    seqs = [p.payload["chunk_seq"] for _, points in client.upserts[:3] for p in points]
+    assert seqs == [0, 1, 2, 3, 4]
+    assert client.upserts[-1][1][0].payload["chunk_count"] == 5
+
+
+def test_add_document_stream_removes_partial_points_on_failure(embedder):
+    client = FakeClient()
+    store = _store(client)
+
+    def chunks():
+        yield Document(page_content="chunk 0")
+        yield Document(page_content="chunk 1")
+        raise ValueError("corrupt page")
+
+    with pytest.raises(ValueError):
+        store.add_document_stream(
+            chunks(), user_id=0, paper_id="p1", paper_title="T", kb_id=3, batch_size=1
+        )
+
+    assert client.deletes == ["chunks", "chunks_papers"]
+
+
+def test_two_stage_search_restricts_chunks_to_top_papers(embedder):
+    client = FakeClient(
+        paper_hits=[_point({"paper_id": "p2"}), _point({"paper_id": "p1"})],
+        chunk_hits=[_point({"page_content": "text", "paper_id": "p2"})],
+    )
+    store = _store(client)
+
+    docs = store.search("q", kb_ids=[1], two_stage=True, paper_limit=2)
+
+    assert [d.metadata["paper_id"] for d in docs] == ["p2"]
+    assert [name for name, _ in client.queries] == ["chunks_papers", "chunks"]
+    chunk_filter = client.queries[1][1]["query_filter"]
+    paper_condition = chunk_filter.must[-1]
+    assert paper_condition.key == "paper_id"
+    assert paper_condition.match.any == ["p2", "p1"]
+
+
+def test_two_stage_search_falls_back_to_flat_without_paper_hits(embedder):
+    client = FakeClient(paper_hits=[], chunk_hits=[_point({"page_content": "x"})])
+    store = _store(client)
+
+    docs = store.search("q", kb_ids=[1], two_stage=True)
+
+    assert len(docs) == 1
+    chunk_filter = client.queries[1][1]["query_filter"]
+    assert [c.key for c in chunk_filter.must] == ["kb_id"]
+
+
+def test_delete_kb_removes_paper_vectors(embedder):
+    client = FakeClient()
+
+    _store(client).delete_kb(7)
+
+    assert client.deletes == ["chunks", "chunks_papers"]
+
+
+def test_search_with_neighbor_window_fetches_neighbors_in_one_scroll(embedder):
+    def payload(seq, text):
+        return {"paper_id": "p1", "kb_id": 1, "chunk_seq": seq, "page_content": text}
+
+    client = FakeClient(
+        chunk_hits=[_point(payload(3, "three"))],
+        scroll_points=[
+            SimpleNamespace(id=next(_ids), payload=payload(2, "two")),
+            SimpleNamespace(id=next(_ids), payload=payload(4, "four")),
+        ],
+    )
+
+    docs = _store(client).search("q", kb_ids=[1], neighbor_window=1)
+
+    assert len(client.scrolls) == 1
+    assert client.scrolls[0]["limit"] == 3
+    assert len(docs) == 1
+    assert docs[0].page_content == "two\nthree\nfour"
+    assert docs[0].metadata["chunk_span"] == [2, 4]
+
+
+def test_search_many_uses_one_embedding_call_and_one_batch_request(embedder):
+    client = FakeClient()
+    client.batch_hits = {
+        1: [_point({"page_content": "kb1-a", "kb_id": 1}, 0.9)],
+        2: [
+            _point({"page_content": "kb2-a", "kb_id": 2}, 0.8),
+            _point({"page_content": "kb2-b", "kb_id": 2}, 0.7),
+        ],
+    }
+    embedder.embed_queries = lambda texts: [[1.0, 0.0] for _ in texts]
+    store = _store(client)
+
+    docs = store.search_many(["q1", "q2"], kb_ids=[1, 2], limit=2, per_kb_quota=True)
+
+    assert embedder.query_calls == []
+    assert len(client.queries) == 1
+    assert len(client.queries[0][1]["requests"]) == 4
+    assert sorted(d.page_content for d in docs) == ["kb1-a", "kb2-a"]
+
+
+def test_search_many_cuts_each_kb_on_its_own_score_scale(embedder):
+    client = FakeClient()
+    client.batch_hits = {
+        1: [
+            _point({"page_content": f"kb1-{s}", "kb_id": 1}, s)
+            for s in (0.90, 0.88, 0.50)
+        ],
+        2: [
+            _point({"page_content": f"kb2-{s}", "kb_id": 2}, s)
+            for s in (0.30, 0.29, 0.10)
+        ],
+    }
+    embedder.embed_queries = lambda texts: [[1.0, 0.0] for _ in texts]
+    policy = AdaptiveK(min_k=1, max_k=8, score_threshold=None)
+
+    docs = _store(client).search_many(
+        ["q"], kb_ids=[1, 2], per_kb_quota=True, adaptive=policy
+    )
+
+    assert [d.page_content for d in docs] == [
+        "kb1-0.9",
+        "kb2-0.3",
+        "kb1-0.88",
+        "kb2-0.29",
+    ]
+    assert {d.metadata["retrieval_k"] for d in docs} == {4}
+
+
+def test_search_results_are_cached_until_the_kb_changes(embedder):
+    client = FakeClient(chunk_hits=[_point({"page_content": "hit", "kb_id": 1})])
+    store = _store(client, max_cache_bytes=1 << 20)
+
+    first = store.search("what  is attention", kb_ids=[1, 2], limit=3)
+    first[0].metadata["kb_id"] = "mutated"
+    second = store.search(" what is attention ", kb_ids=[2, 1], limit=3)
+
+    assert len(client.queries) == 1
+    assert len(embedder.query_calls) == 1
+    assert second[0].metadata["kb_id"] == 1
+
+    store.search("what is attention", kb_ids=[1, 2], limit=4)
+    store.search("what is attention", kb_ids=[1], limit=3)
+    assert len(client.queries) == 3
+
+    store.add_documents(_chunks(), user_id=9, paper_id="p", paper_title="P", kb_id=2)
+    store.search("what is attention", kb_ids=[1, 2], limit=3)
+    store.search("what is attention", kb_ids=[1], limit=3)
+    assert len(client.queries) == 4
+
+    store.delete_kb(1)
+    store.search("what is attention", kb_ids=[1], limit=3)
+    assert len(client.queries) == 5
+
+
+def test_injected_empty_cache_is_not_replaced_by_the_shared_one(embedder):
+    cache = SearchResultCache(max_bytes=0)
+
+    store = qdrant_store_module.QdrantStore(
+        client=FakeClient(), collection_name="chunks", result_cache=cache
+    )
+
+    assert store.result_cache is cache
+
+
+def test_user_scoped_cache_entries_follow_user_writes(embedder):
+    client = FakeClient(chunk_hits=[_point({"page_content": "hit", "user_id": 3})])
+    store = _store(client, max_cache_bytes=1 << 20)
+
+    store.search("q", user_id=3)
+    store.search("q", user_id=4)
+    store.delete_user_paper(3, "p")
+    store.search("q", user_id=3)
+    store.search("q", user_id=4)
+
+    assert len(client.queries) == 3
+
+
+def test_adaptive_search_over_fetches_and_pushes_threshold_down(embedder):
+    scores = [0.81, 0.80, 0.52, 0.51]
+    client = FakeClient(
+        chunk_hits=[_point({"page_content": str(s)}, score=s) for s in scores]
+    )
+    policy = AdaptiveK(min_k=1, max_k=8, score_threshold=0.3)
+
+    docs = _store(client).search("q", user_id=1, limit=5, adaptive=policy)
+
+    _, kwargs = client.queries[0]
+    assert kwargs["limit"] == 8
+    assert kwargs["score_threshold"] == 0.3
+    assert [d.metadata["score"] for d in docs] == [0.81, 0.80]
+    assert docs[0].metadata["retrieval_k"] == 2
@@ -0,0 +1,207 @@
+import dataclasses
+
+import pytest
+from langchain_core.documents import Document
+from qdrant_client.http.models import Distance, PointStruct, VectorParams
+
+from backend.config.vector_backend_config import VectorBackendConfig
+from backend.src.retrieval import qdrant_setup
+from backend.src.retrieval import qdrant_store as qdrant_store_module
+from backend.src.retrieval.embedded_backend import EmbeddedVectorBackend
+from backend.src.retrieval.reembed import (
+    chunk_text_from_payload,
+    reembed_collections,
+    replace_legacy_collections,
+)
+from backend.src.retrieval.result_cache import SearchResultCache
+
+
+class SizedEmbedder:
+    """Embeds by keyword, padded to the given size; records what it saw."""
+
+    def __init__(self, size):
+        self.size = size
+        self.texts = []
+
+    def _embed(self, text):
+        vector = [1.0 if "attention" in text else 0.0, 1.0]
+        return vector + [0.0] * (self.size - len(vector))
+
+    def embed_documents(self, texts):
+        self.texts.extend(texts)
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+@pytest.fixture
+def config(monkeypatch):
+    config = dataclasses.replace(
+        qdrant_setup.get_qdrant_config(),
+        collection_name="chunks",
+        papers_collection_name="",
+        vector_size=4,
+        collection_version=1,
+    )
+    monkeypatch.setattr(qdrant_setup, "get_qdrant_config", lambda: config)
+    return config
+
+
+@pytest.fixture
+def backend(tmp_path):
+    embedded = EmbeddedVectorBackend(
+        VectorBackendConfig(backend="embedded", embedded_path=str(tmp_path))
+    )
+    yield embedded
+    embedded.close()
+
+
+def _store(backend, monkeypatch, embedder):
+    monkeypatch.setattr(qdrant_store_module, "get_embedder", lambda: embedder)
+    return qdrant_store_module.QdrantStore(
+        client=backend, collection_name="chunks", result_cache=SearchResultCache(0)
+    )
+
+
+def test_init_creates_versioned_collections_behind_aliases(backend, config):
+    qdrant_setup.init_qdrant_collection(backend)
+
+    assert qdrant_setup.resolve_alias(backend, "chunks") == "chunks_v1"
+    assert qdrant_setup.resolve_alias(backend, "chunks_papers") == "chunks_papers_v1"
+
+
+def test_init_keeps_collection_with_mismatched_vector_size(
+    backend, config, monkeypatch
+):
+    qdrant_setup.init_qdrant_collection(backend)
+    mismatched = dataclasses.replace(config, vector_size=8)
+    monkeypatch.setattr(qdrant_setup, "get_qdrant_config", lambda: mismatched)
+
+    qdrant_setup.init_qdrant_collection(backend)
+
+    assert qdrant_setup.resolve_alias(backend, "chunks") == "chunks_v1"
+    assert qdrant_setup._vector_size(backend, "chunks_v1") == 4
+
+
+def test_recreate_keeps_the_alias_on_a_fresh_collection(backend, config, monkeypatch):
+    qdrant_setup.init_qdrant_collection(backend)
+    store = _store(backend, monkeypatch, SizedEmbedder(4))
+    store.add_documents(
+        [Document(page_content="attention", metadata={"Title": "T"})],
+        user_id=1,
+        paper_id="p1",
+        paper_title="Paper",
+        kb_id=3,
+    )
+
+    qdrant_setup.init_qdrant_collection(backend, recreate=True)
+
+    assert qdrant_setup.resolve_alias(backend, "chunks") == "chunks_v1"
+    assert qdrant_setup.resolve_alias(backend, "chunks_papers") == "chunks_papers_v1"
+    assert backend.count(collection_name="chunks", exact=True).count == 0
+
+
+def test_recreate_replaces_other_versions_and_legacy_collections(backend, config):
+    qdrant_setup.init_qdrant_collection(backend)
+    backend.create_collection(
+        "chunks_v0", vectors_config=VectorParams(size=4, distance=Distance.COSINE)
+    )
+    qdrant_setup.swap_alias(backend, "chunks", "chunks_v0")
+    backend.delete_collection("chunks_papers_v1")
+    backend.create_collection(
+        "chunks_papers",
+        vectors_config=VectorParams(size=4, distance=Distance.COSINE),
+    )
+
+    qdrant_setup.init_qdrant_collection(backend, recreate=True)
+
+    assert qdrant_setup.resolve_alias(backend, "chunks") == "chunks_v1"
+    assert qdrant_setup.resolve_alias(backend, "chunks_papers") == "chunks_papers_v1"
+    assert not backend.collection_exists("chunks_v0")
+
+
+def test_reembed_swap_and_rollback(backend, config, monkeypatch):
+    qdrant_setup.init_qdrant_collection(backend)
+    old_store = _store(backend, monkeypatch, SizedEmbedder(4))
+    old_store.add_documents(
+        [
+            Document(page_content="intro", metadata={"Title": "T", "Summary": "S"}),
+            Document(page_content="attention", metadata={"Title": "T"}),
+        ],
+        user_id=1,
+        paper_id="p1",
+        paper_title="Paper",
+        kb_id=3,
+    )
+    new_embedder = SizedEmbedder(6)
+    progress = []
+
+    swaps = reembed_collections(
+        backend, config, new_embedder, 2, batch_size=1, on_progress=progress.append
+    )
+
+    assert swaps == {
+        "chunks": ("chunks_v1", "chunks_v2"),
+        "chunks_papers": ("chunks_papers_v1", "chunks_papers_v2"),
+    }
+    assert [p.done for p in progress] == [1, 2, 1]
+    assert progress[1].total == 2
+    assert "Title: T" in new_embedder.texts[0]
+    assert new_embedder.texts[-1] == "Paper\n\nS"
+    # Still serving v1 until the swap.
+    assert qdrant_setup.resolve_alias(backend, "chunks") == "chunks_v1"
+
+    previous = qdrant_setup.swap_aliases(
+        backend, {alias: target for alias, (_, target) in swaps.items()}
+    )
+
+    new_store = _store(backend, monkeypatch, new_embedder)
+    hits = new_store.search("attention", kb_ids=[3], limit=1)
+    assert hits[0].page_content == "attention"
+    assert qdrant_setup._vector_size(backend, "chunks_v2") == 6
+
+    qdrant_setup.swap_aliases(backend, previous)
+
+    assert qdrant_setup.resolve_alias(backend, "chunks") == "chunks_v1"
+    assert old_store.search("attention", kb_ids=[3], limit=1)
+
+
+def test_legacy_collection_is_kept_until_the_new_version_is_complete(backend):
+    for name in ("chunks", "chunks_v2"):
+        backend.create_collection(
+            name, vectors_config=VectorParams(size=4, distance=Distance.COSINE)
+        )
+    point = PointStruct(id=1, vector=[1.0, 0.0, 0.0, 0.0], payload={"kb_id": 3})
+    backend.upsert(collection_name="chunks", points=[point])
+
+    with pytest.raises(ValueError):
+        replace_legacy_collections(backend, {"chunks": "chunks_v2"}, ["chunks"])
+    assert backend.count(collection_name="chunks", exact=True).count == 1
+    assert qdrant_setup.resolve_alias(backend, "chunks") is None
+
+    backend.upsert(collection_name="chunks_v2", points=[point])
+    replace_legacy_collections(backend, {"chunks": "chunks_v2"}, ["chunks"])
+
+    assert qdrant_setup.resolve_alias(backend, "chunks") == "chunks_v2"
+    assert backend.count(collection_name="chunks", exact=True).count == 1
+
+
+def test_chunk_text_from_payload_matches_ingestion_text():
+    payload = {
+        "page_content": "body",
+        "title": "T",
+        "authors": "A",
+        "summary": "S",
+        "domain": "NLP",
+        "section_title": "Intro",
+    }
+
+    assert chunk_text_from_payload(payload) == (
+        qdrant_store_module.QdrantStore.chunk_embedding_text(
+            "body",
+            {"title": "T", "authors": "A", "summary": "S"},
+            domain="NLP",
+            section="Intro",
+        )
+    )
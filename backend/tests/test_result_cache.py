@@ -0,0 +1,61 @@
+from langchain_core.documents import Document
+
+from backend.src.retrieval.result_cache import SearchResultCache
+
+
+def _docs(text, n=1):
+    return [Document(page_content=text, metadata={"chunk_span": [0, 2]})] * n
+
+
+def test_generation_bump_only_invalidates_that_scope():
+    cache = SearchResultCache(max_bytes=1 << 20)
+    kb_key = cache.make_key("q", kb_ids=[1, 2], user_id=None)
+    user_key = cache.make_key("q", kb_ids=None, user_id=7)
+    cache.put(kb_key, _docs("kb"))
+    cache.put(user_key, _docs("user"))
+
+    cache.bump_kb(3)
+    cache.bump_user(8)
+
+    assert cache.make_key("q", kb_ids=[2, 1], user_id=None) == kb_key
+    assert cache.get(user_key)[0].metadata == {"chunk_span": [0, 2]}
+
+    cache.bump_kb(2)
+
+    assert cache.make_key("q", kb_ids=[1, 2], user_id=None) != kb_key
+    assert cache.make_key("q", kb_ids=None, user_id=7) == user_key
+
+
+def test_evicts_least_recently_used_entries_past_byte_budget():
+    cache = SearchResultCache(max_bytes=1000)
+    cache.put("a", _docs("x" * 300))
+    cache.put("b", _docs("y" * 300))
+    cache.get("a")
+    cache.put("c", _docs("z" * 300))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+    cache.put("huge", _docs("w" * 2000))
+    assert cache.get("huge") is None
+
+
+def test_disabled_cache_stores_nothing():
+    cache = SearchResultCache(max_bytes=0)
+    cache.put("k", _docs("x"))
+
+    assert len(cache) == 0
+
+
+def test_entries_expire_after_ttl():
+    now = [0.0]
+    cache = SearchResultCache(max_bytes=1 << 20, ttl=60, clock=lambda: now[0])
+    cache.put("k", _docs("x"))
+
+    now[0] = 59
+    assert cache.get("k") is not None
+
+    now[0] = 60
+    assert cache.get("k") is None
+    assert len(cache) == 0
@@ -0,0 +1,60 @@
+import pytest
+
+from backend.src.retrieval.retrieval_prefix import PrefixPolicy, PrefixTokenCounts
+
+META = {
+    "title": "Attention Is All You Need",
+    "authors": "Vaswani et al.",
+    "summary": "We propose the Transformer. " * 40,
+}
+
+
+def test_default_fields_leave_the_abstract_to_paper_vectors():
+    policy = PrefixPolicy(
+        fields=("title", "authors", "domain", "section"), max_tokens=64
+    )
+
+    text, prefix_tokens = policy.apply(
+        "chunk body", META, domain="nlp", section="Method"
+    )
+
+    assert text == (
+        "Title: Attention Is All You Need\nAuthors: Vaswani et al.\n"
+        "Domain: nlp\nSection: Method\n\nchunk body"
+    )
+    assert "Abstract" not in text
+    assert 0 < prefix_tokens <= 64
+
+
+def test_prefix_is_capped_and_trims_the_first_field_that_overflows():
+    policy = PrefixPolicy(fields=("title", "abstract", "section"), max_tokens=30)
+
+    prefix = policy.prefix(META, section="Intro")
+
+    lines = prefix.split("\n")
+    assert lines[0] == "Title: Attention Is All You Need"
+    assert lines[1].startswith("Abstract: We propose") and lines[1].endswith("…")
+    assert sum(len(line) for line in lines) <= 30 * 4
+
+
+def test_prefix_never_pushes_content_past_the_window():
+    policy = PrefixPolicy(fields=("title",), max_tokens=64, window_tokens=100)
+
+    assert policy.prefix(META, content_tokens=95) == "Title: Attention Is…"
+    assert policy.prefix(META, content_tokens=100) == ""
+    assert policy.apply("x" * 400, META, section="S") == ("x" * 400, 0)
+
+
+def test_unknown_fields_are_rejected():
+    with pytest.raises(ValueError):
+        PrefixPolicy(fields=("title", "venue"))
+
+
+def test_token_counts_track_prefix_share_and_overflow():
+    counts = PrefixTokenCounts()
+    counts.add(10, 90, window_tokens=512)
+    counts.add(10, 600, window_tokens=512)
+
+    assert counts.chunks == 2
+    assert counts.prefix_share == pytest.approx(20 / 710)
+    assert counts.over_window == 1
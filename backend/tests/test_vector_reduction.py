@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from backend.src.embedding.reduction import (
+    PCAReducer,
+    ReducedEmbeddings,
+    TruncateReducer,
+    evaluate_reductions,
+    get_reducer,
+)
+
+
+def _low_rank_vectors(n=400, dim=64, rank=8, seed=0):
+    rng = np.random.default_rng(seed)
+    basis = rng.standard_normal((rank, dim))
+    return rng.standard_normal((n, rank)) @ basis + 0.01 * rng.standard_normal((n, dim))
+
+
+class FixedEmbedder:
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def embed_documents(self, texts):
+        return [self.vectors[len(t) % len(self.vectors)].tolist() for t in texts]
+
+    def embed_query(self, text):
+        return self.vectors[len(text) % len(self.vectors)].tolist()
+
+
+def test_truncate_keeps_leading_dims_normalized():
+    projected = TruncateReducer(2).project([[3.0, 4.0, 9.0], [0.0, 2.0, 1.0]])
+
+    assert projected.shape == (2, 2)
+    np.testing.assert_allclose(projected, [[0.6, 0.8], [0.0, 1.0]], rtol=1e-6)
+    with pytest.raises(ValueError):
+        TruncateReducer(4).project([[1.0, 2.0]])
+
+
+def test_pca_round_trips_through_npz(tmp_path):
+    vectors = _low_rank_vectors()
+    reducer = PCAReducer.fit(vectors, 8, model="test/model")
+    path = tmp_path / "pca.npz"
+    reducer.save(path)
+
+    loaded = get_reducer("pca", 8, str(path))
+
+    assert loaded.model == "test/model"
+    assert loaded.fingerprint == reducer.fingerprint
+    np.testing.assert_allclose(
+        loaded.project(vectors[:5]), reducer.project(vectors[:5])
+    )
+    with pytest.raises(ValueError):
+        get_reducer("pca", 16, str(path))
+    with pytest.raises(FileNotFoundError):
+        get_reducer("pca", 8, str(tmp_path / "missing.npz"))
+    assert get_reducer("", 8, str(path)) is None
+
+
+def test_reduced_embeddings_project_documents_and_queries():
+    vectors = _low_rank_vectors(n=10)
+    embedder = ReducedEmbeddings(FixedEmbedder(vectors), TruncateReducer(4))
+
+    documents = embedder.embed_documents(["a", "bb"])
+    query = embedder.embed_query("a")
+
+    assert [len(v) for v in documents] == [4, 4]
+    assert query == pytest.approx(documents[0])
+    assert np.linalg.norm(query) == pytest.approx(1.0)
+
+
+def test_eval_reports_recall_per_dimension():
+    vectors = _low_rank_vectors(n=500)
+    corpus, queries = vectors[50:], vectors[:50]
+
+    reports = evaluate_reductions(corpus, queries, [2, 8], k=5)
+
+    assert [r.dim for r in reports] == [64, 2, 8]
+    assert reports[0].recall == 1.0
+    # The data is rank 8, so 8 components recover the neighbours, 2 don't.
+    assert reports[2].recall > 0.9
+    assert reports[1].recall < reports[2].recall
+    assert reports[2].bytes_per_vector == 32